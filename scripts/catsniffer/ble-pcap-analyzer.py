@@ -4,21 +4,140 @@ BLE PCAP Analyzer
 Parses BLE packet captures to:
 1. Enumerate discovered devices
 2. Identify potentially sensitive data exposures
+
+pcap and pcapng files are read straight from an mmap of the capture, so
+multi-GB files are walked without loading or dissecting every packet.
+scapy is only needed for formats the built-in reader doesn't handle.
 """
 
 import sys
+import os
+import mmap
 import re
 import struct
+import time
 from collections import defaultdict
 from datetime import datetime
 
 try:
-    from scapy.all import rdpcap, Packet
-    from scapy.layers.bluetooth import *
+    from scapy.all import rdpcap
 except ImportError:
-    print("ERROR: scapy not installed")
-    print("Install with: python3 -m pip install scapy")
-    sys.exit(1)
+    rdpcap = None  # only needed as a fallback reader
+
+
+PROGRESS_REFRESH = 2  # progress line updates per second
+
+
+class PcapReader:
+    """Packets of a pcap or pcapng file as memoryview slices of an mmap
+
+    Only the record (block) headers are parsed, with struct.unpack_from on
+    the mapping; packet data is never copied. Views must not be kept past
+    close(). offset and size give the reading progress in bytes.
+    """
+
+    PCAP_MAGIC = {
+        b'\xd4\xc3\xb2\xa1': '<', b'\x4d\x3c\xb2\xa1': '<',  # us / ns timestamps
+        b'\xa1\xb2\xc3\xd4': '>', b'\xa1\xb2\x3c\x4d': '>',
+    }
+    PCAPNG_SHB = 0x0A0D0D0A
+    PCAPNG_BYTE_ORDER = 0x1A2B3C4D
+
+    def __init__(self, filename):
+        self.size = os.path.getsize(filename)
+        if self.size < 24:
+            raise ValueError('file too short for a capture')
+        with open(filename, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        self.offset = 0
+
+        magic = bytes(self.view[:4])
+        if magic in self.PCAP_MAGIC:
+            self.format = 'pcap'
+            self.endian = self.PCAP_MAGIC[magic]
+        elif struct.unpack_from('<I', self.view, 0)[0] == self.PCAPNG_SHB:
+            self.format = 'pcapng'
+        else:
+            self.close()
+            raise ValueError('not a pcap or pcapng file')
+
+    def __iter__(self):
+        return self._pcap() if self.format == 'pcap' else self._pcapng()
+
+    def _pcap(self):
+        view, size = self.view, self.size
+        record = struct.Struct(self.endian + '8xI4x')  # incl_len of the 16-byte header
+        offset = 24
+        while offset + 16 <= size:
+            length = record.unpack_from(view, offset)[0]
+            start = offset + 16
+            if start + length > size:
+                break  # truncated last record
+            offset = self.offset = start + length
+            yield view[start:start + length]
+
+    def _pcapng(self):
+        view, size = self.view, self.size
+        endian = '<'
+        offset = 0
+        while offset + 12 <= size:
+            block_type = struct.unpack_from(endian + 'I', view, offset)[0]
+            if block_type == self.PCAPNG_SHB:
+                # Each section header sets the byte order of the blocks after it
+                order = struct.unpack_from('<I', view, offset + 8)[0]
+                endian = '<' if order == self.PCAPNG_BYTE_ORDER else '>'
+            block_len = struct.unpack_from(endian + 'I', view, offset + 4)[0]
+            if block_len < 12 or offset + block_len > size:
+                break  # truncated or corrupt
+            end = offset + block_len - 4
+
+            if block_type in (2, 6):
+                # (Obsolete) packet block / enhanced packet block: data at 28
+                length = struct.unpack_from(endian + 'I', view, offset + 20)[0]
+                start = offset + 28
+                data = view[start:min(start + length, end)]
+            elif block_type == 3:
+                # Simple packet block: original length, then data at 12
+                length = struct.unpack_from(endian + 'I', view, offset + 8)[0]
+                start = offset + 12
+                data = view[start:min(start + length, end)]
+            else:
+                data = None
+
+            offset = self.offset = offset + block_len
+            if data is not None:
+                yield data
+
+    def close(self):
+        self.view.release()
+        try:
+            self.map.close()
+        except BufferError:
+            pass  # a caller still holds a packet view; freed with it
+
+
+def read_packets(filename):
+    """(packet iterator, reader or None) for a capture, falling back to scapy"""
+    try:
+        reader = PcapReader(filename)
+        return iter(reader), reader
+    except ValueError as e:
+        if rdpcap is None:
+            print(f"ERROR: Could not read PCAP file: {e}")
+            print("Other capture formats need scapy: python3 -m pip install scapy")
+            sys.exit(1)
+        print(f"[*] {e}, reading with scapy")
+    except OSError as e:
+        print(f"ERROR: Could not read PCAP file: {e}")
+        sys.exit(1)
+
+    try:
+        packets = rdpcap(filename)
+    except Exception as e:
+        print(f"ERROR: Could not read PCAP file: {e}")
+        sys.exit(1)
+    return (bytes(pkt) for pkt in packets), None
 
 
 class BLEDevice:
@@ -153,13 +272,14 @@ def parse_catsniffer_packet(raw_data):
 
     # Parse header
     version = raw_data[0]
-    length = struct.unpack('<H', raw_data[1:3])[0]
+    length = struct.unpack_from('<H', raw_data, 1)[0]
     protocol = raw_data[6]
-    rssi = struct.unpack('b', raw_data[14:15])[0]  # signed byte
+    rssi = struct.unpack_from('b', raw_data, 14)[0]  # signed byte
     status = raw_data[15]
 
-    # Extract BLE payload (skip 17-byte header)
-    ble_payload = raw_data[17:]
+    # Extract BLE payload (skip 17-byte header); a copy, as raw_data may be
+    # a view into the mapped capture
+    ble_payload = bytes(raw_data[17:])
 
     return ble_payload, rssi, (status & 0x80) != 0  # FCS OK if bit 7 is set
 
@@ -169,25 +289,28 @@ def analyze_pcap(filename):
     print(f"[*] Analyzing BLE PCAP: {filename}")
     print(f"[*] Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 
-    try:
-        packets = rdpcap(filename)
-    except Exception as e:
-        print(f"ERROR: Could not read PCAP file: {e}")
-        sys.exit(1)
+    packets, reader = read_packets(filename)
+    if reader is not None:
+        print(f"[*] {reader.format} file, {reader.size / 1e6:.1f} MB\n")
 
     devices = {}
     sensitive_finder = SensitiveDataFinder()
-    total_packets = len(packets)
-
-    print(f"[*] Total packets: {total_packets}\n")
-
-    # Parse packets
-    for i, pkt in enumerate(packets):
-        if i % 100 == 0 and i > 0:
-            print(f"[*] Processing packet {i}/{total_packets}...", end='\r')
+    total_packets = 0
+    started = time.monotonic()
+
+    # Parse packets; the progress line is redrawn on a timer, not per packet,
+    # so a slow console doesn't hold up the parsing
+    next_progress = started + 1.0 / PROGRESS_REFRESH
+    for i, raw_data in enumerate(packets):
+        total_packets += 1
+        now = time.monotonic()
+        if now >= next_progress:
+            done = f" ({reader.offset * 100 // reader.size}%)" if reader is not None else ''
+            sys.stdout.write(f"[*] Processing packet {i}{done}...\r")
+            sys.stdout.flush()
+            next_progress = now + 1.0 / PROGRESS_REFRESH
 
         try:
-            raw_data = bytes(pkt)
 
             # Parse CatSniffer packet format
             ble_payload, rssi, fcs_ok = parse_catsniffer_packet(raw_data)
@@ -250,7 +373,11 @@ def analyze_pcap(filename):
             # Skip problematic packets
             continue
 
+    raw_data = None  # drop the last packet view before unmapping
+    if reader is not None:
+        reader.close()
     print(" " * 80, end='\r')  # Clear progress line
+    print(f"[*] Total packets: {total_packets} (parsed in {time.monotonic() - started:.1f}s)\n")
 
     # Print results
     print("=" * 80)
@@ -10,7 +10,8 @@ echo ""
 echo "Capturing BLE traffic on channel $channel to $filename"
 echo "Press Ctrl+C to stop."
 echo ""
-/usr/bin/python3 cat_sniffer.py sniff /dev/ttyACM1 --phy ble -c "$channel" --pcap --pcap-name "$filename"
+/usr/bin/python3 /home/dragon/bin/rf-device-arbiter.py run -r catsniffer -n ble-pcap -- \
+    /usr/bin/python3 cat_sniffer.py sniff /dev/ttyACM1 --phy ble -c "$channel" --pcap --pcap-name "$filename"
 echo ""
 echo "Capture saved to: $filename"
 read -p "Press Enter to close..."
@@ -28,6 +28,7 @@ trap cleanup INT TERM EXIT
 echo "Wireshark launched. Starting packet capture..."
 echo "Press Ctrl+C to stop."
 echo ""
-/usr/bin/python3 cat_sniffer.py sniff /dev/ttyACM1 --phy thread -c 15 --fifo --fifo-name "$FIFO_PATH"
+/usr/bin/python3 /home/dragon/bin/rf-device-arbiter.py run -r catsniffer -n thread-wireshark -- \
+    /usr/bin/python3 cat_sniffer.py sniff /dev/ttyACM1 --phy thread -c 15 --fifo --fifo-name "$FIFO_PATH"
 
 cleanup
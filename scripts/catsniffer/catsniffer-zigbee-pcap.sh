@@ -10,7 +10,8 @@ echo ""
 echo "Capturing ZigBee traffic on channel $channel to $filename"
 echo "Press Ctrl+C to stop."
 echo ""
-/usr/bin/python3 cat_sniffer.py sniff /dev/ttyACM1 --phy zigbee -c "$channel" --pcap --pcap-name "$filename"
+/usr/bin/python3 /home/dragon/bin/rf-device-arbiter.py run -r catsniffer -n zigbee-pcap -- \
+    /usr/bin/python3 cat_sniffer.py sniff /dev/ttyACM1 --phy zigbee -c "$channel" --pcap --pcap-name "$filename"
 echo ""
 echo "Capture saved to: $filename"
 read -p "Press Enter to close..."
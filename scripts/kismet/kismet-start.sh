@@ -27,13 +27,20 @@ if pgrep -x "kismet" > /dev/null; then
     fi
 fi
 
-echo "Starting Kismet in daemon mode..."
-kismet -c rtl433-0 --daemonize 2>&1 | grep -E "INFO|ERROR"
+echo "Starting Kismet in the background..."
+# Kismet runs under the device arbiter (instead of --daemonize) so it holds
+# the dongle's lease for as long as it runs and waits if the dongle is busy
+mkdir -p /home/dragon/.kismet
+nohup /usr/bin/python3 /home/dragon/bin/rf-device-arbiter.py run -r rtlsdr:0 -n kismet -- \
+    kismet -c rtl433-0 > /home/dragon/.kismet/kismet-start.log 2>&1 &
 
 echo ""
 sleep 2
 
-if pgrep -x "kismet" > /dev/null; then
+if ! pgrep -x "kismet" > /dev/null && pgrep -f "rf-device-arbiter.py run .*kismet" > /dev/null; then
+    echo "RTL-SDR is in use by another job; Kismet will start when it is free."
+    echo "Check with: rf-device-arbiter.py status"
+elif pgrep -x "kismet" > /dev/null; then
     echo "✓ Kismet started successfully!"
     echo ""
     echo "Access web UI at: http://localhost:2501"
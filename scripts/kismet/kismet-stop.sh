@@ -18,6 +18,10 @@ if pgrep -x "kismet" > /dev/null; then
     killall kismet_cap_sdr_rtl433 2>/dev/null
 
     echo "✓ Kismet stopped"
+elif pgrep -f "rf-device-arbiter.py run .*kismet" > /dev/null; then
+    # Started but still queued for the RTL-SDR
+    pkill -f "rf-device-arbiter.py run .*kismet"
+    echo "✓ Cancelled queued Kismet start"
 else
     echo "Kismet is not running"
 fi
@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+"""
+Fake rtl_power
+Stand-in for rtl_power that writes synthetic CSV rows in rtl_power's format,
+so the wideband scanner can be exercised without an RTL-SDR attached.
+
+Accepts the rtl_power options the scanner uses (-f, -i, -1, -d, -g, output
+file or '-') and emulates device open time, per-hop retune time and the
+integration interval. Like a real dongle, a device index can only be opened
+by one process at a time.
+
+Tuning via environment variables:
+  FAKE_RTL_POWER_STARTUP   seconds to "open" the device (default 1.5)
+  FAKE_RTL_POWER_HOP_TIME  seconds per hop (default 0.05)
+  FAKE_RTL_POWER_EMITTERS  emitters per GHz of spectrum (default 40)
+  FAKE_RTL_POWER_NOISE     noise standard deviation in dB (default 1.5)
+  FAKE_RTL_POWER_DRIFT     emitter drift in Hz per sweep (default 0)
+  FAKE_RTL_POWER_SEED      random seed (default 1)
+
+Usage:
+  rf-wideband-scanner.py --rtl-power fake-rtl-power.py --devices 0,1 --scan
+"""
+
+import sys
+import os
+import fcntl
+import getopt
+import random
+import time
+from datetime import datetime
+
+TUNER_BANDWIDTH = 2400000  # Hz per hop, as rtl_power uses for small bins
+
+# Emitters are placed over the whole tuning range so every device and every
+# sub-range sees the same simulated world
+WORLD_START = 24000000
+WORLD_END = 1766000000
+
+
+class SyntheticSpectrum:
+    """Noise floor with a fixed population of (optionally drifting) carriers"""
+
+    def __init__(self, emitters_per_ghz=40, noise=1.5, drift=0.0, seed=1,
+                 start_freq=WORLD_START, end_freq=WORLD_END):
+        self.rng = random.Random(seed)
+        self.noise = noise
+        self.drift = drift
+        count = max(1, int((end_freq - start_freq) / 1e9 * emitters_per_ghz))
+        # (center Hz, half bandwidth Hz, level dB above the floor)
+        self.emitters = [
+            (self.rng.uniform(start_freq, end_freq),
+             self.rng.choice((5e3, 12.5e3, 100e3, 150e3)),
+             self.rng.uniform(12.0, 40.0))
+            for _ in range(count)
+        ]
+        # A 433.92 MHz weather sensor, like the one next door
+        self.emitters.append((433920000.0, 10e3, 30.0))
+        self.sweeps = 0
+
+    def row(self, freq_low, freq_step, nbins, floor=-40.0):
+        """Power values for one hop"""
+        powers = [floor + self.rng.gauss(0.0, self.noise) for _ in range(nbins)]
+        offset = self.drift * self.sweeps
+        freq_high = freq_low + nbins * freq_step
+        for center, half_bw, level in self.emitters:
+            center += offset
+            if center + half_bw < freq_low or center - half_bw >= freq_high:
+                continue
+            first = max(0, int((center - half_bw - freq_low) // freq_step))
+            last = min(nbins - 1, int((center + half_bw - freq_low) // freq_step))
+            for i in range(first, last + 1):
+                powers[i] = max(powers[i], floor + level + self.rng.gauss(0.0, self.noise))
+        return powers
+
+
+def parse_freq(text):
+    """rtl_power style frequency: 433.92M, 2.4G, 100k or plain Hz"""
+    scale = {'k': 1e3, 'K': 1e3, 'M': 1e6, 'G': 1e9}
+    if text and text[-1] in scale:
+        return float(text[:-1]) * scale[text[-1]]
+    return float(text)
+
+
+def plan_hops(start_freq, end_freq, bin_size):
+    """(freq_low, bins) of each tuner hop covering the range, as rtl_power splits it"""
+    bins_per_hop = max(1, int(TUNER_BANDWIDTH // bin_size))
+    hops = []
+    freq = start_freq
+    while freq < end_freq:
+        nbins = max(1, min(bins_per_hop, int(round((end_freq - freq) / bin_size))))
+        hops.append((int(freq), nbins))
+        freq += nbins * bin_size
+    return hops
+
+
+def sweep_lines(spectrum, hops, bin_size, now=None):
+    """One sweep of rtl_power CSV lines; advances the spectrum's drift"""
+    now = now or datetime.now()
+    lines = []
+    for freq_low, nbins in hops:
+        powers = spectrum.row(freq_low, bin_size, nbins)
+        lines.append(f"{now:%Y-%m-%d}, {now:%H:%M:%S}, {freq_low}, "
+                     f"{int(freq_low + nbins * bin_size)}, {bin_size:.2f}, {nbins * 16}, "
+                     + ', '.join(f'{p:.2f}' for p in powers) + '\n')
+    spectrum.sweeps += 1
+    return lines
+
+
+def lock_device(index):
+    """Claim the device like libusb would; fails if another process holds it"""
+    path = os.path.join('/tmp', f'fake-rtl-power-{index}.lock')
+    handle = open(path, 'w')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        sys.stderr.write(f"usb_claim_interface error -6\nFailed to open rtlsdr device #{index}.\n")
+        sys.exit(1)
+    return handle
+
+
+def main(argv):
+    opts, args = getopt.getopt(argv, 'f:i:1d:g:c:e:p:F:')
+    opts = dict(opts)
+    if '-f' not in opts:
+        sys.stderr.write("Use: fake-rtl-power.py -f freq1:freq2:bin_size [-i interval] [-1] [-d device] [filename]\n")
+        return 1
+
+    start_text, end_text, step_text = opts['-f'].split(':')
+    start_freq = parse_freq(start_text)
+    end_freq = parse_freq(end_text)
+    bin_size = parse_freq(step_text)
+    interval = parse_freq(opts.get('-i', '10'))
+    single = '-1' in opts
+    device = int(opts.get('-d', '0'))
+
+    startup = float(os.environ.get('FAKE_RTL_POWER_STARTUP', '1.5'))
+    hop_time = float(os.environ.get('FAKE_RTL_POWER_HOP_TIME', '0.05'))
+
+    spectrum = SyntheticSpectrum(
+        emitters_per_ghz=float(os.environ.get('FAKE_RTL_POWER_EMITTERS', '40')),
+        noise=float(os.environ.get('FAKE_RTL_POWER_NOISE', '1.5')),
+        drift=float(os.environ.get('FAKE_RTL_POWER_DRIFT', '0')),
+        seed=int(os.environ.get('FAKE_RTL_POWER_SEED', '1'))
+    )
+
+    device_lock = lock_device(device)
+    out = sys.stdout if not args or args[0] == '-' else open(args[0], 'w')
+    time.sleep(startup)
+
+    hops = plan_hops(start_freq, end_freq, bin_size)
+
+    try:
+        while True:
+            # rtl_power keeps re-sweeping until the interval has elapsed
+            time.sleep(max(interval, len(hops) * hop_time))
+            out.writelines(sweep_lines(spectrum, hops, bin_size))
+            out.flush()
+            if single:
+                break
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+    finally:
+        device_lock.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,679 @@
+#!/usr/bin/python3
+"""
+RF Device Arbiter
+Hands out leases on the shared radios (RTL-SDR dongles, the CatSniffer) so the
+scanner, decoders and capture scripts queue for a device instead of failing
+with "usb_claim_interface error -6" or a busy /dev/ttyACM1 when something
+else already has it open.
+
+A lease lasts as long as the client's connection stays open, so a job that
+crashes gives its device back straight away; leases can also carry a TTL
+after which the arbiter takes the device back. Waiting requests are granted
+by priority, then in arrival order. A request can name a device
+("rtlsdr:1") or a kind ("rtlsdr" = any free dongle).
+
+When no arbiter is running, clients fall back to flock() on per-device lock
+files in /tmp: no priorities or utilization figures, but jobs still wait
+for each other. The arbiter takes the same locks while a device is leased,
+so both kinds of client can be mixed.
+
+The arbiter's socket is only open to its owner and one group (plugdev by
+default, see --group), since whoever can connect can hold every device.
+
+Usage:
+  rf-device-arbiter.py serve --devices rtlsdr:0,rtlsdr:1,catsniffer
+  rf-device-arbiter.py status
+  rf-device-arbiter.py run -r rtlsdr -p 10 -n rtl433 -- rtl_433 -d {index} -F json
+"""
+
+import sys
+import os
+import argparse
+import fcntl
+import grp
+import itertools
+import json
+import select
+import signal
+import socket
+import subprocess
+import threading
+import time
+
+SOCKET_PATH = os.environ.get('RF_ARBITER_SOCKET', '/tmp/rf-device-arbiter.sock')
+LOCK_DIR = os.environ.get('RF_ARBITER_LOCK_DIR', '/tmp')
+# Group allowed to lease devices; rtl-sdr's udev rules give dongles to plugdev
+SOCKET_GROUP = os.environ.get('RF_ARBITER_GROUP', 'plugdev')
+
+# Devices assumed when none are given (and by clients with no arbiter running)
+DEFAULT_DEVICES = os.environ.get('RF_ARBITER_DEVICES', 'rtlsdr:0,catsniffer')
+
+# How often waiting requests retry devices held by lock-file clients
+POLL_INTERVAL = 0.5
+
+
+class ArbiterError(Exception):
+    pass
+
+
+def parse_devices(text):
+    return [name.strip() for name in text.split(',') if name.strip()]
+
+
+def matching_devices(resource, devices):
+    """Devices a request may be granted: the named one, or any of a kind"""
+    if resource in devices:
+        return [resource]
+    return [name for name in devices if name.split(':', 1)[0] == resource]
+
+
+def device_index(name):
+    """'rtlsdr:1' -> '1'; devices without an index map to themselves"""
+    return name.split(':', 1)[1] if ':' in name else name
+
+
+def lock_path(name):
+    safe = name.replace(':', '-').replace('/', '_')
+    return os.path.join(LOCK_DIR, f'rf-device-{safe}.lock')
+
+
+def try_lock(name):
+    """Take a device's lock file without blocking; returns the handle or None
+
+    Raises ArbiterError when the lock file can't be opened at all, since
+    waiting won't make it usable.
+    """
+    path = lock_path(name)
+    try:
+        # No O_TRUNC: the holder's PID stays in the file until we own the lock
+        handle = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o666), 'r+')
+    except PermissionError:
+        # Another user's lock file still locks read-only, just without our PID
+        try:
+            handle = os.fdopen(os.open(path, os.O_RDONLY), 'r')
+        except OSError as e:
+            raise ArbiterError(f"cannot open lock file {path}: {e.strerror}")
+    except OSError as e:
+        raise ArbiterError(f"cannot open lock file {path}: {e.strerror}")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    if handle.writable():
+        handle.truncate()
+        handle.write(f"{os.getpid()}\n")
+        handle.flush()
+    return handle
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class Channel:
+    """Newline-delimited JSON over a stream socket"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b''
+
+    def send(self, message):
+        self.sock.sendall(json.dumps(message).encode() + b'\n')
+
+    def recv(self, timeout=None):
+        """Next message, None at EOF; raises socket.timeout"""
+        while b'\n' not in self.buffer:
+            self.sock.settimeout(timeout)
+            data = self.sock.recv(4096)
+            if not data:
+                return None
+            self.buffer += data
+        line, self.buffer = self.buffer.split(b'\n', 1)
+        try:
+            return json.loads(line)
+        except ValueError:
+            return {}
+
+    def closed(self):
+        """Whether the peer has hung up (without consuming any data)"""
+        readable, _, _ = select.select([self.sock], [], [], 0)
+        if not readable:
+            return False
+        try:
+            return self.sock.recv(1, socket.MSG_PEEK) == b''
+        except OSError:
+            return True
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class Arbiter:
+    """Lease table and priority queue for a fixed set of devices"""
+
+    def __init__(self, devices):
+        self.devices = {
+            name: {'lease': None, 'lock': None, 'busy': 0.0, 'grants': 0}
+            for name in devices
+        }
+        self.waiting = []
+        self.cond = threading.Condition()
+        self.started = time.monotonic()
+        self.ids = itertools.count(1)
+
+    def request(self, resource, priority=0, owner='?', pid=None, ttl=None):
+        if not matching_devices(resource, self.devices):
+            raise ArbiterError(f"unknown device {resource!r} "
+                               f"(have {', '.join(self.devices)})")
+        req = {
+            'id': next(self.ids),
+            'resource': resource,
+            'priority': priority,
+            'owner': owner,
+            'pid': pid,
+            'ttl': ttl,
+            'queued': time.monotonic(),
+            'granted': None,
+            'device': None,
+            'error': None
+        }
+        with self.cond:
+            self.waiting.append(req)
+            self._schedule()
+        return req
+
+    def _schedule(self):
+        """Grant free devices to waiting requests, highest priority first
+
+        A request that can't be served doesn't hold up lower-priority
+        requests for other devices. Called with the condition held.
+        """
+        granted = False
+        for req in sorted(self.waiting, key=lambda r: (-r['priority'], r['id'])):
+            for name in matching_devices(req['resource'], self.devices):
+                dev = self.devices[name]
+                if dev['lease'] is not None:
+                    continue
+                # A lock-file client may be using the device outside the arbiter
+                try:
+                    handle = try_lock(name)
+                except ArbiterError as e:
+                    # Refused rather than left waiting on a lock it can never take
+                    req['error'] = str(e)
+                    self.waiting.remove(req)
+                    granted = True
+                    break
+                if handle is None:
+                    continue
+                dev['lease'] = req
+                dev['lock'] = handle
+                dev['grants'] += 1
+                req['device'] = name
+                req['granted'] = time.monotonic()
+                self.waiting.remove(req)
+                granted = True
+                print(f"[*] {name} -> {req['owner']} (priority {req['priority']}, "
+                      f"waited {req['granted'] - req['queued']:.1f}s)")
+                break
+        if granted:
+            self.cond.notify_all()
+
+    def wait(self, req, timeout):
+        """Wait up to timeout for a grant; True once the request holds a device or was refused"""
+        with self.cond:
+            if req['device'] is None and req['error'] is None:
+                self.cond.wait(timeout)
+                self._schedule()
+            return req['device'] is not None or req['error'] is not None
+
+    def withdraw(self, req):
+        with self.cond:
+            if req in self.waiting:
+                self.waiting.remove(req)
+
+    def release(self, req, reason='released'):
+        with self.cond:
+            dev = self.devices.get(req['device'])
+            if dev is None or dev['lease'] is not req:
+                return
+            held = time.monotonic() - req['granted']
+            dev['busy'] += held
+            dev['lease'] = None
+            dev['lock'].close()
+            dev['lock'] = None
+            print(f"[*] {req['device']} <- {req['owner']} ({reason} after {held:.1f}s)")
+            self._schedule()
+            self.cond.notify_all()
+
+    def status(self):
+        now = time.monotonic()
+        uptime = max(now - self.started, 1e-9)
+        with self.cond:
+            devices = []
+            for name, dev in self.devices.items():
+                lease = dev['lease']
+                busy = dev['busy'] + (now - lease['granted'] if lease else 0.0)
+                devices.append({
+                    'device': name,
+                    'owner': lease['owner'] if lease else None,
+                    'pid': lease['pid'] if lease else None,
+                    'priority': lease['priority'] if lease else None,
+                    'held': now - lease['granted'] if lease else 0.0,
+                    'grants': dev['grants'],
+                    'utilization': busy / uptime
+                })
+            queue = [{
+                'resource': req['resource'],
+                'owner': req['owner'],
+                'pid': req['pid'],
+                'priority': req['priority'],
+                'waiting': now - req['queued']
+            } for req in sorted(self.waiting, key=lambda r: (-r['priority'], r['id']))]
+        return {'ok': True, 'uptime': uptime, 'devices': devices, 'queue': queue}
+
+
+def handle_client(arbiter, conn):
+    channel = Channel(conn)
+    req = None
+    try:
+        message = channel.recv(timeout=10)
+        if not message:
+            return
+        if message.get('op') == 'status':
+            channel.send(arbiter.status())
+            return
+        if message.get('op') != 'acquire':
+            channel.send({'ok': False, 'error': f"unknown op {message.get('op')!r}"})
+            return
+
+        try:
+            req = arbiter.request(message.get('resource', 'rtlsdr'),
+                                  priority=int(message.get('priority', 0)),
+                                  owner=str(message.get('owner', '?')),
+                                  pid=message.get('pid'),
+                                  ttl=message.get('ttl'))
+        except (ArbiterError, ValueError, TypeError) as e:
+            channel.send({'ok': False, 'error': str(e)})
+            return
+
+        # Queue until granted, dropping the request if the client goes away
+        while not arbiter.wait(req, POLL_INTERVAL):
+            if channel.closed():
+                arbiter.withdraw(req)
+                return
+        if req['error'] is not None:
+            channel.send({'ok': False, 'error': req['error']})
+            return
+        channel.send({'ok': True, 'lease': req['id'], 'device': req['device'],
+                      'waited': req['granted'] - req['queued']})
+
+        # The lease lasts until release, disconnect or its TTL runs out
+        reason = 'released'
+        while True:
+            timeout = None
+            if req['ttl']:
+                timeout = req['granted'] + float(req['ttl']) - time.monotonic()
+                if timeout <= 0:
+                    reason = 'expired'
+                    channel.send({'event': 'expired'})
+                    break
+            try:
+                message = channel.recv(timeout=timeout)
+            except socket.timeout:
+                continue
+            if message is None:
+                reason = 'disconnected'
+                break
+            if message.get('op') == 'release':
+                break
+            if message.get('op') == 'status':
+                channel.send(arbiter.status())
+        arbiter.release(req, reason)
+        req = None
+
+    except OSError:
+        pass
+    finally:
+        if req is not None:
+            arbiter.withdraw(req)
+            arbiter.release(req, 'disconnected')
+        channel.close()
+
+
+def serve(devices, socket_path=SOCKET_PATH, group=SOCKET_GROUP):
+    if os.path.exists(socket_path):
+        # Refuse to start twice; clear a socket left behind by a crash
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+            print(f"ERROR: An arbiter is already listening on {socket_path}")
+            return 1
+        except OSError:
+            os.unlink(socket_path)
+        finally:
+            probe.close()
+
+    arbiter = Arbiter(devices)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Only owner and group may connect: anyone who can could hold every device.
+    # Bound under the umask so the socket is never briefly more open than that
+    umask = os.umask(0o117)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(umask)
+    if group:
+        try:
+            os.chown(socket_path, -1, grp.getgrnam(group).gr_gid)
+        except (KeyError, OSError) as e:
+            reason = 'no such group' if isinstance(e, KeyError) else e.strerror
+            print(f"[!] Socket left in its default group, can't give it to {group}: {reason}")
+    server.listen(16)
+
+    print(f"[*] Arbiter listening on {socket_path}")
+    print(f"[*] Devices: {', '.join(devices)}")
+
+    def shutdown(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, shutdown)
+    try:
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(target=handle_client, args=(arbiter, conn), daemon=True).start()
+    except KeyboardInterrupt:
+        print("\n[*] Arbiter stopped")
+        print_status(arbiter.status())
+    finally:
+        server.close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+class Lease:
+    """A granted device; release with close() or by leaving a with block"""
+
+    def __init__(self, device, channel=None, lock=None, ttl=None, waited=0.0):
+        self.device = device
+        self.index = device_index(device)
+        self.waited = waited
+        self.channel = channel
+        self.lock = lock
+        self.ttl = ttl
+
+    def on_expire(self, callback):
+        """Call callback (from a background thread) if the lease's TTL runs out"""
+        if self.channel is not None:
+            def watch():
+                try:
+                    while True:
+                        message = self.channel.recv()
+                        if message is None:
+                            return
+                        if message.get('event') == 'expired':
+                            callback()
+                            return
+                except OSError:
+                    pass
+            threading.Thread(target=watch, daemon=True).start()
+        elif self.ttl:
+            timer = threading.Timer(float(self.ttl), callback)
+            timer.daemon = True
+            timer.start()
+
+    def close(self):
+        if self.channel is not None:
+            try:
+                self.channel.send({'op': 'release'})
+            except OSError:
+                pass
+            self.channel.close()
+            self.channel = None
+        if self.lock is not None:
+            self.lock.close()
+            self.lock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LeaseRequest:
+    """A queued request for a device
+
+    Joins the arbiter's queue as soon as it is created (or falls back to
+    lock files if no arbiter is running); wait() blocks for the grant and
+    cancel() gives up the place in the queue from another thread.
+    """
+
+    def __init__(self, resource, priority=0, owner=None, ttl=None,
+                 socket_path=SOCKET_PATH):
+        self.resource = resource
+        self.ttl = ttl
+        self.cancelled = threading.Event()
+        self.started = time.monotonic()
+        self.channel = None
+        message = {
+            'op': 'acquire',
+            'resource': resource,
+            'priority': priority,
+            'owner': owner or os.path.basename(sys.argv[0]),
+            'pid': os.getpid(),
+            'ttl': ttl
+        }
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(socket_path)
+            self.channel = Channel(sock)
+            self.channel.send(message)
+        except OSError:
+            sock.close()
+            self.channel = None
+
+    @property
+    def arbitrated(self):
+        return self.channel is not None
+
+    def wait(self, timeout=None):
+        """Block until granted; raises TimeoutError, or ArbiterError if refused"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self.channel is None:
+            return self._wait_lock(deadline)
+
+        while True:
+            if self.cancelled.is_set():
+                raise ArbiterError("request cancelled")
+            remaining = POLL_INTERVAL
+            if deadline is not None:
+                remaining = min(remaining, deadline - time.monotonic())
+                if remaining <= 0:
+                    self.cancel()
+                    raise TimeoutError(f"no {self.resource} free within {timeout}s")
+            try:
+                reply = self.channel.recv(timeout=remaining)
+            except socket.timeout:
+                continue
+            except OSError:
+                reply = None
+            if reply is None:
+                raise ArbiterError("arbiter closed the connection")
+            if not reply.get('ok'):
+                self.cancel()
+                raise ArbiterError(reply.get('error', 'request refused'))
+            channel, self.channel = self.channel, None
+            return Lease(reply['device'], channel=channel, ttl=self.ttl,
+                         waited=reply.get('waited', 0.0))
+
+    def _wait_lock(self, deadline):
+        devices = parse_devices(DEFAULT_DEVICES)
+        candidates = matching_devices(self.resource, devices) or [self.resource]
+        while True:
+            for name in candidates:
+                handle = try_lock(name)
+                if handle is not None:
+                    return Lease(name, lock=handle, ttl=self.ttl,
+                                 waited=time.monotonic() - self.started)
+            if self.cancelled.is_set():
+                raise ArbiterError("request cancelled")
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"no {self.resource} free")
+            self.cancelled.wait(POLL_INTERVAL)
+
+    def cancel(self):
+        self.cancelled.set()
+        if self.channel is not None:
+            self.channel.close()
+            self.channel = None
+
+
+def acquire(resource, priority=0, owner=None, ttl=None, timeout=None,
+            socket_path=SOCKET_PATH):
+    """Lease a device, waiting in the queue for it; use as a context manager"""
+    return LeaseRequest(resource, priority, owner, ttl, socket_path).wait(timeout)
+
+
+def query_status(socket_path=SOCKET_PATH):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        channel = Channel(sock)
+        channel.send({'op': 'status'})
+        return channel.recv(timeout=5)
+    finally:
+        sock.close()
+
+
+def print_status(status):
+    print(f"[*] Arbiter up {format_duration(status['uptime'])}, "
+          f"{len(status['devices'])} device(s)")
+    print(f"    {'DEVICE':<14}{'HOLDER':<32}{'PRIO':>5}  {'HELD':>8}  {'GRANTS':>6}  UTIL")
+    for dev in status['devices']:
+        holder = f"{dev['owner']}[{dev['pid']}]" if dev['owner'] else '-'
+        prio = str(dev['priority']) if dev['owner'] else ''
+        held = format_duration(dev['held']) if dev['owner'] else ''
+        print(f"    {dev['device']:<14}{holder[:31]:<32}{prio:>5}  {held:>8}  "
+              f"{dev['grants']:>6}  {dev['utilization']:5.1%}")
+    if status['queue']:
+        print(f"[*] {len(status['queue'])} waiting:")
+        for req in status['queue']:
+            print(f"    {req['owner']}[{req['pid']}] for {req['resource']}, "
+                  f"priority {req['priority']}, waiting {format_duration(req['waiting'])}")
+
+
+def run(resource, command, priority=0, owner=None, ttl=None, timeout=None,
+        socket_path=SOCKET_PATH):
+    """Run a command while holding a device lease
+
+    '{device}' and '{index}' in the command are replaced with the granted
+    device name and its index (the number after 'rtlsdr:').
+    """
+    owner = owner or os.path.basename(command[0])
+    request = LeaseRequest(resource, priority, owner, ttl, socket_path)
+    if not request.arbitrated:
+        print(f"[*] No arbiter running, using lock files in {LOCK_DIR}", file=sys.stderr)
+    print(f"[*] Waiting for {resource}...", file=sys.stderr)
+
+    try:
+        lease = request.wait(timeout)
+    except KeyboardInterrupt:
+        request.cancel()
+        return 130
+    except (ArbiterError, TimeoutError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    with lease:
+        print(f"[*] Got {lease.device} after {lease.waited:.1f}s", file=sys.stderr)
+        cmd = [arg.replace('{device}', lease.device).replace('{index}', lease.index)
+               for arg in command]
+        try:
+            process = subprocess.Popen(cmd)
+        except OSError as e:
+            print(f"ERROR: Cannot run {cmd[0]}: {e}", file=sys.stderr)
+            return 127
+
+        def expired():
+            print(f"\n[!] Lease on {lease.device} expired, stopping {cmd[0]}", file=sys.stderr)
+            process.terminate()
+
+        lease.on_expire(expired)
+        signal.signal(signal.SIGTERM, lambda signum, frame: process.terminate())
+        while True:
+            try:
+                return process.wait()
+            except KeyboardInterrupt:
+                # The child got the same SIGINT; wait for it to exit
+                continue
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Lease RTL-SDR and CatSniffer devices to one job at a time')
+    parser.add_argument('--socket', default=SOCKET_PATH, help='Arbiter socket path')
+    sub = parser.add_subparsers(dest='command')
+
+    serve_parser = sub.add_parser('serve', help='Run the arbiter')
+    serve_parser.add_argument('--devices', default=DEFAULT_DEVICES,
+                              help=f'Comma-separated devices (default: {DEFAULT_DEVICES})')
+    serve_parser.add_argument('--group', default=SOCKET_GROUP,
+                              help=f'Group whose members may lease devices (default: {SOCKET_GROUP})')
+
+    sub.add_parser('status', help='Show leases, queue and device utilization')
+
+    run_parser = sub.add_parser('run', help='Run a command while holding a device')
+    run_parser.add_argument('-r', '--resource', default='rtlsdr',
+                            help='Device or kind to lease, e.g. rtlsdr, rtlsdr:1, catsniffer')
+    run_parser.add_argument('-p', '--priority', type=int, default=10,
+                            help='Higher is served first (scanner sweeps use 0)')
+    run_parser.add_argument('-n', '--name', help='Owner name shown in status')
+    run_parser.add_argument('--ttl', type=float, help='Stop the command after this many seconds')
+    run_parser.add_argument('--timeout', type=float,
+                            help='Give up if no device is free within this many seconds')
+    run_parser.add_argument('cmd', nargs=argparse.REMAINDER,
+                            help='Command to run, after --')
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        return serve(parse_devices(args.devices), args.socket, args.group)
+
+    if args.command == 'status':
+        try:
+            status = query_status(args.socket)
+        except OSError:
+            print(f"[*] No arbiter running on {args.socket}")
+            return 1
+        print_status(status)
+        return 0
+
+    if args.command == 'run':
+        command = args.cmd[1:] if args.cmd[:1] == ['--'] else args.cmd
+        if not command:
+            run_parser.error('no command given')
+        return run(args.resource, command, args.priority, args.name, args.ttl, args.timeout,
+                   args.socket)
+
+    parser.print_help()
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/python3
+"""
+RF Event Query
+Searches the event database written by rf-wideband-scanner.py --events:
+scanner detections, new-signal alerts, rtl_433 records and ADS-B messages.
+
+Times can be absolute ('2026-10-17 22:00', '22:00' = today), relative
+('90m', '12h', '7d' ago) or 'today' / 'yesterday' with an optional time.
+
+Examples:
+  rf-events.py events.db --freq 433.92 --since 'yesterday 20:00' --until 06:00
+  rf-events.py events.db --kind rtl433 --since 24h --summary
+  rf-events.py events.db --band ADS-B --since 1h
+"""
+
+import sys
+import os
+import argparse
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+KINDS = ('detection', 'alert', 'rtl433', 'adsb')
+
+
+def parse_time(text):
+    """(unix time, bare clock time) from an absolute, relative or day-relative time string
+
+    The flag is True only for a plain HH:MM[:SS] today, which a caller may
+    read as the next day's instead (see main).
+    """
+    text = text.strip().lower()
+    now = datetime.now()
+
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)\s*([smhdw])', text)
+    if match:
+        scale = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}[match.group(2)]
+        return time.time() - float(match.group(1)) * scale, False
+
+    if text == 'now':
+        return time.time(), False
+
+    day = None
+    for word, offset in (('today', 0), ('yesterday', 1)):
+        if text.startswith(word):
+            day = (now - timedelta(days=offset)).date()
+            text = text[len(word):].strip()
+            break
+
+    if re.fullmatch(r'\d{1,2}:\d{2}(:\d{2})?', text) or (day is not None and not text):
+        clock = datetime.strptime(text or '00:00', '%H:%M:%S' if text.count(':') == 2 else '%H:%M')
+        bare = day is None
+        day = day or now.date()
+        return datetime.combine(day, clock.time()).timestamp(), bare
+    if day is not None:
+        raise ValueError(f"bad time of day: {text!r}")
+
+    return datetime.fromisoformat(text).timestamp(), False
+
+
+def build_query(args):
+    where, params = [], []
+    if args.since is not None:
+        where.append('time >= ?')
+        params.append(args.since)
+    if args.until is not None:
+        where.append('time < ?')
+        params.append(args.until)
+    if args.freq is not None:
+        tolerance = args.tolerance * 1e3
+        where.append('frequency BETWEEN ? AND ?')
+        params += [int(args.freq * 1e6 - tolerance), int(args.freq * 1e6 + tolerance)]
+    if args.band:
+        where.append('band = ?')
+        params.append(args.band)
+    if args.kind:
+        where.append('kind = ?')
+        params.append(args.kind)
+    if args.source:
+        where.append('(source LIKE ? OR ident LIKE ?)')
+        params += [f'%{args.source}%', f'%{args.source}%']
+    return (' WHERE ' + ' AND '.join(where)) if where else '', params
+
+
+def format_time(t):
+    return datetime.fromtimestamp(t).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def print_events(db, clause, params, limit, oldest_first):
+    order = 'ASC' if oldest_first else 'DESC'
+    rows = db.execute(
+        f"SELECT time, kind, frequency, band, power, strength, source, ident, data "
+        f"FROM events{clause} ORDER BY time {order} LIMIT ?", params + [limit]).fetchall()
+
+    print(f"    {'TIME':<19}  {'KIND':<9}  {'FREQ MHz':>10}  {'BAND':<14}  {'dB':>6}  {'+dB':>5}  DETAIL")
+    for t, kind, freq, band, power, strength, source, ident, data in rows:
+        freq_text = f"{freq/1e6:10.4f}" if freq is not None else f"{'-':>10}"
+        power_text = f"{power:6.1f}" if power is not None else f"{'':>6}"
+        strength_text = f"{strength:5.1f}" if strength is not None else f"{'':>5}"
+        detail = ' '.join(str(v) for v in (source, ident) if v)
+        if not detail and data:
+            detail = data[:60]
+        print(f"    {format_time(t)}  {kind:<9}  {freq_text}  {(band or '-')[:14]:<14}  "
+              f"{power_text}  {strength_text}  {detail}")
+    return len(rows)
+
+
+def print_summary(db, clause, params, limit):
+    """Distinct emitters: events grouped by kind, 10 kHz frequency cell and source"""
+    rows = db.execute(
+        f"SELECT kind, CAST(ROUND(frequency / 10000.0) AS INTEGER) * 10000 AS cell, "
+        f"band, COALESCE(source, ''), COALESCE(ident, ''), COUNT(*), MIN(time), MAX(time) "
+        f"FROM events{clause} GROUP BY 1, 2, 4, 5 ORDER BY 6 DESC LIMIT ?",
+        params + [limit]).fetchall()
+
+    print(f"    {'KIND':<9}  {'FREQ MHz':>9}  {'BAND':<14}  {'EVENTS':>6}  {'FIRST':<19}  {'LAST':<19}  DETAIL")
+    for kind, cell, band, source, ident, count, first, last in rows:
+        freq_text = f"{cell/1e6:9.2f}" if cell is not None else f"{'-':>9}"
+        detail = ' '.join(v for v in (source, ident) if v)
+        print(f"    {kind:<9}  {freq_text}  {(band or '-')[:14]:<14}  {count:>6}  "
+              f"{format_time(first)}  {format_time(last)}  {detail}")
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the RF scanner event database')
+    parser.add_argument('database', help='Event database (rf-wideband-scanner.py --events)')
+    parser.add_argument('--since', help="Start time, e.g. '12h', 'yesterday 22:00'")
+    parser.add_argument('--until', help='End time (same formats)')
+    parser.add_argument('--freq', type=float, help='Frequency in MHz')
+    parser.add_argument('--tolerance', type=float, default=50,
+                       help='Frequency match tolerance in kHz (default: 50)')
+    parser.add_argument('--band', help="Band name, e.g. '433 MHz ISM'")
+    parser.add_argument('--kind', choices=KINDS, help='Only this kind of event')
+    parser.add_argument('--source', help='rtl_433 model/id or ADS-B callsign/ICAO (substring)')
+    parser.add_argument('--summary', action='store_true',
+                       help='Group into distinct emitters instead of listing events')
+    parser.add_argument('--limit', type=int, default=50, help='Maximum rows (default: 50)')
+    parser.add_argument('--oldest-first', action='store_true', help='List in time order')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.database):
+        print(f"ERROR: Database not found: {args.database}")
+        sys.exit(1)
+
+    try:
+        args.since, since_clock = parse_time(args.since) if args.since else (None, False)
+        args.until, until_clock = parse_time(args.until) if args.until else (None, False)
+    except ValueError as e:
+        print(f"ERROR: Invalid time: {e}")
+        sys.exit(1)
+    if args.since is not None and args.until is not None and args.until <= args.since:
+        if not (since_clock and until_clock):
+            print("ERROR: --until must be later than --since")
+            sys.exit(1)
+        # '--since 22:00 --until 06:00' runs past midnight
+        args.until += 86400
+
+    db = sqlite3.connect(f'file:{args.database}?mode=ro', uri=True)
+    clause, params = build_query(args)
+
+    started = time.perf_counter()
+    try:
+        if args.summary:
+            count = print_summary(db, clause, params, args.limit)
+        else:
+            count = print_events(db, clause, params, args.limit, args.oldest_first)
+    except sqlite3.Error as e:
+        print(f"ERROR: Query failed: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+
+    span = ''
+    if args.since is not None:
+        span = f" from {format_time(args.since)}"
+    if args.until is not None:
+        span += f" to {format_time(args.until)}"
+    print(f"\n[*] {count} row(s){span} in {elapsed * 1e3:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -37,6 +37,11 @@ show_menu() {
     echo "│ 19. Update CatSniffer firmware                        │"
     echo "└────────────────────────────────────────────────────────┘"
     echo ""
+    echo "┌─ DEVICES ──────────────────────────────────────────────┐"
+    echo "│ 20. Device status (leases, queue, utilization)        │"
+    echo "│ 21. Scanner daemon (start / status / stop)            │"
+    echo "└────────────────────────────────────────────────────────┘"
+    echo ""
     echo "  0. Exit"
     echo ""
 }
@@ -104,6 +109,31 @@ while true; do
         19)
             /home/dragon/bin/catsniffer-firmware.sh
             ;;
+        20)
+            /usr/bin/python3 /home/dragon/bin/rf-device-arbiter.py status
+            echo ""
+            read -p "Press Enter to continue..."
+            ;;
+        21)
+            if /usr/bin/python3 /home/dragon/bin/rf-scanner-client.py status; then
+                echo ""
+                read -p "Stop the scanner daemon? (y/n): " stop
+                if [ "$stop" = "y" ] || [ "$stop" = "Y" ]; then
+                    pkill -TERM -f "rf-wideband-scanner.py --daemon"
+                    echo "Scanner daemon stopped."
+                fi
+            else
+                echo "Starting the scanner daemon in the background..."
+                nohup /usr/bin/python3 /home/dragon/bin/rf-wideband-scanner.py --daemon \
+                    --events /home/dragon/rf_events.db --metrics-port 9109 \
+                    > /home/dragon/rf-scanner-daemon.log 2>&1 &
+                sleep 2
+                echo "Log: /home/dragon/rf-scanner-daemon.log"
+                echo "Menu scans, decodes and monitoring now go through the daemon."
+            fi
+            echo ""
+            read -p "Press Enter to continue..."
+            ;;
         0)
             echo "Exiting..."
             exit 0
@@ -0,0 +1,254 @@
+#!/usr/bin/python3
+"""
+RF Scanner Benchmark
+Times each stage of the rf-wideband-scanner.py sweep pipeline on synthetic
+rtl_power output from fake-rtl-power.py, so changes can be measured at
+full 24 MHz - 1.7 GHz sweep sizes without an RTL-SDR attached.
+
+Stages, per sweep:
+  parse     rtl_power CSV lines -> rows
+  stack     rows grouped into per-bin-count matrices
+  floor     noise floor of every row
+  detect    thresholding and clustering into signals
+  bands     band plan lookup of every signal
+  baseline  EWMA new-signal diff
+
+Results can be saved as JSON and compared against an earlier run; the
+comparison exits 1 when any stage's median latency regressed.
+
+Examples:
+  rf-scanner-bench.py --output before.json
+  rf-scanner-bench.py --bins 100000 --emitters 2000 --compare before.json
+"""
+
+import sys
+import os
+import argparse
+import importlib.util
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: numpy not available")
+    print("Install with: sudo apt install python3-numpy")
+    sys.exit(1)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STAGES = ('parse', 'stack', 'floor', 'detect', 'bands', 'baseline')
+REGRESSION_THRESHOLD = 0.10  # fractional slowdown of a stage's p50 that fails --compare
+
+
+def load_script(name, filename):
+    """Import one of the hyphenated sibling scripts as a module"""
+    path = os.path.join(SCRIPT_DIR, filename)
+    if not os.path.exists(path):
+        print(f"ERROR: {filename} not found next to this script")
+        sys.exit(1)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def git_revision():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR,
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() or None
+
+
+def generate_sweeps(fake, args):
+    """CSV lines for every sweep, generated up front so it isn't timed"""
+    start, end = args.start * 1e6, args.end * 1e6
+    bin_size = (end - start) / args.bins
+    spectrum = fake.SyntheticSpectrum(
+        emitters_per_ghz=args.emitters / ((end - start) / 1e9),
+        noise=args.noise, drift=args.drift, seed=args.seed,
+        start_freq=start, end_freq=end)
+    hops = fake.plan_hops(start, end, bin_size)
+    now = datetime.now()
+    return [fake.sweep_lines(spectrum, hops, bin_size, now) for _ in range(args.sweeps)]
+
+
+def run_sweep(scanner, lines, baseline, plan):
+    """Push one sweep through the pipeline; returns seconds per stage and signals"""
+    times = {}
+
+    t0 = time.perf_counter()
+    rows = [row for row in map(scanner.parse_rtl_power_line, lines) if row]
+    t1 = time.perf_counter()
+    times['parse'] = t1 - t0
+
+    stacks = scanner.stack_sweep(rows)
+    t2 = time.perf_counter()
+    times['stack'] = t2 - t1
+
+    floors = [scanner.estimate_noise_floor(matrix) for _, _, matrix in stacks]
+    t3 = time.perf_counter()
+    times['floor'] = t3 - t2
+
+    signals = scanner.find_signals(stacks, floors)
+    t4 = time.perf_counter()
+    times['detect'] = t4 - t3
+
+    plan.lookup_many([s['frequency'] for s in signals])
+    t5 = time.perf_counter()
+    times['bands'] = t5 - t4
+
+    alerts = baseline.update(rows)
+    times['baseline'] = time.perf_counter() - t5
+
+    return times, len(rows), len(signals), len(alerts)
+
+
+def summarize(samples, rows, bins):
+    """Latency statistics for one stage from its per-sweep seconds"""
+    samples = np.array(samples)
+    total = samples.sum()
+    return {
+        'mean_ms': float(samples.mean() * 1e3),
+        'p50_ms': float(np.percentile(samples, 50) * 1e3),
+        'p95_ms': float(np.percentile(samples, 95) * 1e3),
+        'rows_per_s': float(rows * len(samples) / total) if total else None,
+        'bins_per_s': float(bins * len(samples) / total) if total else None,
+    }
+
+
+def benchmark(scanner, sweeps, args, plan):
+    samples = {stage: [] for stage in STAGES + ('total',)}
+    counts = {}
+
+    for _ in range(args.repeat):
+        # A fresh baseline per pass, so every pass sees the same warm-up
+        baseline = scanner.SpectrumBaseline(args.start * 1e6, args.end * 1e6,
+                                            (args.end - args.start) * 1e6 / args.bins)
+        signals = alerts = 0
+        for lines in sweeps:
+            times, rows, found, alerted = run_sweep(scanner, lines, baseline, plan)
+            for stage, seconds in times.items():
+                samples[stage].append(seconds)
+            samples['total'].append(sum(times.values()))
+            signals += found
+            alerts += alerted
+        counts = {'rows': rows, 'signals': signals, 'alerts': alerts}
+
+    rows = counts['rows']
+    return {stage: summarize(values, rows, args.bins) for stage, values in samples.items()}, counts
+
+
+def print_results(results):
+    print(f"    {'STAGE':<9}  {'MEAN ms':>9}  {'P50 ms':>9}  {'P95 ms':>9}  {'ROWS/s':>11}  {'BINS/s':>13}")
+    for stage in STAGES + ('total',):
+        r = results[stage]
+        if stage == 'total':
+            print(f"    {'-' * 70}")
+        print(f"    {stage:<9}  {r['mean_ms']:9.3f}  {r['p50_ms']:9.3f}  {r['p95_ms']:9.3f}  "
+              f"{r['rows_per_s'] or 0:11.0f}  {r['bins_per_s'] or 0:13.0f}")
+
+
+def compare(results, params, path, threshold):
+    """Print per-stage p50 changes against a saved run; True if any stage regressed"""
+    try:
+        with open(path) as f:
+            old = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Cannot read {path}: {e}")
+        sys.exit(1)
+
+    print(f"\n[*] Compared with {path} (rev {old.get('git') or '?'}, {old.get('date', '?')})")
+    changed = [k for k in params if old.get('params', {}).get(k) != params[k]]
+    if changed:
+        print(f"[!] Parameters differ: {', '.join(changed)} - timings are not like for like")
+
+    regressed = []
+    for stage in STAGES + ('total',):
+        before = old.get('stages', {}).get(stage)
+        if not before or not before.get('p50_ms'):
+            continue
+        now = results[stage]['p50_ms']
+        ratio = now / before['p50_ms']
+        flag = ''
+        if ratio > 1.0 + threshold:
+            flag = '  REGRESSION'
+            regressed.append(stage)
+        print(f"    {stage:<9}  {before['p50_ms']:9.3f} -> {now:9.3f} ms  ({(ratio - 1) * 100:+6.1f}%){flag}")
+
+    if regressed:
+        print(f"[!] Slower by more than {threshold * 100:.0f}%: {', '.join(regressed)}")
+    else:
+        print("[*] No stage regressed")
+    return bool(regressed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the RF scanner sweep pipeline')
+    parser.add_argument('--start', type=float, default=24, help='Sweep start in MHz (default: 24)')
+    parser.add_argument('--end', type=float, default=1700, help='Sweep end in MHz (default: 1700)')
+    parser.add_argument('--bins', type=int, default=16760,
+                       help='FFT bins per sweep (default: 16760, i.e. 100 kHz over 24-1700 MHz)')
+    parser.add_argument('--emitters', type=int, default=70, help='Carriers in the sweep range (default: 70)')
+    parser.add_argument('--noise', type=float, default=1.5, help='Noise standard deviation in dB (default: 1.5)')
+    parser.add_argument('--drift', type=float, default=0.0, help='Emitter drift in Hz per sweep (default: 0)')
+    parser.add_argument('--sweeps', type=int, default=20, help='Synthetic sweeps to generate (default: 20)')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over the sweeps (default: 3)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    parser.add_argument('--band-plan', default=os.path.join(SCRIPT_DIR, 'bandplans', 'default.csv'),
+                       help='Band plan CSV for the lookup stage')
+    parser.add_argument('--output', metavar='FILE', help='Save the results as JSON')
+    parser.add_argument('--compare', metavar='FILE', help='Compare with a saved JSON result')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD * 100,
+                       help=f'Percent slowdown counted as a regression (default: {REGRESSION_THRESHOLD * 100:.0f})')
+
+    args = parser.parse_args()
+
+    if args.end <= args.start or args.bins < 1 or args.sweeps < 1 or args.repeat < 1:
+        print("ERROR: Need --end > --start and positive --bins, --sweeps and --repeat")
+        sys.exit(1)
+
+    scanner = load_script('rf_wideband_scanner', 'rf-wideband-scanner.py')
+    fake = load_script('fake_rtl_power', 'fake-rtl-power.py')
+    plan = scanner.BandPlan.load(args.band_plan) if os.path.exists(args.band_plan) else scanner.BAND_PLAN
+
+    params = {key: getattr(args, key) for key in
+              ('start', 'end', 'bins', 'emitters', 'noise', 'drift', 'sweeps', 'repeat', 'seed')}
+
+    print(f"[*] Generating {args.sweeps} sweep(s): {args.start:.0f} - {args.end:.0f} MHz, "
+          f"{args.bins} bins, {args.emitters} emitters, noise {args.noise} dB, drift {args.drift:.0f} Hz")
+    started = time.perf_counter()
+    sweeps = generate_sweeps(fake, args)
+    print(f"[*] {len(sweeps[0])} rows per sweep, generated in {time.perf_counter() - started:.1f}s")
+
+    print(f"[*] Timing {args.repeat} pass(es) of {args.sweeps} sweep(s)\n")
+    results, counts = benchmark(scanner, sweeps, args, plan)
+    print_results(results)
+    print(f"\n[*] Last pass: {counts['signals']} signal(s), {counts['alerts']} baseline alert(s)")
+
+    if args.output:
+        report = {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'git': git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'params': params,
+            'counts': counts,
+            'stages': results,
+        }
+        tmp = args.output + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp, args.output)
+        print(f"[*] Results saved to {args.output}")
+
+    if args.compare and compare(results, params, args.compare, args.threshold / 100):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/python3
+"""
+RF Scanner Client
+Thin front end for a resident rf-wideband-scanner.py --daemon: sends a
+request over its Unix socket and prints the scanner's output as it streams
+back, so menu actions start at once and share the daemon's live baseline.
+
+When no daemon is running the scanner is started directly with the
+equivalent options (plus anything after '--'), as the menus used to do.
+
+Examples:
+  rf-scanner-client.py scan --threshold 10
+  rf-scanner-client.py decode 433.92 --duration 60
+  rf-scanner-client.py monitor -- --events /home/dragon/rf_events.db
+  rf-scanner-client.py status
+"""
+
+import sys
+import os
+import argparse
+import json
+import socket
+
+SCANNER_SOCKET = os.environ.get('RF_SCANNER_SOCKET', '/tmp/rf-scanner.sock')
+SCANNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rf-wideband-scanner.py')
+
+
+def connect(socket_path):
+    """Socket connected to the daemon, or None if none is listening"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def request(sock, message):
+    """Send one request, echo streamed output, return the final reply"""
+    sock.sendall(json.dumps(message).encode() + b'\n')
+    with sock.makefile('rb') as reader:
+        for line in reader:
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                continue
+            if 'output' in reply:
+                sys.stdout.write(reply['output'])
+                sys.stdout.flush()
+                continue
+            return reply
+    return {'ok': False, 'error': 'scanner daemon closed the connection'}
+
+
+def run_scanner(options, extra):
+    """No daemon: run the scanner in this process's place"""
+    argv = [sys.executable, SCANNER] + options + extra
+    os.execv(sys.executable, argv)
+
+
+def choose_and_decode(sock_path, detections):
+    """Same selection prompt as the scanner's interactive decoder"""
+    if not detections:
+        print("\n[!] No signals detected")
+        return
+
+    print("\n" + "=" * 80)
+    print("DETECTED SIGNALS")
+    print("=" * 80)
+
+    detections.sort(key=lambda x: x['strength'], reverse=True)
+    for i, det in enumerate(detections, 1):
+        bandwidth = det['bandwidth']
+        bandwidth = f"{bandwidth/1e6:.2f} MHz" if bandwidth >= 1e6 else f"{bandwidth/1e3:.0f} kHz"
+        print(f"[{i}] {det['frequency']/1e6:.3f} MHz ({det['band']})")
+        print(f"    Strength: {det['strength']:.1f} dB")
+        print(f"    Bandwidth: {bandwidth}")
+        print(f"    Decoder: {det['decoder']}")
+        print()
+
+    print("[0] Exit")
+    print()
+
+    try:
+        print("Prefix with h to hop one rtl_433 over the ISM signals (h alone: all of them)")
+        choice = input("Select signal(s) to decode (number, or e.g. 1,3,4): ").strip()
+        if choice == '0' or not choice:
+            return
+
+        hop = choice[:1].lower() == 'h'
+        if hop:
+            choice = choice[1:]
+        indices = [int(c) - 1 for c in choice.split(',') if c.strip()]
+        if hop and not indices:
+            indices = [i for i, det in enumerate(detections) if det['decoder'] == 'rtl_433']
+        if not indices or not all(0 <= idx < len(detections) for idx in indices):
+            print("[!] Invalid selection")
+            return
+
+        duration = input(f"Capture duration in seconds [30]: ").strip()
+        duration = int(duration) if duration else 30
+    except (ValueError, KeyboardInterrupt, EOFError):
+        print("\n[*] Cancelled")
+        return
+
+    targets = [{key: detections[idx][key] for key in ('frequency', 'decoder', 'strength')}
+               for idx in indices]
+    send(sock_path, {'op': 'decode', 'targets': targets, 'duration': duration, 'hop': hop})
+
+
+def send(socket_path, message):
+    """One request to the daemon; returns the reply, or None with no daemon
+
+    A request stopped with Ctrl+C returns {'ok': True, 'cancelled': True}.
+    """
+    sock = connect(socket_path)
+    if sock is None:
+        return None
+    try:
+        reply = request(sock, message)
+    except KeyboardInterrupt:
+        # Closing the connection is how a client cancels
+        print("\n[*] Stopped")
+        return {'ok': True, 'cancelled': True}
+    finally:
+        sock.close()
+    if not reply.get('ok'):
+        print(f"ERROR: {reply.get('error', 'request failed')}")
+    return reply
+
+
+def print_status(status):
+    uptime = int(status['uptime'])
+    print(f"[*] Scanner daemon pid {status['pid']}, up "
+          f"{uptime // 3600:02d}:{uptime % 3600 // 60:02d}:{uptime % 60:02d}")
+    print(f"    Job:       {status['job'] or 'idle'} ({status['jobs']} run, "
+          f"{status['clients']} client(s) connected)")
+    print(f"    Devices:   {', '.join(str(d) for d in status['devices'])}")
+    baseline = status['baseline']
+    print(f"    Baseline:  {baseline['cells']} bins, {baseline['sweeps']} sweep(s), "
+          f"{baseline['alerts']} alert(s)")
+    print(f"    Threshold: {status['threshold']} dB")
+    print(f"    rtl_433:   {status['rtl433_devices']} device(s) seen")
+    if status.get('tracks') is not None:
+        print(f"    Tracks:    {status['tracks']} emitter(s) followed")
+    print(f"    Metrics:   {status['metrics']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Control a resident RF scanner daemon')
+    parser.add_argument('--socket', default=SCANNER_SOCKET,
+                        help=f'Daemon control socket (default: {SCANNER_SOCKET})')
+    sub = parser.add_subparsers(dest='command')
+
+    scan_parser = sub.add_parser('scan', help='Quick scan all bands, then offer to decode')
+    scan_parser.add_argument('--threshold', type=int, default=10, help='Signal threshold in dB')
+    scan_parser.add_argument('--stream', action='store_true', help='Print detections hop by hop')
+    scan_parser.add_argument('--no-decode', action='store_true', help="Don't offer to decode")
+
+    decode_parser = sub.add_parser('decode', help='Decode a frequency')
+    decode_parser.add_argument('freq', type=float, help='Frequency in MHz')
+    decode_parser.add_argument('--decoder', choices=['rtl_433', 'rtl_fm', 'catsniffer', 'dump1090'],
+                               help='Force specific decoder')
+    decode_parser.add_argument('--duration', type=int, default=30, help='Decode duration in seconds')
+
+    monitor_parser = sub.add_parser('monitor', help='Scan repeatedly and alert on new signals')
+    monitor_parser.add_argument('--threshold', type=int, default=10, help='Signal threshold in dB')
+    monitor_parser.add_argument('--interval', type=float, default=30,
+                                help='Seconds between scans (default: 30)')
+
+    sub.add_parser('status', help='Show what the daemon is doing')
+
+    # Anything after '--' is for the scanner when it has to be run directly
+    argv = sys.argv[1:]
+    extra = []
+    if '--' in argv:
+        extra = argv[argv.index('--') + 1:]
+        argv = argv[:argv.index('--')]
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+        status = send(args.socket, {'op': 'status'})
+        if status is None:
+            print(f"[*] No scanner daemon running on {args.socket}")
+            return 1
+        if status.get('ok'):
+            print_status(status)
+        return 0 if status.get('ok') else 1
+
+    if args.command == 'scan':
+        reply = send(args.socket, {'op': 'scan', 'threshold': args.threshold, 'stream': args.stream})
+        if reply is None:
+            options = ['--threshold', str(args.threshold)] + (['--stream'] if args.stream else [])
+            run_scanner(options, extra)
+        if reply.get('ok') and not reply.get('cancelled') and not args.no_decode:
+            choose_and_decode(args.socket, reply['detections'])
+        return 0 if reply.get('ok') else 1
+
+    if args.command == 'decode':
+        target = {'frequency': int(args.freq * 1e6), 'decoder': args.decoder}
+        reply = send(args.socket, {'op': 'decode', 'targets': [target], 'duration': args.duration})
+        if reply is None:
+            options = ['--freq', str(args.freq), '--duration', str(args.duration)]
+            if args.decoder:
+                options += ['--decoder', args.decoder]
+            run_scanner(options, extra)
+        return 0 if reply.get('ok') else 1
+
+    if args.command == 'monitor':
+        reply = send(args.socket, {'op': 'monitor', 'threshold': args.threshold,
+                                   'interval': args.interval})
+        if reply is None:
+            run_scanner(['--monitor', '--threshold', str(args.threshold),
+                         '--interval', str(args.interval)], extra)
+        return 0 if reply.get('ok') else 1
+
+    parser.print_help()
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -38,9 +38,9 @@ echo "Decoding ${freq} MHz for ${duration} seconds..."
 echo ""
 
 if [ -z "$decoder" ]; then
-    /usr/bin/python3 /home/dragon/bin/rf-wideband-scanner.py --freq $freq --duration $duration
+    /usr/bin/python3 /home/dragon/bin/rf-scanner-client.py decode $freq --duration $duration
 else
-    /usr/bin/python3 /home/dragon/bin/rf-wideband-scanner.py --freq $freq --decoder $decoder --duration $duration
+    /usr/bin/python3 /home/dragon/bin/rf-scanner-client.py decode $freq --decoder $decoder --duration $duration
 fi
 
 echo ""
@@ -16,7 +16,13 @@ echo "Press Ctrl+C to stop"
 echo ""
 sleep 2
 
-/usr/bin/python3 /home/dragon/bin/rf-wideband-scanner.py --monitor --threshold $threshold
+# With the scanner daemon running this shares its live baseline; the options
+# after -- are only used when the scanner has to be started directly
+/usr/bin/python3 /home/dragon/bin/rf-scanner-client.py monitor --threshold $threshold -- \
+    --events /home/dragon/rf_events.db --metrics-port 9109
 
+echo ""
+echo "Events saved to /home/dragon/rf_events.db, e.g.:"
+echo "  rf-events.py /home/dragon/rf_events.db --since 12h --summary"
 echo ""
 read -p "Press Enter to close..."
@@ -22,7 +22,8 @@ echo ""
 echo "Starting scan..."
 echo ""
 
-/usr/bin/python3 /home/dragon/bin/rf-wideband-scanner.py --scan --threshold $threshold
+# Uses the resident scanner daemon when one is running, else starts the scanner
+/usr/bin/python3 /home/dragon/bin/rf-scanner-client.py scan --threshold $threshold
 
 echo ""
 read -p "Press Enter to close..."
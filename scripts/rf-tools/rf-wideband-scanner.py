@@ -7,14 +7,41 @@ and automatically dispatches to appropriate decoder based on frequency.
 
 import sys
 import os
+import asyncio
+import atexit
+import csv
+import heapq
+import http.server
+import importlib.util
+import itertools
+import json
+import math
+import queue
+import re
+import select
+import struct
 import subprocess
 import time
 import signal
+import shutil
+import socket
+import sqlite3
 import tempfile
-from collections import defaultdict
+import threading
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 
-# Frequency bands and their decoders
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: numpy not installed")
+    print("Install with: python3 -m pip install numpy")
+    sys.exit(1)
+
+# Built-in frequency bands and their decoders, used when no band plan file
+# (bandplans/default.csv next to this script, or --band-plan) is available
 FREQUENCY_BANDS = [
     # Format: (start_freq, end_freq, band_name, decoder, description)
     (24000000, 50000000, "VHF Low", "rtl_fm", "VHF radio, amateur, marine"),
@@ -32,9 +59,225 @@ FREQUENCY_BANDS = [
 # Signal strength threshold (dB above noise floor)
 SIGNAL_THRESHOLD = 10  # Adjust based on environment
 
+# Fraction of the quietest bins in a row averaged into its noise floor
+NOISE_FLOOR_FRACTION = 0.1
+
 # Scanner configuration
 SCAN_INTEGRATION_TIME = 1  # seconds per scan
+MONITOR_INTERVAL = 30  # seconds between fixed-cycle monitor scans
+
+# Per-bin baseline alerting
+BASELINE_ALPHA = 0.05  # EWMA weight of each new sweep
+BASELINE_SIGMA = 4.0  # alert when a bin is this many standard deviations up
+BASELINE_MIN_DB = 6.0  # ... and at least this many dB above its mean
+BASELINE_WARMUP = 3  # sweeps a bin needs before it can alert
+BASELINE_VAR_FLOOR = 1.0  # dB^2, keeps near-constant bins from alerting on noise
+
+# Waterfall history files
+WATERFALL_ROWS = 10000  # sweeps kept per band before the ring wraps
+WATERFALL_DB_RANGE = (-80.0, 40.0)  # uint8 quantization range (~0.5 dB steps)
+
+# Event database
+EVENT_BATCH_ROWS = 500  # rows buffered before a write transaction
+EVENT_BATCH_SECONDS = 2.0  # ... or seconds, whichever comes first
+
+# Signal tracking (--track)
+TRACKER_TOLERANCE = 25000  # Hz a carrier may drift between sweeps and stay one track
+TRACKER_DRIFT_ALPHA = 0.3  # how quickly a channel's center follows its detections
+TRACKER_HOP_SPAN = 2000000  # Hz from a quiet track within which a new signal counts as a hop
+TRACKER_HOP_GAP = 3  # sweeps a track may be missing and still take a hop
+TRACKER_MAX_CHANNELS = 64  # hop set size limit per track
+TRACKER_EXPIRE = 900  # seconds unseen before a track is dropped
+
+# Instrumentation
+METRICS_INTERVAL = 60  # seconds between summary lines while monitoring
+
+# rtl_433 device table
+RTL433_MAX_DEVICES = 5000  # least recently heard devices are dropped past this
+RTL433_SNAPSHOT_INTERVAL = 60  # seconds between device table snapshots
+RTL433_HOP_SPAN = 200000  # Hz; detections this close share one tuning (rtl_433 samples 250 kHz)
+RTL433_HOP_CYCLE = 60  # seconds for one pass over every hop frequency
+RTL433_MIN_DWELL = 5  # shortest hop interval given to a frequency
+
+# Foreground decoder output
+DECODE_REFRESH = 2  # console summary redraws per second (0: echo every line)
+DECODE_TAIL = 10  # recent devices/lines shown in the summary
+
+# Auto-decode result cache: known, unchanged emitters aren't decoded again
+DECODE_CACHE_TTL = 1800  # seconds a decode result stands for its emitter
+DECODE_CACHE_MISS_TTL = 300  # ... when the decoder got nothing out of it
+DECODE_CACHE_SPAN = 50000  # Hz per frequency cell
+DECODE_CACHE_POWER_STEP = 6  # dB per power bucket
+DECODE_CACHE_MAX = 1000  # least recently used emitters are dropped past this
+
+# Adaptive monitor limits (seconds)
+MIN_DWELL = 1  # rtl_power integrates in whole seconds
+MAX_DWELL = 5
+MIN_REVISIT = 5
+MAX_REVISIT = 300
 FFT_BIN_SIZE = 100000  # 100 kHz bins
+STREAM_CHUNK_ROWS = 64  # rows per detection pass when streaming (--stream)
+RTL_POWER_CMD = 'rtl_power'
+
+# Sweep planner cost model (RTL2832U + R820T, measured roughly on a Pi 4)
+TUNER_USABLE_BANDWIDTH = 2400000  # Hz covered per rtl_power hop
+RTL_POWER_STARTUP_TIME = 1.5  # seconds to open the dongle and settle the tuner
+RTL_POWER_HOP_TIME = 0.05  # seconds per hop: retune, settle and one buffer
+
+# CatSniffer 2.4 GHz channel survey
+CATSNIFFER_TOOL = '/home/dragon/Tools/CatSniffer-Tools/pycatsniffer_bv3/cat_sniffer.py'
+CATSNIFFER_PORT = '/dev/ttyACM1'
+CATSNIFFER_NOISE_FLOOR = -100  # dBm; survey strength is RSSI above this
+SURVEY_DWELL = 2.0  # longest listen per channel (seconds)
+SURVEY_IDLE = 0.5  # seconds without a packet before a channel counts as idle
+SURVEY_BUSY_PACKETS = 10  # packets after which a channel counts as busy
+SURVEY_STARTUP = 5  # seconds cat_sniffer.py may take to start streaming
+
+# Highest frequency an RTL-SDR (R820T) tunes to
+RTL_MAX_FREQ = 1700000000
+
+# --full sweeps the whole tuning range instead of the scan bands
+FULL_SWEEP_START = 24000000
+FULL_SWEEP_CHUNK = 24000000  # Hz of spectrum processed at a time
+FULL_SWEEP_KEEP = 50  # strongest signals kept for the decode menu
+
+DEFAULT_BAND_PLAN = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 'bandplans', 'default.csv')
+
+UNKNOWN_BAND = {'decoder': 'rtl_fm', 'band': 'Unknown', 'description': 'Generic FM demod'}
+
+# Event database opened with --events (an EventStore), or None
+EVENT_STORE = None
+
+# Foreground decoder console refresh rate and raw line log (--refresh, --decode-log)
+REFRESH = DECODE_REFRESH
+DECODE_LOG = None
+
+# Survey the CatSniffer's channels in a quick scan (off with --no-survey)
+CATSNIFFER_SURVEY = True
+
+# SignalTracker when --track is on, or None
+TRACKER = None
+
+# Auto-decode ISM alerts with one hopping rtl_433 (--hop)
+RTL433_HOP = False
+
+# rtl_power capture being written (--record) or played back (--replay)
+RECORDER = None  # CaptureRecorder
+REPLAY = None  # CaptureReplay, replaces rtl_power entirely
+
+# Device arbitration (rf-device-arbiter.py next to this script): sweeps give
+# way to decoders, which give way to interactive captures (priority 10)
+ARBITER = None  # client module once loaded
+SWEEP_PRIORITY = 0
+DECODE_PRIORITY = 5
+
+# Control socket of the resident scanner (--daemon, rf-scanner-client.py)
+SCANNER_SOCKET = os.environ.get('RF_SCANNER_SOCKET', '/tmp/rf-scanner.sock')
+
+
+class BandPlan:
+    """Interval index over a (possibly overlapping) frequency allocation table
+
+    The bands are flattened once into sorted, non-overlapping elementary
+    intervals, each labelled with its highest-priority covering band, so a
+    lookup is one bisection however many allocations are loaded.
+    """
+
+    def __init__(self, bands):
+        # bands: dicts with start, end (inclusive Hz), name, decoder,
+        # priority, scan and description
+        self.bands = list(bands)
+
+        # Sweep line over band edges; the heap holds the active bands ordered
+        # by (-priority, width, load order) with lazy removal of ended ones
+        events = []
+        for idx, band in enumerate(self.bands):
+            events.append((float(band['start']), 1, idx))
+            # Ends are inclusive, so the band stops just above its end
+            events.append((float(np.nextafter(band['end'], np.inf)), 0, idx))
+        events.sort()
+
+        edges, winners = [], []
+        active, ended = [], set()
+        i = 0
+        while i < len(events):
+            edge = events[i][0]
+            while i < len(events) and events[i][0] == edge:
+                _, is_start, idx = events[i]
+                if is_start:
+                    band = self.bands[idx]
+                    heapq.heappush(active, (-band['priority'], band['end'] - band['start'], idx))
+                else:
+                    ended.add(idx)
+                i += 1
+            while active and active[0][2] in ended:
+                heapq.heappop(active)
+            edges.append(edge)
+            winners.append(active[0][2] if active else -1)
+
+        self.edges = np.array(edges, dtype=np.float64)
+        self.winners = np.array(winners, dtype=np.int64)
+
+    @classmethod
+    def from_tuples(cls, bands):
+        """Build a plan from FREQUENCY_BANDS-style tuples"""
+        return cls({'start': start, 'end': end, 'name': name, 'decoder': decoder,
+                    'priority': 0, 'scan': True, 'description': description}
+                   for start, end, name, decoder, description in bands)
+
+    @classmethod
+    def load(cls, path):
+        """Load a band plan CSV (see bandplans/default.csv for the columns)"""
+        with open(path, newline='') as f:
+            lines = [line for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+        bands = []
+        for row in csv.DictReader(lines):
+            bands.append({
+                'start': int(round(float(row['start_mhz']) * 1e6)),
+                'end': int(round(float(row['end_mhz']) * 1e6)),
+                'name': row['name'].strip(),
+                'decoder': (row.get('decoder') or '').strip() or UNKNOWN_BAND['decoder'],
+                'priority': int(row.get('priority') or 0),
+                'scan': (row.get('scan') or '0').strip() in ('1', 'yes', 'true'),
+                'description': (row.get('description') or '').strip()
+            })
+        return cls(bands)
+
+    def lookup_many(self, freqs):
+        """Index into self.bands of the winning band per frequency (-1 = none)"""
+        freqs = np.asarray(freqs, dtype=np.float64)
+        pos = np.searchsorted(self.edges, freqs, side='right') - 1
+        result = np.full(freqs.shape, -1, dtype=np.int64)
+        inside = pos >= 0
+        result[inside] = self.winners[pos[inside]]
+        return result
+
+    def decoder_info(self, idx):
+        """Decoder dict for a band index as returned by lookup_many"""
+        if idx < 0:
+            return dict(UNKNOWN_BAND)
+        band = self.bands[idx]
+        return {'decoder': band['decoder'], 'band': band['name'], 'description': band['description']}
+
+    def lookup(self, freq):
+        """Decoder dict for a single frequency"""
+        return self.decoder_info(int(self.lookup_many([freq])[0]))
+
+    def scan_bands(self, max_freq=None):
+        """Bands marked for sweeping, as FREQUENCY_BANDS-style tuples"""
+        return [(b['start'], b['end'], b['name'], b['decoder'], b['description'])
+                for b in self.bands
+                if b['scan'] and (max_freq is None or b['end'] <= max_freq)]
+
+
+BAND_PLAN = BandPlan.from_tuples(FREQUENCY_BANDS)
+
+
+def rtl_scan_bands():
+    """Bands to sweep with rtl_power (24 MHz - 1.7 GHz)"""
+    return BAND_PLAN.scan_bands(RTL_MAX_FREQ)
 
 
 class SignalDetector:
@@ -59,126 +302,2377 @@ class SignalDetector:
 
     def get_decoder_for_frequency(self, freq):
         """Determine appropriate decoder based on frequency"""
-        for start, end, band_name, decoder, description in FREQUENCY_BANDS:
-            if start <= freq <= end:
-                return {
-                    'decoder': decoder,
-                    'band': band_name,
-                    'description': description
-                }
-        return {'decoder': 'rtl_fm', 'band': 'Unknown', 'description': 'Generic FM demod'}
+        return BAND_PLAN.lookup(freq)
 
+    def get_decoders_for_frequencies(self, freqs):
+        """Batch version of get_decoder_for_frequency for a list of frequencies"""
+        return [BAND_PLAN.decoder_info(idx) for idx in BAND_PLAN.lookup_many(freqs).tolist()]
 
-def scan_frequency_range(start_freq, end_freq, integration_time=1):
-    """Scan frequency range using rtl_power"""
-    print(f"[*] Scanning {start_freq/1e6:.1f} - {end_freq/1e6:.1f} MHz...")
 
-    # Create temporary file for rtl_power output
-    temp_file = tempfile.NamedTemporaryFile(mode='w+', suffix='.csv', delete=False)
-    temp_file.close()
+class IntegrationMeter:
+    """Accounts how much monitor wall time rtl_power actually spends integrating"""
+
+    def __init__(self, devices=1):
+        self.started = time.monotonic()
+        self.devices = devices
+        self.integrating = 0.0
+        self.startup = 0.0
+        self.spawns = 0
+        self.active = []
+        self.lock = threading.Lock()
+
+    def begin(self, interval):
+        """Record an rtl_power spawn; returns a handle for the other calls"""
+        run = {'spawned': time.monotonic(), 'first_row': None, 'interval': interval}
+        with self.lock:
+            self.spawns += 1
+            self.active.append(run)
+        return run
+
+    def first_row(self, run):
+        if run['first_row'] is None:
+            run['first_row'] = time.monotonic()
+
+    def end(self, run):
+        with self.lock:
+            if any(r is run for r in self.active):
+                self.active = [r for r in self.active if r is not run]
+                startup, integrating = self._split(run, time.monotonic())
+                self.startup += startup
+                self.integrating += integrating
+
+    def _split(self, run, now):
+        """Split a process lifetime into (startup overhead, integration time)"""
+        alive = now - run['spawned']
+        if run['first_row'] is None:
+            return alive, 0.0
+        # The first row covers one integration interval; anything before
+        # that is device open, tuner init and settling
+        startup = max(0.0, run['first_row'] - run['spawned'] - run['interval'])
+        return startup, alive - startup
+
+    def summary(self):
+        """Return (wall seconds, integrating seconds, startup seconds, spawns)"""
+        now = time.monotonic()
+        with self.lock:
+            integrating = self.integrating
+            startup = self.startup
+            for run in self.active:
+                s, i = self._split(run, now)
+                startup += s
+                integrating += i
+            return now - self.started, integrating, startup, self.spawns
+
+    def hardware_seconds(self):
+        """Device-seconds spent in rtl_power so far, startup included"""
+        wall, integrating, startup, spawns = self.summary()
+        return integrating + startup
+
+    def report(self):
+        wall, integrating, startup, spawns = self.summary()
+        # With several dongles the budget is device-seconds, not seconds
+        duty = 100.0 * integrating / (wall * self.devices) if wall > 0 else 0.0
+        return (f"integrating {integrating:.1f}s of {wall:.1f}s wall ({duty:.0f}% duty), "
+                f"{startup:.1f}s startup over {spawns} rtl_power spawn(s)")
+
+
+class StageMetrics:
+    """Monotonic-clock stage timings and event counters for the whole scanner
+
+    Every stage keeps the count, total and longest of its spans; counters
+    only go up. Both are exposed as Prometheus text (serve_metrics) and as
+    a one-line summary, labelled with the node's hostname so a fleet of
+    sensors can share one dashboard.
+    """
+
+    # Reported in pipeline order; other stage names are appended as seen
+    STAGES = ('spawn', 'settle', 'integrate', 'parse', 'detect', 'baseline', 'print', 'cycle')
+    COUNTERS = {
+        'rows': 'rtl_power rows processed',
+        'bins': 'FFT bins processed',
+        'detections': 'Signals detected',
+        'alerts': 'New-signal baseline alerts',
+        'runs': 'rtl_power processes started',
+        'timeouts': 'rtl_power runs killed by the watchdog',
+        'failures': 'rtl_power runs that failed to start or exited with an error',
+    }
+
+    def __init__(self, node=None):
+        self.node = node or socket.gethostname()
+        self.started = time.monotonic()
+        self.stages = {}  # name -> [spans, total seconds, longest span]
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.last_cycle = None
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage):
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.monotonic() - t0)
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            entry = self.stages.setdefault(stage, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            if stage == 'cycle':
+                self.last_cycle = seconds
+
+    def add(self, **counts):
+        with self.lock:
+            for name, n in counts.items():
+                self.counters[name] += n
+
+    def _ordered_stages(self):
+        return [s for s in self.STAGES if s in self.stages] + \
+               sorted(s for s in self.stages if s not in self.STAGES)
+
+    def exposition(self):
+        """Prometheus text format (version 0.0.4)"""
+        with self.lock:
+            stages = {name: list(entry) for name, entry in self.stages.items()}
+            counters = dict(self.counters)
+            last_cycle = self.last_cycle
+        node = self.node.replace('\\', '\\\\').replace('"', '\\"')
+
+        lines = [
+            '# HELP rf_scanner_stage_seconds Time spent in each scanner stage',
+            '# TYPE rf_scanner_stage_seconds summary',
+        ]
+        for name in self._ordered_stages():
+            count, total, longest = stages[name]
+            lines.append(f'rf_scanner_stage_seconds_sum{{node="{node}",stage="{name}"}} {total:.6f}')
+            lines.append(f'rf_scanner_stage_seconds_count{{node="{node}",stage="{name}"}} {count}')
+        lines += ['# HELP rf_scanner_stage_max_seconds Longest single span of each stage',
+                  '# TYPE rf_scanner_stage_max_seconds gauge']
+        for name in self._ordered_stages():
+            lines.append(f'rf_scanner_stage_max_seconds{{node="{node}",stage="{name}"}} {stages[name][2]:.6f}')
+
+        for name, help_text in self.COUNTERS.items():
+            lines += [f'# HELP rf_scanner_{name}_total {help_text}',
+                      f'# TYPE rf_scanner_{name}_total counter',
+                      f'rf_scanner_{name}_total{{node="{node}"}} {counters[name]}']
+
+        if last_cycle is not None:
+            lines += ['# HELP rf_scanner_last_cycle_seconds Duration of the last complete scan cycle',
+                      '# TYPE rf_scanner_last_cycle_seconds gauge',
+                      f'rf_scanner_last_cycle_seconds{{node="{node}"}} {last_cycle:.3f}']
+        lines += ['# HELP rf_scanner_uptime_seconds Seconds since the scanner started',
+                  '# TYPE rf_scanner_uptime_seconds gauge',
+                  f'rf_scanner_uptime_seconds{{node="{node}"}} {time.monotonic() - self.started:.1f}']
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        with self.lock:
+            stages = {name: list(entry) for name, entry in self.stages.items()}
+            c = dict(self.counters)
+            last_cycle = self.last_cycle
+
+        cycles = stages.get('cycle', [0])[0]
+        text = f"{cycles} cycle(s)"
+        if last_cycle is not None:
+            text += f", last {last_cycle:.1f}s"
+        text += (f"; {c['rows']} rows, {c['bins']} bins, {c['detections']} detection(s), "
+                 f"{c['alerts']} alert(s); rtl_power {c['runs']} run(s), "
+                 f"{c['timeouts']} timeout(s), {c['failures']} failure(s)")
+        spent = ' '.join(f"{name} {format_duration(stages[name][1])}" for name in self._ordered_stages()
+                         if name != 'cycle')
+        return text + (f"; {spent}" if spent else '')
+
+
+def format_duration(seconds):
+    if seconds < 1.0:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds:.1f}s"
+
+
+METRICS = StageMetrics()
+
+
+def serve_metrics(port, host='127.0.0.1'):
+    """Serve METRICS at http://host:port/metrics from a background thread"""
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = METRICS.exposition().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # scrapes would drown the scanner output
+
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def report_metrics_periodically(interval=METRICS_INTERVAL):
+    """Print a metrics summary line every interval seconds until exit"""
+    def loop():
+        if isinstance(sys.stdout, DaemonOutput):
+            # A daemon's summaries belong in its log, not in a job's output
+            sys.stdout.claim(None)
+        while True:
+            time.sleep(interval)
+            print(f"[*] Metrics: {METRICS.summary()}")
+
+    threading.Thread(target=loop, daemon=True).start()
+
+
+def load_arbiter():
+    """Load the device arbiter client, or None if it isn't installed"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rf-device-arbiter.py')
+    if not os.path.exists(path):
+        return None
+    spec = importlib.util.spec_from_file_location('rf_device_arbiter', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def request_device(resource, priority=SWEEP_PRIORITY, owner='rf-wideband-scanner'):
+    """Queue for a device with the arbiter; None when arbitration is off"""
+    if ARBITER is None:
+        return None
+    return ARBITER.LeaseRequest(resource, priority, owner)
+
+
+def wait_for_device(request):
+    """Block until a device request is granted; returns the lease or None"""
+    if request is None:
+        return None
+    try:
+        return request.wait()
+    except ARBITER.ArbiterError as e:
+        # e.g. an arbiter configured without this dongle: carry on unarbitrated
+        if not request.cancelled.is_set():
+            print(f"[!] Device arbiter: {e}")
+        return None
+
+
+@contextmanager
+def device_lease(resource, priority=SWEEP_PRIORITY, owner='rf-wideband-scanner'):
+    """Hold a device's lease from the arbiter for the duration of a block"""
+    lease = wait_for_device(request_device(resource, priority, owner))
+    try:
+        yield lease
+    finally:
+        if lease is not None:
+            lease.close()
+
+
+class DevicePool:
+    """RTL-SDR device indices shared by concurrent sweeps and decoders
+
+    Borrowed devices are also leased from the device arbiter, so sweeps
+    wait for other programs using the same dongle instead of failing.
+    """
+
+    def __init__(self, devices=(0,)):
+        self.devices = list(devices)
+        self.free = queue.Queue()
+        for dev in self.devices:
+            self.free.put(dev)
+
+    def __len__(self):
+        return len(self.devices)
+
+    @contextmanager
+    def device(self, priority=SWEEP_PRIORITY):
+        """Borrow a free device index, waiting until one is returned"""
+        dev = self.free.get()
+        try:
+            with device_lease(f'rtlsdr:{dev}', priority):
+                yield dev
+        finally:
+            self.free.put(dev)
+
+
+def parse_rtl_power_line(line):
+    """Parse one rtl_power CSV row into (freq_low, freq_high, freq_step, powers)"""
+    # rtl_power CSV format:
+    # date, time, Hz low, Hz high, Hz step, samples, dB, dB, dB...
+    parts = line.strip().split(',')
+    if len(parts) <= 6:
+        return None
+    try:
+        freq_low = int(parts[2])
+        freq_high = int(parts[3])
+        freq_step = float(parts[4])  # rtl_power prints the step with decimals
+        powers = [float(p) for p in parts[6:]]
+    except (ValueError, IndexError):
+        return None
+    return freq_low, freq_high, freq_step, powers
+
+
+def estimate_noise_floor(matrix, fraction=NOISE_FLOOR_FRACTION):
+    """Mean of the quietest bins of each row of a (rows, bins) power matrix"""
+    k = max(1, int(matrix.shape[1] * fraction))
+    # partition puts the k smallest values of each row first without a full sort
+    return np.partition(matrix, k - 1, axis=1)[:, :k].mean(axis=1)
+
+
+def detect_sweep(rows, cluster=True, threshold=None):
+    """Find bins that stand out from their row's noise floor across a whole sweep
+
+    rows are parsed rtl_power rows; hops with equal bin counts are stacked
+    into one matrix so the noise floor and peak mask are computed in a few
+    array operations instead of a Python loop per bin. With cluster=True
+    runs of adjacent hot bins are merged into one signal per emitter.
+    threshold (dB over the noise floor) defaults to SIGNAL_THRESHOLD.
+    """
+    with METRICS.span('detect'):
+        stacks = stack_sweep(rows)
+        floors = [estimate_noise_floor(matrix) for _, _, matrix in stacks]
+        return find_signals(stacks, floors, cluster, threshold)
+
+
+def stack_sweep(rows):
+    """Group a sweep's rows by bin count into (freq_low, freq_step, matrix) arrays"""
+    groups = defaultdict(list)
+    for row in rows:
+        groups[len(row[3])].append(row)
+
+    return [(np.array([r[0] for r in group], dtype=np.float64),
+             np.array([r[2] for r in group], dtype=np.float64),
+             np.array([r[3] for r in group], dtype=np.float32))
+            for nbins, group in groups.items() if nbins]
+
+
+def find_signals(stacks, floors, cluster=True, threshold=None):
+    """Threshold stacked rows against their noise floors (see detect_sweep)"""
+    threshold = SIGNAL_THRESHOLD if threshold is None else threshold
+    hits = []
+    for (freq_low, freq_step, matrix), floor in zip(stacks, floors):
+        strength = matrix - floor[:, None]
+        row_idx, bin_idx = np.nonzero(strength > threshold)
+        if not len(row_idx):
+            continue
+
+        hits.append((freq_low[row_idx] + bin_idx * freq_step[row_idx],
+                     freq_step[row_idx],
+                     matrix[row_idx, bin_idx],
+                     strength[row_idx, bin_idx],
+                     floor[row_idx]))
+
+    if not hits:
+        return []
+
+    freqs, steps, powers, strengths, floors = (np.concatenate(a) for a in zip(*hits))
+    order = np.argsort(freqs, kind='stable')
+    freqs, steps, powers, strengths, floors = (a[order] for a in (freqs, steps, powers, strengths, floors))
+
+    if cluster:
+        return cluster_bins(freqs, steps, powers, strengths, floors)
+
+    return [
+        {'frequency': f, 'power': p, 'strength': st, 'noise_floor': nf}
+        for f, p, st, nf in zip(freqs.tolist(), powers.tolist(),
+                                strengths.tolist(), floors.tolist())
+    ]
+
+
+def cluster_bins(freqs, steps, powers, strengths, floors):
+    """Collapse runs of adjacent above-threshold bins into one signal each
+
+    Inputs are per-bin arrays sorted by frequency. Each signal reports the
+    center of its occupied bins, the occupied bandwidth, the peak bin and
+    the power integrated over the run.
+    """
+    # A gap of more than one bin step starts a new emitter
+    new_run = np.empty(len(freqs), dtype=bool)
+    new_run[0] = True
+    new_run[1:] = np.diff(freqs) > steps[:-1] * 1.5
+    starts = np.flatnonzero(new_run)
+    ends = np.append(starts[1:], len(freqs)) - 1
+    counts = ends - starts + 1
+
+    # Index of the strongest bin in each run: sort by (run, power) and take
+    # the last element of every run
+    run_id = np.cumsum(new_run) - 1
+    peaks = np.lexsort((powers, run_id))[ends]
+
+    linear = np.power(10.0, powers.astype(np.float64) / 10.0)
+    integrated = 10.0 * np.log10(np.add.reduceat(linear, starts))
+    noise = np.add.reduceat(floors.astype(np.float64), starts) / counts
+
+    center = (freqs[starts] + freqs[ends]) / 2
+    bandwidth = freqs[ends] - freqs[starts] + steps[ends]
+
+    return [
+        {
+            'frequency': f,
+            'power': p,
+            'strength': st,
+            'noise_floor': nf,
+            'peak_frequency': pf,
+            'bandwidth': bw,
+            'integrated_power': ip,
+            'bins': n
+        }
+        for f, p, st, nf, pf, bw, ip, n in zip(
+            center.tolist(), powers[peaks].tolist(), strengths[peaks].tolist(),
+            noise.tolist(), freqs[peaks].tolist(), bandwidth.tolist(),
+            integrated.tolist(), counts.tolist())
+    ]
+
+
+def stream_signals(rows, chunk_rows=STREAM_CHUNK_ROWS, threshold=None):
+    """Detect over streamed rows a chunk at a time, keeping emitters across hops whole
+
+    Each chunk is detected in one detect_sweep pass. A signal reaching the
+    top bin of the chunk may go on in the next hop, so it is held back and
+    the rows it covers are carried into the next chunk; everything below
+    it is yielded as soon as its chunk is in.
+    """
+    pending = []
+    done = -math.inf  # last bin of the highest signal yielded so far
+
+    def last_bin(sig):
+        return sig['frequency'] + (sig['bandwidth'] - sig['bandwidth'] / sig['bins']) / 2
+
+    def flush(final):
+        nonlocal pending, done
+        freq_low, _, step, powers = pending[-1]
+        top = freq_low + (len(powers) - 1) * step
+        carry_from = None
+        for sig in detect_sweep(pending, threshold=threshold):
+            last = last_bin(sig)
+            if last <= done:
+                continue  # yielded from an earlier chunk
+            if not final and last >= top - step / 2:
+                carry_from = sig['frequency'] - (sig['bandwidth'] - sig['bandwidth'] / sig['bins']) / 2
+                break
+            done = last
+            yield sig
+        # Keep the rows the held-back signal covers
+        pending = [] if carry_from is None else [
+            r for r in pending if r[0] + len(r[3]) * r[2] > carry_from]
+
+    for row in rows:
+        if pending and row[0] < pending[-1][0]:
+            # rtl_power wrapped around to the next sweep
+            yield from flush(True)
+            pending, done = [], -math.inf
+        pending.append(row)
+        if len(pending) >= chunk_rows:
+            yield from flush(False)
+    if pending:
+        yield from flush(True)
+
+
+class SpectrumBaseline:
+    """Per-bin EWMA mean/variance of power over a fixed frequency grid
+
+    Memory is three preallocated arrays sized by the grid, whatever the
+    monitoring duration. Each update maps a sweep's bins onto the grid
+    (keeping the strongest reading per cell), flags cells that are
+    significantly above their own history and folds the sweep in, all as
+    array operations.
+    """
+
+    def __init__(self, start_freq, end_freq, step=FFT_BIN_SIZE):
+        self.start_freq = start_freq
+        self.step = float(step)
+        cells = int(math.ceil((end_freq - start_freq) / self.step)) + 1
+        self.mean = np.zeros(cells, dtype=np.float32)
+        self.var = np.zeros(cells, dtype=np.float32)
+        self.count = np.zeros(cells, dtype=np.uint16)
+        self.lock = threading.Lock()
+
+    @property
+    def cells(self):
+        return len(self.mean)
+
+    def _grid(self, rows):
+        """Cell indices and strongest power per touched cell for a set of rows"""
+        groups = defaultdict(list)
+        for row in rows:
+            groups[len(row[3])].append(row)
+
+        idx, power = [], []
+        for nbins, group in groups.items():
+            if not nbins:
+                continue
+            freq_low = np.array([r[0] for r in group], dtype=np.float64)
+            freq_step = np.array([r[2] for r in group], dtype=np.float64)
+            freqs = freq_low[:, None] + np.arange(nbins) * freq_step[:, None]
+            idx.append(np.rint((freqs.ravel() - self.start_freq) / self.step).astype(np.int64))
+            power.append(np.array([r[3] for r in group], dtype=np.float32).ravel())
+        if not idx:
+            return None, None
+
+        idx = np.concatenate(idx)
+        power = np.concatenate(power)
+        inside = (idx >= 0) & (idx < self.cells)
+        idx, power = idx[inside], power[inside]
+        if not len(idx):
+            return None, None
+
+        order = np.argsort(idx, kind='stable')
+        idx, power = idx[order], power[order]
+        first = np.flatnonzero(np.r_[True, idx[1:] != idx[:-1]])
+        return idx[first], np.maximum.reduceat(power, first)
+
+    def update(self, rows):
+        """Fold a sweep into the baseline; returns clustered alerts"""
+        with METRICS.span('baseline'):
+            return self._update(rows)
+
+    def _update(self, rows):
+        idx, power = self._grid(rows)
+        if idx is None:
+            return []
+
+        with self.lock:
+            mean = self.mean[idx]
+            var = self.var[idx]
+            count = self.count[idx]
+
+            excess = power - mean
+            zscore = excess / np.sqrt(var + BASELINE_VAR_FLOOR)
+            alert = (count >= BASELINE_WARMUP) & (zscore > BASELINE_SIGMA) & (excess > BASELINE_MIN_DB)
+
+            # Plain running mean until 1/alpha sweeps have been seen, so the
+            # baseline settles quickly after start-up
+            alpha = np.maximum(BASELINE_ALPHA, 1.0 / (count.astype(np.float32) + 1.0))
+            self.mean[idx] = mean + alpha * excess
+            self.var[idx] = (1.0 - alpha) * (var + alpha * excess * excess)
+            self.count[idx] = np.minimum(count.astype(np.uint32) + 1, np.iinfo(np.uint16).max)
+
+        if not alert.any():
+            return []
+
+        hot = idx[alert]
+        freqs = self.start_freq + hot * self.step
+        return cluster_bins(freqs.astype(np.float64), np.full(len(hot), self.step),
+                            power[alert], excess[alert], mean[alert])
+
+
+class SignalTracker:
+    """Links detections across sweeps into persistent emitter tracks
+
+    Each track owns one or more channels (a hopping emitter collects
+    several). Channels are indexed in a hash grid of tolerance-wide buckets,
+    so a detection only looks at its own and the two neighbouring buckets
+    for a track within drift tolerance, and matching a sweep costs time in
+    proportion to its detections, not detections times tracks. A detection
+    that matches no channel is taken as a hop of a nearby track that went
+    quiet in this sweep, and otherwise starts a new track.
+
+    Tracks keep first/last seen, duty cycle (sweeps with a hit over sweeps
+    that covered the track) and their hop set, and expire once unseen for
+    a while.
+    """
+
+    def __init__(self, tolerance=TRACKER_TOLERANCE, hop_span=TRACKER_HOP_SPAN,
+                 hop_gap=TRACKER_HOP_GAP, expire=TRACKER_EXPIRE):
+        self.tolerance = float(tolerance)
+        self.hop_span = hop_span
+        self.hop_gap = hop_gap
+        self.expire = expire
+        self.tracks = OrderedDict()  # id -> track, least recently seen first
+        self.grid = defaultdict(dict)  # bucket -> {track id: channel index}
+        self.ids = itertools.count(1)
+        self.expired = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def _bucket(self, freq):
+        return int(freq // self.tolerance)
+
+    def _nearest(self, freq, exclude):
+        """(track id, channel index) of the closest channel within tolerance"""
+        best, best_dist = None, self.tolerance
+        bucket = self._bucket(freq)
+        for b in (bucket - 1, bucket, bucket + 1):
+            for tid, ch in self.grid.get(b, {}).items():
+                if tid in exclude:
+                    continue
+                dist = abs(self.tracks[tid]['channels'][ch][0] - freq)
+                if dist <= best_dist:
+                    best, best_dist = (tid, ch), dist
+        return best
+
+    def _hop_candidate(self, freq, matched, start, end):
+        """A recently active track in range that went quiet this sweep, near freq"""
+        best, best_key = None, None
+        for b in range(self._bucket(freq - self.hop_span), self._bucket(freq + self.hop_span) + 1):
+            for tid in self.grid.get(b, {}):
+                track = self.tracks[tid]
+                current = track['channels'][track['current']][0]
+                if (tid in matched or track['missed'] >= self.hop_gap
+                        or not start <= current < end or abs(current - freq) > self.hop_span
+                        or len(track['channels']) >= TRACKER_MAX_CHANNELS):
+                    continue
+                key = (track['missed'], abs(current - freq))
+                if best_key is None or key < best_key:
+                    best, best_key = tid, key
+        return best
+
+    def _add_channel(self, track, freq):
+        track['channels'].append([freq, freq, 0])
+        ch = len(track['channels']) - 1
+        self.grid[self._bucket(freq)][track['id']] = ch
+        return ch
+
+    def _move_channel(self, track, ch, freq):
+        """Re-center a channel, keeping the grid in step"""
+        center = track['channels'][ch][0]
+        if self._bucket(freq) != self._bucket(center):
+            old = self.grid[self._bucket(center)]
+            del old[track['id']]
+            if not old:
+                del self.grid[self._bucket(center)]
+            self.grid[self._bucket(freq)][track['id']] = ch
+        track['channels'][ch][0] = freq
+
+    def _hit(self, track, ch, sig, now):
+        center, origin, hits = track['channels'][ch]
+        # Follow slow drift
+        if hits:
+            self._move_channel(track, ch, center + TRACKER_DRIFT_ALPHA * (sig['frequency'] - center))
+        track['channels'][ch][2] = hits + 1
+
+        if ch != track['current']:
+            track['hops'] += 1
+            track['current'] = ch
+        track['last'] = now
+        track['seen'] += 1
+        track['missed'] = 0
+        track['strength'] = sig['strength']
+        track['peak'] = max(track['peak'], sig['power'])
+        track['bandwidth'] = sig['bandwidth']
+        self.tracks.move_to_end(track['id'])
+
+    def update(self, signals, start, end, now=None):
+        """Fold one sweep of [start, end) Hz into the tracks; returns new track ids"""
+        now = time.time() if now is None else now
+        created = []
+        with self.lock:
+            matched = set()
+            unmatched = []
+            # Strongest first, so the dominant signal claims a shared channel
+            for sig in sorted(signals, key=lambda s: s['strength'], reverse=True):
+                hit = self._nearest(sig['frequency'], matched)
+                if hit is None:
+                    unmatched.append(sig)
+                    continue
+                tid, ch = hit
+                matched.add(tid)
+                self._hit(self.tracks[tid], ch, sig, now)
+
+            for sig in unmatched:
+                tid = self._hop_candidate(sig['frequency'], matched, start, end)
+                if tid is None:
+                    tid = next(self.ids)
+                    self.tracks[tid] = {
+                        'id': tid, 'channels': [], 'current': 0, 'first': now, 'last': now,
+                        'seen': 0, 'observed': 0, 'missed': 0, 'hops': 0,
+                        'strength': sig['strength'], 'peak': sig['power'], 'bandwidth': sig['bandwidth']
+                    }
+                    created.append(tid)
+                track = self.tracks[tid]
+                current = track['current']
+                offset = abs(track['channels'][current][0] - sig['frequency']) if track['channels'] else None
+                if offset is not None and offset < 2 * self.tolerance:
+                    # Just outside the channel: fast drift rather than a hop
+                    self._move_channel(track, current, sig['frequency'])
+                    ch = current
+                else:
+                    ch = self._add_channel(track, sig['frequency'])
+                matched.add(tid)
+                self._hit(track, ch, sig, now)
+
+            # Every track this sweep covered counts one observation
+            for tid, track in self.tracks.items():
+                if start <= track['channels'][track['current']][0] < end:
+                    track['observed'] += 1
+                    if tid not in matched:
+                        track['missed'] += 1
+
+            while self.tracks:
+                tid, track = next(iter(self.tracks.items()))
+                if now - track['last'] < self.expire:
+                    break
+                self._remove(tid)
+        return created
+
+    def _remove(self, tid):
+        track = self.tracks.pop(tid)
+        for center, origin, hits in track['channels']:
+            bucket = self.grid.get(self._bucket(center))
+            if bucket is not None:
+                bucket.pop(tid, None)
+                if not bucket:
+                    del self.grid[self._bucket(center)]
+        self.expired += 1
+
+    def lookup(self, freq):
+        """Track with a channel within tolerance of freq, or None"""
+        with self.lock:
+            hit = self._nearest(freq, ())
+            return dict(self.tracks[hit[0]]) if hit else None
+
+    @staticmethod
+    def stats(track):
+        """Derived figures: frequency, drift, duty cycle and hop set"""
+        centers = sorted(c[0] for c in track['channels'])
+        center, origin, hits = track['channels'][track['current']]
+        return {
+            'frequency': center,
+            'drift': center - origin,
+            'duty': track['seen'] / max(1, track['observed']),
+            'channels': len(centers),
+            'span': centers[-1] - centers[0],
+            'spacing': min(np.diff(centers)) if len(centers) > 1 else 0.0,
+        }
+
+    @staticmethod
+    def describe(track):
+        s = SignalTracker.stats(track)
+        text = (f"#{track['id']:<5} {s['frequency']/1e6:10.4f} MHz  {s['duty']:5.0%} duty  "
+                f"{track['seen']:>5} hit(s)  peak {track['peak']:6.1f} dB")
+        if s['channels'] > 1:
+            text += (f"  hopping: {s['channels']} ch over {format_bandwidth(s['span'])}, "
+                     f"{track['hops']} hop(s), spacing >= {format_bandwidth(s['spacing'])}")
+        elif abs(s['drift']) >= 1e3:
+            text += f"  drift {s['drift']/1e3:+.1f} kHz"
+        return text
+
+    def print_table(self, limit=20):
+        with self.lock:
+            tracks = sorted((dict(t) for t in self.tracks.values()),
+                            key=lambda t: (t['seen'], t['last']), reverse=True)
+        print(f"\n[*] {len(tracks)} signal track(s)"
+              + (f", {self.expired} expired" if self.expired else ''))
+        for track in tracks[:limit]:
+            first = datetime.fromtimestamp(track['first']).strftime('%H:%M:%S')
+            last = datetime.fromtimestamp(track['last']).strftime('%H:%M:%S')
+            print(f"    {self.describe(track)}  {first} - {last}")
+        if len(tracks) > limit:
+            print(f"    ... and {len(tracks) - limit} more")
+
+
+def track_signals(signals, start, end):
+    """Feed one sweep of a range to the tracker, if tracking is on"""
+    if TRACKER is not None:
+        TRACKER.update(signals, start, end)
+
+
+class WaterfallStore:
+    """Fixed-size ring of sweep rows in one memory-mapped file
+
+    Layout: a 64-byte header, a float64 timestamp per slot, then one
+    fixed-width row per slot holding the band's power grid either as uint8
+    (0 = no data, 1-255 spread over WATERFALL_DB_RANGE) or float16 (NaN = no
+    data). Appends write one slot and bump the header's row counter, so disk
+    use is fixed at creation and readers only touch the slots they slice.
+    """
+
+    MAGIC = b'RFWF'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHB5xddIIQff')
+    HEAD_OFFSET = struct.calcsize('<4sHB5xddII')  # where the row counter lives
+    HEADER_SIZE = 64
+    FORMATS = {'uint8': (0, np.uint8), 'float16': (1, np.float16)}
+
+    def __init__(self, path, mode='r'):
+        self.path = path
+        self.lock = threading.Lock()
+        with open(path, 'rb') as f:
+            header = f.read(self.HEADER.size)
+        (magic, version, fmt, self.start_freq, self.step, self.cells, self.capacity,
+         _, self.db_min, self.db_max) = self.HEADER.unpack(header)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{path} is not a waterfall file")
+        self.format = next(name for name, (code, _) in self.FORMATS.items() if code == fmt)
+        self.dtype = self.FORMATS[self.format][1]
+
+        self.mm = np.memmap(path, dtype=np.uint8, mode='r+' if mode == 'w' else 'r')
+        ts_end = self.HEADER_SIZE + 8 * self.capacity
+        self.timestamps = self.mm[self.HEADER_SIZE:ts_end].view('<f8')
+        self.rows = self.mm[ts_end:].view(self.dtype).reshape(self.capacity, self.cells)
+
+    @classmethod
+    def create(cls, path, start_freq, end_freq, step, capacity=WATERFALL_ROWS, fmt='uint8'):
+        """Create (or reopen, if the grid matches) a waterfall file"""
+        cells = int(math.ceil((end_freq - start_freq) / step)) + 1
+        if os.path.exists(path):
+            store = cls(path, mode='w')
+            if (store.start_freq, store.step, store.cells, store.format) != \
+                    (float(start_freq), float(step), cells, fmt):
+                raise ValueError(f"{path} was created for a different band grid")
+            return store
+
+        code, dtype = cls.FORMATS[fmt]
+        size = cls.HEADER_SIZE + 8 * capacity + np.dtype(dtype).itemsize * capacity * cells
+        with open(path, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, code, float(start_freq), float(step),
+                                    cells, capacity, 0, *WATERFALL_DB_RANGE))
+            f.truncate(size)
+        return cls(path, mode='w')
+
+    @property
+    def head(self):
+        """Total rows ever appended"""
+        return struct.unpack_from('<Q', self.mm, self.HEAD_OFFSET)[0]
+
+    def __len__(self):
+        return min(self.head, self.capacity)
+
+    def append(self, rows, timestamp=None):
+        """Write one sweep (parsed rtl_power rows) as the newest ring slot"""
+        grid = np.full(self.cells, -np.inf, dtype=np.float32)
+        for freq_low, freq_high, freq_step, powers in rows:
+            if not powers:
+                continue
+            idx = np.rint((freq_low + np.arange(len(powers)) * freq_step - self.start_freq)
+                          / self.step).astype(np.int64)
+            inside = (idx >= 0) & (idx < self.cells)
+            np.maximum.at(grid, idx[inside], np.asarray(powers, dtype=np.float32)[inside])
+        missing = np.isneginf(grid)
+
+        if self.format == 'uint8':
+            span = self.db_max - self.db_min
+            row = np.clip(np.rint((grid - self.db_min) / span * 254.0) + 1, 1, 255).astype(np.uint8)
+            row[missing] = 0
+        else:
+            row = grid.astype(np.float16)
+            row[missing] = np.nan
+
+        with self.lock:
+            head = self.head
+            slot = head % self.capacity
+            self.rows[slot] = row
+            self.timestamps[slot] = time.time() if timestamp is None else timestamp
+            # Bump the counter last so a reader never sees a half-written slot
+            struct.pack_into('<Q', self.mm, self.HEAD_OFFSET, head + 1)
+
+    def _dequantize(self, data):
+        if self.format == 'uint8':
+            out = (data.astype(np.float32) - 1.0) * ((self.db_max - self.db_min) / 254.0) + self.db_min
+            out[data == 0] = np.nan
+            return out
+        return data.astype(np.float32)
+
+    def read(self, t0=None, t1=None, f0=None, f1=None):
+        """Slice a time/frequency window: (timestamps, frequencies, powers)
+
+        powers is a (rows, bins) float32 array in dB with NaN where a sweep
+        had no data; only the selected slots and columns are read from disk.
+        """
+        head = self.head
+        count = min(head, self.capacity)
+        slots = (head - count + np.arange(count)) % self.capacity
+        times = self.timestamps[slots]
+
+        lo = 0 if t0 is None else int(np.searchsorted(times, t0, side='left'))
+        hi = count if t1 is None else int(np.searchsorted(times, t1, side='right'))
+        c0 = 0 if f0 is None else max(0, int(math.floor((f0 - self.start_freq) / self.step)))
+        c1 = self.cells if f1 is None else min(self.cells, int(math.ceil((f1 - self.start_freq) / self.step)) + 1)
+
+        slots = slots[lo:hi]
+        freqs = self.start_freq + np.arange(c0, c1) * self.step
+        return times[lo:hi].copy(), freqs, self._dequantize(self.rows[slots, c0:c1])
+
+    def iter_rows(self, t0=None, t1=None, f0=None, f1=None):
+        """Yield (timestamp, rows) per stored sweep, rows in parsed rtl_power form"""
+        times, freqs, powers = self.read(t0, t1, f0, f1)
+        for timestamp, row in zip(times.tolist(), powers):
+            valid = ~np.isnan(row)
+            if valid.any():
+                band_freqs = freqs[valid]
+                yield timestamp, [(float(band_freqs[0]), float(band_freqs[-1] + self.step),
+                                   self.step, row[valid].tolist())]
+
+    def flush(self):
+        self.mm.flush()
+
+    def describe(self):
+        """Print the file's grid and the time span it holds"""
+        times, freqs, powers = self.read(f0=self.start_freq, f1=self.start_freq)
+        print(f"[*] {self.path}: {self.start_freq/1e6:.3f} - "
+              f"{(self.start_freq + (self.cells - 1) * self.step)/1e6:.3f} MHz, "
+              f"{self.cells} bins of {self.step/1e3:.1f} kHz, {self.format}")
+        print(f"    {len(self)} of {self.capacity} rows used ({self.head} written)")
+        if len(times):
+            print(f"    {datetime.fromtimestamp(times[0]):%Y-%m-%d %H:%M:%S} - "
+                  f"{datetime.fromtimestamp(times[-1]):%Y-%m-%d %H:%M:%S}")
+
+
+class WaterfallArchive:
+    """One WaterfallStore per scanned band, fed with whole sweeps"""
+
+    def __init__(self, directory, plan, capacity=WATERFALL_ROWS, fmt='uint8'):
+        os.makedirs(directory, exist_ok=True)
+        self.stores = []
+        seen = set()
+        for seg in plan.segments:
+            for start, end, name, decoder, description in seg['bands']:
+                slug = re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_').lower()
+                path = os.path.join(directory, f'{slug}.wf')
+                # A band cut by split_for_devices sits in several segments
+                # with the same bins; it still gets only one file
+                if path in seen:
+                    continue
+                seen.add(path)
+                store = WaterfallStore.create(path, start, end, seg['bin_size'], capacity, fmt)
+                self.stores.append((start, end, store))
+
+    def append(self, rows, timestamp=None):
+        """Store the part of a sweep that falls in each band"""
+        timestamp = time.time() if timestamp is None else timestamp
+        for start, end, store in self.stores:
+            band_rows = [r for r in rows if r[0] < end and start < r[1]]
+            if band_rows:
+                store.append(band_rows, timestamp)
+
+    def flush(self):
+        for start, end, store in self.stores:
+            store.flush()
+
+
+class EventStore:
+    """SQLite (WAL) log of detections, alerts, rtl_433 records and ADS-B messages
+
+    Events are buffered and written in one transaction every batch_rows
+    rows or batch_seconds seconds, so recording keeps up with busy decoders
+    and readers (rf-events.py) can query while the scanner writes. All
+    event kinds share one table indexed by time, frequency and band.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            time REAL NOT NULL,       -- unix seconds
+            kind TEXT NOT NULL,       -- detection, alert, rtl433, adsb
+            frequency INTEGER,        -- Hz
+            band TEXT,
+            power REAL,               -- dB
+            strength REAL,            -- dB over noise floor / baseline
+            bandwidth REAL,           -- Hz
+            source TEXT,              -- rtl_433 model, ADS-B callsign
+            ident TEXT,               -- device id/channel, ICAO address
+            data TEXT                 -- raw decoder output
+        );
+        CREATE INDEX IF NOT EXISTS events_time ON events (time);
+        CREATE INDEX IF NOT EXISTS events_frequency ON events (frequency, time);
+        CREATE INDEX IF NOT EXISTS events_band ON events (band, time);
+    """
+
+    COLUMNS = ('time', 'kind', 'frequency', 'band', 'power', 'strength', 'bandwidth',
+               'source', 'ident', 'data')
+
+    def __init__(self, path, batch_rows=EVENT_BATCH_ROWS, batch_seconds=EVENT_BATCH_SECONDS):
+        self.path = path
+        self.batch_rows = batch_rows
+        self.batch_seconds = batch_seconds
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(self.SCHEMA)
+        self.pending = []
+        self.written = 0
+        self.lock = threading.Lock()
+        self.aircraft = {}  # ICAO -> last stored ADS-B line, to skip screen refreshes
+        self.stop = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self.flusher.start()
 
+    def add(self, kind, frequency=None, band=None, power=None, strength=None, bandwidth=None,
+            source=None, ident=None, data=None, timestamp=None):
+        row = (timestamp or time.time(), kind,
+               int(frequency) if frequency is not None else None, band,
+               power, strength, bandwidth, source, ident, data)
+        with self.lock:
+            self.pending.append(row)
+            full = len(self.pending) >= self.batch_rows
+        if full:
+            self.flush()
+
+    def add_signals(self, kind, signals, bands=None):
+        """Record detected signals or baseline alerts, looking up bands if not given"""
+        if not signals:
+            return
+        if bands is None:
+            idx = BAND_PLAN.lookup_many([sig['frequency'] for sig in signals]).tolist()
+            bands = [BAND_PLAN.decoder_info(i)['band'] for i in idx]
+        now = time.time()
+        with self.lock:
+            self.pending.extend(
+                (now, kind, int(sig['frequency']), band, float(sig['power']),
+                 float(sig['strength']), float(sig['bandwidth']), None, None, None)
+                for sig, band in zip(signals, bands))
+            full = len(self.pending) >= self.batch_rows
+        if full:
+            self.flush()
+
+    def add_decoder_line(self, decoder, frequency, line, dev=None):
+        """Record an rtl_433 record (dev: its device table entry) or ADS-B message"""
+        if decoder == 'rtl_433' and dev is not None:
+            ident = '/'.join(str(v) for v in (dev['id'], dev['channel']) if v is not None)
+            freq = dev['freq'] * 1e6 if dev['freq'] else frequency
+            band = BAND_PLAN.lookup(freq)['band'] if freq else None
+            self.add('rtl433', freq, band, source=dev['model'], ident=ident or None,
+                     power=dev['rssi'], data=line)
+        elif decoder == 'dump1090':
+            msg = parse_adsb_line(line)
+            if msg is None:
+                return
+            # --interactive redraws every aircraft each second; keep changes only
+            if msg['raw'] is None:
+                if self.aircraft.get(msg['icao']) == line:
+                    return
+                self.aircraft[msg['icao']] = line
+            self.add('adsb', frequency, BAND_PLAN.lookup(frequency)['band'],
+                     source=msg['callsign'], ident=msg['icao'], data=msg['raw'] or line)
+
+    def _flush_loop(self):
+        while not self.stop.wait(self.batch_seconds):
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            rows, self.pending = self.pending, []
+            if not rows:
+                return
+            try:
+                with self.db:
+                    self.db.executemany(
+                        f"INSERT INTO events ({', '.join(self.COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * len(self.COLUMNS))})", rows)
+                self.written += len(rows)
+            except sqlite3.Error as e:
+                print(f"[!] Event store error: {e}")
+
+    def close(self):
+        self.stop.set()
+        self.flusher.join(timeout=self.batch_seconds + 1)
+        self.flush()
+        self.db.close()
+
+
+def parse_adsb_line(line):
+    """ICAO address (and callsign) from dump1090 output
+
+    Handles --raw frames ('*8D4840D6...;', DF17/18 carry the address in
+    bytes 1-3) and rows of the --interactive aircraft table, which start
+    with the address in hex. Returns None for anything else.
+    """
+    line = line.strip()
+    if line.startswith('*') and line.endswith(';'):
+        frame = line[1:-1]
+        if len(frame) == 28 and re.fullmatch(r'[0-9A-Fa-f]+', frame):
+            return {'icao': frame[2:8].upper(), 'callsign': None, 'raw': frame.upper()}
+        return None
+    fields = line.split()
+    if not fields or not re.fullmatch(r'[0-9A-Fa-f]{6}', fields[0]):
+        return None
+    # Interactive columns: Hex Mode Sqwk Flight Alt ...; callsign is the
+    # first alphanumeric field that isn't a number
+    callsign = next((f for f in fields[1:5] if re.fullmatch(r'[A-Z]{2,3}[0-9A-Z]{1,5}', f)), None)
+    return {'icao': fields[0].upper(), 'callsign': callsign, 'raw': None}
+
+
+def record_events(kind, signals, bands=None):
+    """Add signals to the event store, if one is open"""
+    if EVENT_STORE is not None:
+        EVENT_STORE.add_signals(kind, signals, bands)
+
+
+def record_decoder_output(decoder, frequency, line, dev=None):
+    """Add a decoder output line to the event store, if one is open"""
+    if EVENT_STORE is not None:
+        EVENT_STORE.add_decoder_line(decoder, frequency, line, dev)
+
+
+def report_baseline_alerts(alerts):
+    """Print signals that rose significantly above the learned baseline"""
+    if not alerts:
+        return
+    METRICS.add(alerts=len(alerts))
+    with METRICS.span('print'):
+        print_baseline_alerts(alerts)
+
+
+def print_baseline_alerts(alerts):
+    record_events('alert', alerts)
+
+    print("\n" + "!" * 80)
+    print("NEW SIGNAL(S) DETECTED!")
+    print("!" * 80)
+    bands = BAND_PLAN.lookup_many([a['frequency'] for a in alerts]).tolist()
+    for alert, idx in zip(alerts, bands):
+        band = BAND_PLAN.decoder_info(idx)['band']
+        print(f"  {alert['frequency']/1e6:.3f} MHz ({band}): {alert['power']:.1f} dB, "
+              f"+{alert['strength']:.1f} dB over baseline, {format_bandwidth(alert['bandwidth'])} wide")
+        # A known emitter that drifted or hopped here rather than a new one
+        track = TRACKER.lookup(alert['frequency']) if TRACKER is not None else None
+        if track is not None and track['seen'] > 1:
+            stats = SignalTracker.stats(track)
+            how = 'hopping' if stats['channels'] > 1 else 'drifting' if abs(stats['drift']) >= 1e3 else 'known'
+            first = datetime.fromtimestamp(track['first']).strftime('%H:%M:%S')
+            print(f"    {how} emitter, track #{track['id']} since {first} ({stats['duty']:.0%} duty)")
+    print()
+
+
+def format_bandwidth(hz):
+    """Human-readable occupied bandwidth"""
+    if hz >= 1e6:
+        return f"{hz/1e6:.2f} MHz"
+    return f"{hz/1e3:.0f} kHz"
+
+
+def rtl_power_command(start_freq, end_freq, bin_size, integration_time, single=True, device=0):
+    """Build an rtl_power command line that writes CSV rows to stdout"""
+    # Format: rtl_power -f start:end:step -i integration_time [-1] -
+    cmd = [
+        RTL_POWER_CMD,
+        '-f', f'{int(start_freq)}:{int(end_freq)}:{int(bin_size)}',
+        '-i', str(integration_time),
+    ]
+    if single:
+        cmd.append('-1')  # Single scan
+    cmd += ['-d', str(device), '-']  # '-' = CSV to stdout
+
+    # rtl_power block-buffers stdout when it is a pipe; force line buffering
+    # so each hop row reaches us as soon as it is written
+    if shutil.which('stdbuf'):
+        cmd = ['stdbuf', '-oL'] + cmd
+    return cmd
+
+
+def iter_rtl_power_rows(cmd, timeout=None, meter=None, interval=SCAN_INTEGRATION_TIME):
+    """Run rtl_power and yield parsed rows as they arrive on its stdout"""
+    run = meter.begin(interval) if meter else None
+    METRICS.add(runs=1)
+    spawned = time.monotonic()
     try:
-        # Run rtl_power for quick scan
-        # Format: rtl_power -f start:end:step -i integration_time output.csv
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+            bufsize=1
+        )
+    except OSError:
+        METRICS.add(failures=1)
+        if meter:
+            meter.end(run)
+        raise
+    started = time.monotonic()
+    METRICS.observe('spawn', started - spawned)
+    first_row = None
+
+    # A blocking readline can't time out by itself, so a watchdog kills the
+    # process once the deadline passes and the read loop sees EOF
+    watchdog = None
+    timed_out = threading.Event()
+    if timeout:
+        def expire():
+            timed_out.set()
+            process.kill()
+        watchdog = threading.Timer(timeout, expire)
+        watchdog.daemon = True
+        watchdog.start()
+
+    # Recorded lines are written a sweep at a time so concurrent devices
+    # don't interleave their rows in the capture
+    recording = []
+
+    try:
+        for line in process.stdout:
+            t0 = time.monotonic()
+            row = parse_rtl_power_line(line)
+            METRICS.observe('parse', time.monotonic() - t0)
+            if row:
+                if first_row is None:
+                    first_row = t0
+                if meter:
+                    meter.first_row(run)
+                if RECORDER:
+                    if recording and row[0] <= recording[-1][0]:
+                        RECORDER.write(recording)
+                        recording = []
+                    recording.append((row[0], line))
+                yield row
+        process.wait()
+        if timed_out.is_set():
+            METRICS.add(timeouts=1)
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        if process.returncode != 0:
+            METRICS.add(failures=1)
+    finally:
+        if recording:
+            RECORDER.write(recording)
+        if watchdog:
+            watchdog.cancel()
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        process.stdout.close()
+        # As in IntegrationMeter: the first row covers one integration
+        # interval, anything before that is device open and tuner settling
+        ended = time.monotonic()
+        settle = ended - started if first_row is None else max(0.0, first_row - started - interval)
+        METRICS.observe('settle', settle)
+        METRICS.observe('integrate', ended - started - settle)
+        if meter:
+            meter.end(run)
+
+
+class ReplayFinished(Exception):
+    """The replayed capture has no more sweeps for the requested range"""
+
+
+class CaptureRecorder:
+    """Appends raw rtl_power CSV lines to a capture file for later replay"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'a')
+        self.lock = threading.Lock()
+        self.rows = 0
+
+    def write(self, rows):
+        """Write one sweep's (freq_low, line) pairs"""
+        with self.lock:
+            self.file.writelines(line if line.endswith('\n') else line + '\n'
+                                 for _, line in rows)
+            self.file.flush()
+            self.rows += len(rows)
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+class CaptureReplay:
+    """Recorded rtl_power CSV captures played back in place of rtl_power
+
+    The files are indexed once (sweep boundaries, timestamps and frequency
+    extents, by byte offset) and rows are parsed only when a sweep is
+    played, so captures of any length replay in constant memory. Each
+    requested frequency range keeps its own position in the capture: a
+    quick scan or monitor cycle asking for a segment gets the next
+    recorded sweep overlapping it, restricted to that segment. Playback
+    follows the capture's own timestamps scaled by speed, or runs flat
+    out with speed 0.
+    """
+
+    def __init__(self, paths, speed=1.0):
+        self.paths = list(paths)
+        self.speed = speed
+        self.sweeps = []  # (timestamp, file index, offset, length, freq_low, freq_high)
+        self.cursors = {}
+        self.anchor = None  # (wall clock, capture time) of the first paced sweep
+        self.lock = threading.Lock()
+        self.times = {}
+        for i, path in enumerate(self.paths):
+            self._index(i, path)
+        # Several files (e.g. one per device) play back as one timeline
+        self.sweeps.sort(key=lambda sweep: sweep[0])
+
+    def _timestamp(self, date, clock):
+        key = (date, clock)
+        if key not in self.times:
+            try:
+                self.times[key] = datetime.strptime(
+                    f"{date.strip().decode()} {clock.strip().decode()}",
+                    '%Y-%m-%d %H:%M:%S').timestamp()
+            except ValueError:
+                self.times[key] = None
+        return self.times[key]
+
+    def _index(self, file_index, path):
+        with open(path, 'rb') as f:
+            offset = 0
+            current = None  # [timestamp, start offset, freq_low, freq_high, last low]
+            for line in f:
+                fields = line.split(b',', 5)
+                try:
+                    t = self._timestamp(fields[0], fields[1])
+                    low, high = int(fields[2]), int(fields[3])
+                except (IndexError, ValueError):
+                    t = None
+                if t is not None:
+                    # A new timestamp or a hop below the last one starts a sweep
+                    if current and (t != current[0] or low <= current[4]):
+                        self.sweeps.append((current[0], file_index, current[1],
+                                            offset - current[1], current[2], current[3]))
+                        current = None
+                    if current is None:
+                        current = [t, offset, low, high, low]
+                    current[3] = max(current[3], high)
+                    current[4] = low
+                offset += len(line)
+            if current:
+                self.sweeps.append((current[0], file_index, current[1],
+                                    offset - current[1], current[2], current[3]))
+
+    def __len__(self):
+        return len(self.sweeps)
+
+    def describe(self):
+        if not self.sweeps:
+            print("[!] Replay: no rtl_power rows found")
+            return
+        first, last = self.sweeps[0][0], self.sweeps[-1][0]
+        low = min(sweep[4] for sweep in self.sweeps)
+        high = max(sweep[5] for sweep in self.sweeps)
+        pace = 'as fast as possible' if not self.speed else f'at {self.speed:g}x real time'
+        print(f"[*] Replaying {len(self.sweeps)} sweep(s) from {len(self.paths)} file(s), "
+              f"{low/1e6:.1f} - {high/1e6:.1f} MHz, "
+              f"{datetime.fromtimestamp(first):%Y-%m-%d %H:%M:%S} + {last - first:.0f}s, {pace}")
+
+    def _pace(self, t):
+        if not self.speed:
+            return
+        with self.lock:
+            if self.anchor is None:
+                self.anchor = (time.monotonic(), t)
+            wall, start = self.anchor
+        delay = wall + (t - start) / self.speed - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _read(self, sweep):
+        t, file_index, offset, length, low, high = sweep
+        with open(self.paths[file_index], 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+        with METRICS.span('parse'):
+            return [row for row in map(parse_rtl_power_line, data.decode(errors='replace').splitlines())
+                    if row]
+
+    def rows(self, start_freq, end_freq, single=True, meter=None,
+             interval=SCAN_INTEGRATION_TIME):
+        """Yield the next recorded sweep(s) overlapping a range, like rtl_power would
+
+        Raises ReplayFinished when a single sweep is requested and none is left.
+        """
+        key = (int(start_freq), int(end_freq))
+        run = meter.begin(interval) if meter else None
+        played = 0
+        try:
+            while True:
+                with self.lock:
+                    i = self.cursors.get(key, 0)
+                    while i < len(self.sweeps) and not (self.sweeps[i][4] < end_freq and
+                                                        start_freq < self.sweeps[i][5]):
+                        i += 1
+                    self.cursors[key] = i + 1
+                if i >= len(self.sweeps):
+                    break
+                sweep = self.sweeps[i]
+                self._pace(sweep[0])
+                for row in self._read(sweep):
+                    if row[0] < end_freq and start_freq < row[1]:
+                        if meter:
+                            meter.first_row(run)
+                        yield row
+                played += 1
+                if single:
+                    return
+        finally:
+            if meter:
+                meter.end(run)
+        if single and not played:
+            raise ReplayFinished(f"capture has no more sweeps of "
+                                 f"{start_freq/1e6:.1f} - {end_freq/1e6:.1f} MHz")
+
+
+def open_rtl_power(start_freq, end_freq, bin_size, integration_time, single=True, device=0,
+                   timeout=None, meter=None):
+    """Rows from rtl_power for a range, or from the replayed capture"""
+    if REPLAY is not None:
+        rows = REPLAY.rows(start_freq, end_freq, single, meter=meter, interval=integration_time)
+    else:
+        cmd = rtl_power_command(start_freq, end_freq, bin_size, integration_time, single, device)
+        rows = iter_rtl_power_rows(cmd, timeout=timeout, meter=meter, interval=integration_time)
+    return counted_rows(rows)
+
+
+def counted_rows(rows):
+    for row in rows:
+        METRICS.add(rows=1, bins=len(row[3]))
+        yield row
+
+
+def open_range(start_freq, end_freq, integration_time=1, device=0, meter=None, bin_size=None):
+    """One sweep's rows of a frequency range"""
+    if not bin_size:
         bandwidth = end_freq - start_freq
         bin_size = min(FFT_BIN_SIZE, bandwidth // 100)  # At least 100 bins
 
-        cmd = [
-            'rtl_power',
-            '-f', f'{int(start_freq)}:{int(end_freq)}:{int(bin_size)}',
-            '-i', str(integration_time),
-            '-1',  # Single scan
-            '-d', '0',  # Device 0
-            temp_file.name
-        ]
+    return open_rtl_power(start_freq, end_freq, bin_size, integration_time, device=device,
+                          timeout=integration_time + 10, meter=meter)
+
 
-        # Run with timeout
-        result = subprocess.run(cmd, capture_output=True, timeout=integration_time + 10)
-
-        # Parse results
-        signals = []
-        if os.path.exists(temp_file.name) and os.path.getsize(temp_file.name) > 0:
-            with open(temp_file.name, 'r') as f:
-                for line in f:
-                    # rtl_power CSV format:
-                    # date, time, Hz low, Hz high, Hz step, samples, dB, dB, dB...
-                    parts = line.strip().split(',')
-                    if len(parts) > 6:
-                        try:
-                            freq_low = int(parts[2])
-                            freq_high = int(parts[3])
-                            freq_step = int(parts[4])
-                            powers = [float(p) for p in parts[6:]]
-
-                            # Calculate noise floor (lowest 10% of readings)
-                            sorted_powers = sorted(powers)
-                            noise_floor = sum(sorted_powers[:len(sorted_powers)//10]) / (len(sorted_powers)//10)
-
-                            # Find peaks
-                            for i, power in enumerate(powers):
-                                freq = freq_low + (i * freq_step)
-                                if power - noise_floor > SIGNAL_THRESHOLD:
-                                    signals.append({
-                                        'frequency': freq,
-                                        'power': power,
-                                        'strength': power - noise_floor,
-                                        'noise_floor': noise_floor
-                                    })
-                        except (ValueError, IndexError):
-                            continue
-
-        return signals
+def stream_frequency_range(start_freq, end_freq, integration_time=1, device=0, meter=None,
+                           bin_size=None, on_row=None, threshold=None):
+    """Scan frequency range with rtl_power, yielding detections a few hops at a time"""
+    def rows():
+        for row in open_range(start_freq, end_freq, integration_time, device, meter, bin_size):
+            if on_row:
+                on_row(row)
+            yield row
 
+    yield from stream_signals(rows(), threshold=threshold)
+
+
+def scan_frequency_range(start_freq, end_freq, integration_time=1, meter=None, bin_size=None,
+                         device=0, on_row=None, threshold=None):
+    """Scan frequency range using rtl_power"""
+    print(f"[*] Scanning {start_freq/1e6:.1f} - {end_freq/1e6:.1f} MHz (device {device})...")
+
+    # The segment's rows are collected and detected in one pass, which is
+    # far cheaper than a NumPy call per row; rows read before an error are
+    # still used
+    rows = []
+    try:
+        for row in open_range(start_freq, end_freq, integration_time, device, meter, bin_size):
+            if on_row:
+                on_row(row)
+            rows.append(row)
     except subprocess.TimeoutExpired:
         print("[!] Scan timeout")
-        return []
+    except ReplayFinished as e:
+        print(f"[*] Replay: {e}")
     except Exception as e:
         print(f"[!] Scan error: {e}")
-        return []
+    return detect_sweep(rows, threshold=threshold) if rows else []
+
+
+def merge_bands(bands, max_gap=0):
+    """Merge (start, end, ...) bands into sorted (start, end) ranges
+
+    Bands closer than max_gap Hz are joined into one range.
+    """
+    ranges = []
+    for start, end in sorted((b[0], b[1]) for b in bands):
+        if ranges and start - ranges[-1][1] <= max_gap:
+            ranges[-1][1] = max(ranges[-1][1], end)
+        else:
+            ranges.append([start, end])
+    return [tuple(r) for r in ranges]
+
+
+def estimate_sweep_time(start_freq, end_freq, integration_time,
+                        tuner_bandwidth=TUNER_USABLE_BANDWIDTH):
+    """Expected wall time of one rtl_power -1 run over a range"""
+    hops = max(1, -(-(end_freq - start_freq) // tuner_bandwidth))
+    # rtl_power repeats the sweep until the interval has elapsed, so a range
+    # takes at least one interval and at least one pass over its hops
+    return RTL_POWER_STARTUP_TIME + max(integration_time, hops * RTL_POWER_HOP_TIME)
+
+
+class SweepPlan:
+    """Band list coalesced into the fewest, cheapest rtl_power sweeps
+
+    Neighbouring bands share a sweep when sweeping the gap between them is
+    cheaper than a second rtl_power start. Segments are visited in frequency
+    order, alternating direction every cycle so the tuner never jumps from
+    the top of the plan back to the bottom.
+    """
+
+    def __init__(self, bands, tuner_bandwidth=TUNER_USABLE_BANDWIDTH, resolution=FFT_BIN_SIZE,
+                 integration_time=SCAN_INTEGRATION_TIME):
+        self.tuner_bandwidth = tuner_bandwidth
+        self.resolution = resolution
+        self.integration_time = integration_time
+        self.segments = []
+
+        for band in sorted(bands, key=lambda b: (b[0], b[1])):
+            start, end = band[0], band[1]
+            if self.segments:
+                last = self.segments[-1]
+                separate = self._cost(last['start'], last['end']) + self._cost(start, end)
+                merged = self._cost(last['start'], max(last['end'], end))
+                if merged <= separate:
+                    last['end'] = max(last['end'], end)
+                    last['bands'].append(band)
+                    continue
+            self.segments.append({'start': start, 'end': end, 'bands': [band]})
+
+        for seg in self.segments:
+            # At least 100 bins across the narrowest band, never coarser than
+            # the target resolution
+            narrowest = min(b[1] - b[0] for b in seg['bands'])
+            seg['bin_size'] = int(max(1, min(resolution, narrowest // 100)))
+            seg['hops'] = max(1, -(-(seg['end'] - seg['start']) // tuner_bandwidth))
+            seg['time'] = self._cost(seg['start'], seg['end'])
+
+    def _cost(self, start, end):
+        return estimate_sweep_time(start, end, self.integration_time, self.tuner_bandwidth)
+
+    @property
+    def cycle_time(self):
+        """Expected seconds for one pass over every segment"""
+        return sum(seg['time'] for seg in self.segments)
+
+    def makespan(self, devices=1):
+        """Expected cycle time when segments are shared longest-first by devices"""
+        loads = [0.0] * max(1, devices)
+        for seg in sorted(self.segments, key=lambda seg: seg['time'], reverse=True):
+            loads[loads.index(min(loads))] += seg['time']
+        return max(loads)
+
+    def ordered(self, cycle=0):
+        """Segments in visiting order for the given cycle number"""
+        return self.segments if cycle % 2 == 0 else self.segments[::-1]
+
+    def split_for_devices(self, devices):
+        """Copy of the plan with long segments cut up so devices share the load
+
+        A segment is split into at most `devices` pieces on hop boundaries,
+        and only when the pieces are cheaper than the whole despite their
+        extra rtl_power starts.
+        """
+        plan = SweepPlan.__new__(SweepPlan)
+        plan.tuner_bandwidth = self.tuner_bandwidth
+        plan.resolution = self.resolution
+        plan.integration_time = self.integration_time
+        plan.segments = []
+
+        target = self.cycle_time / max(1, devices)
+        for seg in self.segments:
+            pieces = 1
+            for k in range(2, min(devices, seg['hops']) + 1):
+                if seg['time'] / pieces <= target:
+                    break
+                width = -(-(seg['end'] - seg['start']) // k)
+                if self._cost(seg['start'], seg['start'] + width) < seg['time'] / pieces:
+                    pieces = k
+
+            width = -(-(seg['end'] - seg['start']) // pieces)
+            for start in range(seg['start'], seg['end'], width):
+                end = min(seg['end'], start + width)
+                plan.segments.append({
+                    'start': start,
+                    'end': end,
+                    'bands': [b for b in seg['bands'] if b[0] < end and start < b[1]],
+                    'bin_size': seg['bin_size'],
+                    'hops': max(1, -(-(end - start) // self.tuner_bandwidth)),
+                    'time': self._cost(start, end)
+                })
+        return plan
+
+    def describe(self, devices=1):
+        """Print the plan and its expected revisit rate"""
+        nbands = sum(len(seg['bands']) for seg in self.segments)
+        print(f"[*] Sweep plan: {nbands} band(s) in {len(self.segments)} segment(s), "
+              f"{self.tuner_bandwidth/1e6:.1f} MHz per hop, {self.integration_time}s integration")
+        for seg in self.segments:
+            names = ', '.join(b[2] for b in seg['bands'])
+            print(f"    {seg['start']/1e6:8.1f} - {seg['end']/1e6:8.1f} MHz  "
+                  f"{seg['hops']:4d} hop(s)  {seg['bin_size']/1e3:6.1f} kHz bins  "
+                  f"~{seg['time']:.1f}s  [{names}]")
+        separate = sum(self._cost(b[0], b[1]) for b in {b for seg in self.segments for b in seg['bands']})
+        print(f"[*] Expected cycle time: {self.makespan(devices):.1f}s on {devices} device(s) "
+              f"(vs {separate:.1f}s scanning each band separately on one)")
+
+
+class DwellScheduler:
+    """Adaptive revisit and dwell schedule for sweep plan segments
+
+    Each segment keeps an EWMA of its detection count and of that count's
+    variance. Revisit rates are proportional to activity plus spread and are
+    scaled so the whole schedule fits the hardware time budget; bursty
+    segments (high variance for their mean) also get a longer dwell so
+    intermittent transmitters are more likely to be caught mid-burst.
+    With virtual=True (replaying a capture flat out) the schedule's clock
+    jumps to the next due time instead of waiting for it.
+    """
+
+    def __init__(self, segments, budget=1.0, devices=1, alpha=0.3, virtual=False):
+        self.budget = budget
+        self.devices = devices
+        self.alpha = alpha
+        self.virtual = virtual
+        self.skipped = 0.0  # seconds the virtual clock has jumped ahead
+        now = self._now()
+        # Everything starts due, with a neutral prior, so the first pass
+        # visits every segment once
+        self.entries = [{'segment': seg, 'mean': 1.0, 'variance': 1.0, 'visits': 0,
+                         'dwell': MIN_DWELL, 'revisit': MIN_REVISIT, 'due': now, 'busy': False}
+                        for seg in segments]
+        self.cond = threading.Condition()
+        self._rebalance()
+
+    def _rebalance(self):
+        weights = []
+        for entry in self.entries:
+            std = math.sqrt(entry['variance'])
+            # Coefficient of variation: steady carriers need no extra dwell
+            burstiness = std / (entry['mean'] + 1.0)
+            entry['dwell'] = int(min(MAX_DWELL, max(MIN_DWELL, round(MIN_DWELL * (1 + 2 * burstiness)))))
+            # Quiet segments keep a small weight so they're never forgotten
+            weights.append(entry['mean'] + std + 0.1)
+
+        seg_cost = [estimate_sweep_time(e['segment']['start'], e['segment']['end'], e['dwell'])
+                    for e in self.entries]
+        # rate_i = w_i * budget / sum(w_j * cost_j) spends exactly the budget
+        spend = sum(w * c for w, c in zip(weights, seg_cost)) or 1.0
+        for entry, weight in zip(self.entries, weights):
+            rate = weight * self.budget * self.devices / spend
+            entry['revisit'] = min(MAX_REVISIT, max(MIN_REVISIT, 1.0 / rate))
+
+    def _now(self):
+        return time.monotonic() + self.skipped
+
+    def next(self, stop=None):
+        """Block until a segment is due, mark it busy and return its entry"""
+        with self.cond:
+            while not (stop and stop.is_set()):
+                idle = [e for e in self.entries if not e['busy']]
+                if idle:
+                    entry = min(idle, key=lambda e: e['due'])
+                    wait = entry['due'] - self._now()
+                    if wait > 0 and self.virtual:
+                        self.skipped += wait
+                        wait = 0
+                    if wait <= 0:
+                        entry['busy'] = True
+                        return entry
+                else:
+                    wait = None
+                self.cond.wait(wait if wait is None else min(wait, 1.0))
+        return None
+
+    def update(self, entry, detections):
+        """Fold a visit's detection count into the segment's statistics"""
+        with self.cond:
+            delta = detections - entry['mean']
+            entry['mean'] += self.alpha * delta
+            entry['variance'] = (1 - self.alpha) * (entry['variance'] + self.alpha * delta * delta)
+            entry['visits'] += 1
+            self._rebalance()
+            entry['due'] = self._now() + entry['revisit']
+            entry['busy'] = False
+            self.cond.notify_all()
+
+    def describe(self):
+        """Print the current schedule"""
+        with self.cond:
+            print(f"[*] Adaptive schedule ({self.budget:.0%} hardware budget on {self.devices} device(s)):")
+            for entry in sorted(self.entries, key=lambda e: e['revisit']):
+                seg = entry['segment']
+                names = ', '.join(b[2] for b in seg['bands'])
+                print(f"    {seg['start']/1e6:8.1f} - {seg['end']/1e6:8.1f} MHz  "
+                      f"activity {entry['mean']:5.1f} ± {math.sqrt(entry['variance']):4.1f}  "
+                      f"dwell {entry['dwell']}s  every {entry['revisit']:5.0f}s  [{names}]")
+
+
+def assign_to_bands(signals, bands):
+    """Group signals by the band that contains them; others are dropped"""
+    band_signals = defaultdict(list)
+    for sig in signals:
+        for start, end, name, decoder, description in bands:
+            if start <= sig['frequency'] <= end:
+                band_signals[name].append(sig)
+                break
+    return band_signals
+
+
+class RtlPowerSession:
+    """Long-running rtl_power process that keeps the tuner open between sweeps
+
+    rtl_power without -1 re-sweeps its range every integration interval and
+    prints one row per hop, so the dongle is opened and settled only once.
+    """
+
+    def __init__(self, start_freq, end_freq, integration_time=SCAN_INTEGRATION_TIME,
+                 bin_size=FFT_BIN_SIZE, device=0, meter=None):
+        self.start_freq = start_freq
+        self.end_freq = end_freq
+        self.integration_time = integration_time
+        self.bin_size = bin_size
+        self.device = device
+        self.meter = meter
+
+    def sweeps(self):
+        """Yield the list of rows making up each completed sweep"""
+        rows = []
+        for row in open_rtl_power(self.start_freq, self.end_freq, self.bin_size,
+                                  self.integration_time, single=False, device=self.device,
+                                  meter=self.meter):
+            freq_low, freq_high, freq_step, powers = row
+            # A hop below the previous one means rtl_power wrapped around
+            if rows and freq_low <= rows[-1][0]:
+                yield rows
+                rows = []
+            rows.append(row)
+            # The last hop may stop short of end_freq by up to one bin
+            if freq_high + freq_step >= self.end_freq:
+                yield rows
+                rows = []
+
+
+class FullSweep:
+    """The tuner's whole range swept by one rtl_power per device, chunk by chunk
+
+    Rows are grouped into chunks of about chunk_size Hz as they stream in.
+    Each chunk goes through detection, the baseline and the event store and
+    is then dropped, so memory stays at one chunk plus the baseline grid
+    however fine the resolution. Signals are labelled from the band plan,
+    including the frequencies between the scan bands. A signal straddling a
+    chunk boundary is reported once per chunk.
+    """
+
+    def __init__(self, pool, baseline, start_freq=FULL_SWEEP_START, end_freq=RTL_MAX_FREQ,
+                 resolution=FFT_BIN_SIZE, chunk_size=FULL_SWEEP_CHUNK,
+                 integration_time=SCAN_INTEGRATION_TIME, meter=None, devices=None):
+        self.pool = pool
+        self.baseline = baseline
+        self.resolution = resolution
+        self.chunk_size = chunk_size
+        self.integration_time = integration_time
+        self.meter = meter
+        self.print_lock = threading.Lock()
+        self.strongest = []  # min-heap of (strength, n, detection), FULL_SWEEP_KEEP long
+        self.kept = itertools.count()
+
+        # Each device sweeps a contiguous share of the range, cut on hop
+        # boundaries; fewer devices than the pool leaves the rest for decoders
+        hops = -(-(end_freq - start_freq) // TUNER_USABLE_BANDWIDTH)
+        share = -(-hops // (devices or len(pool))) * TUNER_USABLE_BANDWIDTH
+        self.ranges = [(start, min(end_freq, start + share))
+                       for start in range(int(start_freq), int(end_freq), int(share))]
+
+    def describe(self):
+        for start, end in self.ranges:
+            print(f"[*] Full sweep {start/1e6:.1f} - {end/1e6:.1f} MHz in "
+                  f"{self.chunk_size/1e6:.0f} MHz chunks, {self.resolution/1e3:.0f} kHz bins, "
+                  f"~{estimate_sweep_time(start, end, self.integration_time):.0f}s per cycle")
+
+    def chunks(self, start, end, single, device):
+        """Yield (rows, cycle finished) as rows stream in from rtl_power"""
+        timeout = 2 * estimate_sweep_time(start, end, self.integration_time) + 10 if single else None
+        rows = []
+        for row in open_rtl_power(start, end, self.resolution, self.integration_time, single=single,
+                                  device=device, timeout=timeout, meter=self.meter):
+            # A hop below the previous one means rtl_power wrapped around
+            if rows and row[0] <= rows[-1][0]:
+                yield rows, True
+                rows = []
+            rows.append(row)
+            # The last hop may stop short of the end by up to one bin
+            if row[1] + row[2] >= end:
+                yield rows, True
+                rows = []
+            elif row[1] - rows[0][0] >= self.chunk_size:
+                yield rows, False
+                rows = []
+        if rows:
+            yield rows, True
+
+    def process(self, rows, totals, verbose, dispatcher=None, decode_duration=30):
+        """Detection, baseline and events for one chunk"""
+        signals = detect_sweep(rows)
+        alerts = self.baseline.update(rows)
+        idx = BAND_PLAN.lookup_many([sig['frequency'] for sig in signals]).tolist()
+        info = [BAND_PLAN.decoder_info(i) for i in idx]
+        record_events('detection', signals, [d['band'] for d in info])
+        track_signals(signals, rows[0][0], rows[-1][1])
+        METRICS.add(detections=len(signals))
+
+        totals['rows'] += len(rows)
+        totals['bins'] += sum(len(r[3]) for r in rows)
+        totals['signals'] += len(signals)
+        totals['alerts'] += len(alerts)
+
+        with self.print_lock:
+            for sig, decoder_info in zip(signals, info):
+                detection = {
+                    'frequency': sig['frequency'],
+                    'strength': sig['strength'],
+                    'power': sig['power'],
+                    'bandwidth': sig['bandwidth'],
+                    'integrated_power': sig['integrated_power'],
+                    'band': decoder_info['band'],
+                    'decoder': decoder_info['decoder']
+                }
+                entry = (sig['strength'], next(self.kept), detection)
+                if len(self.strongest) < FULL_SWEEP_KEEP:
+                    heapq.heappush(self.strongest, entry)
+                else:
+                    heapq.heappushpop(self.strongest, entry)
+                if verbose:
+                    print(f"      + {sig['frequency']/1e6:.3f} MHz [{decoder_info['band']}]: "
+                          f"{sig['strength']:.1f} dB, {format_bandwidth(sig['bandwidth'])} wide")
+            report_baseline_alerts(alerts)
+            if dispatcher:
+                dispatch_alerts(dispatcher, alerts, decode_duration)
+
+    def sweep_range(self, index, single=True, stop=None, dispatcher=None, decode_duration=30):
+        """Sweep one device's share, once or until stop is set"""
+        start, end = self.ranges[index]
+
+        def new_cycle():
+            return {'rows': 0, 'bins': 0, 'signals': 0, 'alerts': 0, 'started': time.monotonic()}
+
+        cycle = 0
+        totals = new_cycle()
+        with self.pool.device() as device:
+            with self.print_lock:
+                print(f"[*] Sweeping {start/1e6:.1f} - {end/1e6:.1f} MHz (device {device})...")
+            for rows, finished in self.chunks(start, end, single, device):
+                if stop is not None and stop.is_set():
+                    break
+                self.process(rows, totals, verbose=single, dispatcher=dispatcher,
+                             decode_duration=decode_duration)
+                if not finished:
+                    continue
+                cycle += 1
+                elapsed = time.monotonic() - totals['started']
+                METRICS.observe('cycle', elapsed)
+                with self.print_lock:
+                    print(f"[*] {start/1e6:.1f} - {end/1e6:.1f} MHz (device {device}): cycle {cycle} "
+                          f"in {elapsed:.1f}s, {totals['rows']} rows, {totals['bins']} bins, "
+                          f"{totals['signals']} signal(s), {totals['alerts']} alert(s)")
+                totals = new_cycle()
+        return cycle
+
+    def detections(self):
+        """Strongest signals seen, strongest first"""
+        return [d for _, _, d in sorted(self.strongest, key=lambda e: (-e[0], e[1]))]
+
+    def scan(self):
+        """One pass over the whole range on all devices"""
+        stop = threading.Event()
+        try:
+            with ThreadPoolExecutor(max_workers=len(self.ranges)) as executor:
+                list(executor.map(lambda i: self.sweep_range(i, True, stop), range(len(self.ranges))))
+        except subprocess.TimeoutExpired:
+            print("[!] Scan timeout")
+        except ReplayFinished as e:
+            print(f"[*] Replay: {e}")
+        finally:
+            stop.set()
+        return self.detections()
+
+    def monitor(self, dispatcher=None, decode_duration=30):
+        """Sweep continuously on all devices until interrupted"""
+        stop = threading.Event()
+
+        def worker(i):
+            try:
+                self.sweep_range(i, single=False, stop=stop, dispatcher=dispatcher,
+                                 decode_duration=decode_duration)
+            except Exception as e:
+                print(f"[!] Sweep error: {e}")
+
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True)
+                   for i in range(len(self.ranges))]
+        for t in threads:
+            t.start()
+        try:
+            while any(t.is_alive() for t in threads):
+                time.sleep(0.5)
+        finally:
+            stop.set()
+        if REPLAY is not None:
+            print("\n[*] Replay finished")
+
+
+def full_scan(pool, resolution=FFT_BIN_SIZE, chunk_size=FULL_SWEEP_CHUNK):
+    """Quick scan of the whole tuner range instead of the scan bands"""
+    print("=" * 80)
+    print("WIDEBAND RF SCANNER - FULL RANGE")
+    print("=" * 80)
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Signal threshold: {SIGNAL_THRESHOLD} dB above noise\n")
+
+    baseline = SpectrumBaseline(FULL_SWEEP_START, RTL_MAX_FREQ, resolution)
+    sweep = FullSweep(pool, baseline, resolution=resolution, chunk_size=chunk_size,
+                      meter=IntegrationMeter(devices=len(pool)))
+    sweep.describe()
+    started = time.monotonic()
+    detections = sweep.scan()
+    print(f"\n[*] Full range swept in {time.monotonic() - started:.1f}s, "
+          f"{len(detections)} strongest signal(s) kept")
+    return detections
+
+
+class Rtl433DeviceTable:
+    """Live table of rtl_433 devices keyed by (model, id, channel)
+
+    JSON records are parsed as they stream and folded into one entry per
+    device (first/last seen, count, RSSI and SNR stats, last readings), so
+    memory follows the number of distinct devices rather than the number
+    of lines. Past max_devices the least recently heard device is dropped.
+    With a snapshot path the table is written out every snapshot_interval
+    seconds.
+    """
+
+    # Fields that identify a record rather than describe the reading
+    META_FIELDS = ('time', 'model', 'id', 'channel', 'rssi', 'snr', 'noise', 'freq',
+                   'freq1', 'freq2', 'mod', 'protocol')
+
+    def __init__(self, max_devices=RTL433_MAX_DEVICES, snapshot_path=None,
+                 snapshot_interval=RTL433_SNAPSHOT_INTERVAL):
+        self.devices = OrderedDict()  # least recently heard first
+        self.max_devices = max_devices
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.last_snapshot = time.monotonic()
+        self.records = 0
+        self.other_lines = 0
+        self.evicted = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.devices)
+
+    def feed(self, line):
+        """Ingest one line of rtl_433 output; returns the device entry or None"""
+        line = line.strip()
+        if not line.startswith('{'):
+            self.other_lines += 1
+            return None
+        try:
+            record = json.loads(line)
+        except ValueError:
+            self.other_lines += 1
+            return None
+        if not isinstance(record, dict) or 'model' not in record:
+            self.other_lines += 1
+            return None
+        return self.add(record)
+
+    def add(self, record):
+        key = (record['model'], record.get('id'), record.get('channel'))
+        try:
+            seen = float(record['time'])
+        except (KeyError, TypeError, ValueError):
+            seen = time.time()
+
+        with self.lock:
+            self.records += 1
+            dev = self.devices.get(key)
+            if dev is None:
+                dev = {
+                    'model': key[0], 'id': key[1], 'channel': key[2],
+                    'first_seen': seen, 'last_seen': seen, 'count': 0,
+                    'rssi': None, 'rssi_count': 0, 'rssi_mean': None, 'rssi_min': None, 'rssi_max': None,
+                    'snr_mean': None, 'freq': None, 'last': {}
+                }
+                self.devices[key] = dev
+                if len(self.devices) > self.max_devices:
+                    self.devices.popitem(last=False)
+                    self.evicted += 1
+            else:
+                self.devices.move_to_end(key)
+
+            dev['count'] += 1
+            dev['last_seen'] = max(dev['last_seen'], seen)
+            rssi = record.get('rssi')
+            if isinstance(rssi, (int, float)):
+                dev['rssi'] = float(rssi)
+                n = dev['rssi_count'] = dev['rssi_count'] + 1
+                if n == 1:
+                    dev['rssi_mean'] = dev['rssi_min'] = dev['rssi_max'] = float(rssi)
+                else:
+                    dev['rssi_mean'] += (rssi - dev['rssi_mean']) / n
+                    dev['rssi_min'] = min(dev['rssi_min'], rssi)
+                    dev['rssi_max'] = max(dev['rssi_max'], rssi)
+                snr = record.get('snr')
+                if isinstance(snr, (int, float)):
+                    prev = dev['snr_mean']
+                    dev['snr_mean'] = float(snr) if prev is None else prev + (snr - prev) / n
+            if isinstance(record.get('freq'), (int, float)):
+                dev['freq'] = record['freq']
+            dev['last'] = {k: v for k, v in record.items() if k not in self.META_FIELDS}
+
+        self.maybe_snapshot()
+        return dev
+
+    def rows(self):
+        """Device entries, most frequently heard first"""
+        with self.lock:
+            return sorted((dict(dev) for dev in self.devices.values()),
+                          key=lambda d: d['count'], reverse=True)
+
+    def maybe_snapshot(self):
+        if self.snapshot_path and time.monotonic() - self.last_snapshot >= self.snapshot_interval:
+            self.snapshot()
+
+    def snapshot(self, path=None):
+        """Write the table as JSON, replacing the previous snapshot atomically"""
+        path = path or self.snapshot_path
+        self.last_snapshot = time.monotonic()
+        if not path:
+            return
+        data = {
+            'time': time.time(),
+            'records': self.records,
+            'evicted': self.evicted,
+            'devices': self.rows()
+        }
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[!] Cannot write device snapshot: {e}")
+
+    @staticmethod
+    def describe(dev):
+        """One-line summary of a device entry"""
+        name = dev['model']
+        if dev['id'] is not None:
+            name += f" id={dev['id']}"
+        if dev['channel'] is not None:
+            name += f" ch={dev['channel']}"
+        level = f"{dev['rssi_mean']:6.1f} dB" if dev['rssi_mean'] is not None else '       -'
+        return f"{name:<40} {dev['count']:>6}x  {level}"
+
+    def print_table(self, limit=20):
+        rows = self.rows()
+        print(f"\n[*] {len(rows)} rtl_433 device(s) from {self.records} record(s)"
+              + (f", {self.evicted} stale device(s) dropped" if self.evicted else ''))
+        if not rows:
+            return
+        print(f"    {'DEVICE':<40} {'COUNT':>7}  {'RSSI':>9}  LAST SEEN")
+        for dev in rows[:limit]:
+            seen = datetime.fromtimestamp(dev['last_seen']).strftime('%H:%M:%S')
+            print(f"    {self.describe(dev)}  {seen}")
+        if len(rows) > limit:
+            print(f"    ... and {len(rows) - limit} more")
+
+
+class DecoderOutput:
+    """Rate-limited console summary of a decoder's output, raw lines to a file
+
+    The thread reading the decoder only does in-memory work per line: the
+    rtl_433 device table (or a tail of recent lines for other decoders) is
+    updated and the raw line queued. A separate thread writes the queued
+    lines to the log in one batch and redraws the summary at most refresh
+    times per second, so a slow terminal never back-pressures the
+    decoder's pipe.
+    """
+
+    def __init__(self, decoder, where, devices=None, refresh=DECODE_REFRESH, log_path=None,
+                 stream=None):
+        self.decoder = decoder
+        self.where = where
+        self.devices = devices
+        self.interval = 1.0 / refresh
+        self.stream = stream or sys.stdout
+        self.log = open(log_path, 'a') if log_path else None
+        self.log_path = log_path
+        self.tail = deque(maxlen=DECODE_TAIL)
+        self.pending = []
+        self.lines = 0
+        self.drawn = -1
+        self.height = 0  # lines of the last redraw on a terminal
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self.thread.start()
+
+    def line(self, text, dev=None):
+        text = text.rstrip('\n')
+        with self.lock:
+            self.lines += 1
+            self.pending.append(text)
+            if dev is None:
+                self.tail.append(text)
+
+    def _refresh_loop(self):
+        while not self.stop.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+            lines = self.lines
+            tail = list(self.tail)
+        if pending and self.log is not None:
+            self.log.write('\n'.join(pending) + '\n')
+            self.log.flush()
+        if lines != self.drawn:
+            self.drawn = lines
+            self.stream.write(self.render(lines, tail))
+            self.stream.flush()
+
+    def render(self, lines, tail):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        head = f"[*] {self.decoder} on {self.where}: {lines} line(s), {lines / elapsed:.1f}/s"
+        if self.devices is not None and self.decoder == 'rtl_433':
+            head += f", {len(self.devices)} device(s)"
+            with self.devices.lock:
+                recent = list(itertools.islice(reversed(self.devices.devices.values()), DECODE_TAIL))
+            body = [Rtl433DeviceTable.describe(dev) for dev in recent]
+        else:
+            body = tail
+        if self.log_path:
+            head += f" (raw lines: {self.log_path})"
+        text = '\n'.join([head] + [f"    {line}" for line in body]) + '\n'
+        if not self.stream.isatty():
+            return '\n' + text
+        # Redraw in place: back up over the previous summary and clear it
+        up = f"\033[{self.height}F\033[J" if self.height else ''
+        self.height = len(body) + 1
+        return up + text
+
+    def close(self):
+        self.stop.set()
+        self.thread.join(timeout=1)
+        self.flush()
+        if self.log is not None:
+            self.log.close()
+
+
+def ingest_rtl433(source, snapshot_path=None, interval=RTL433_SNAPSHOT_INTERVAL):
+    """Build a device table from an rtl_433 JSON log or stream ('-' for stdin)"""
+    table = Rtl433DeviceTable(snapshot_path=snapshot_path, snapshot_interval=interval)
+    stream = sys.stdin if source == '-' else open(source, errors='replace')
+    try:
+        for line in stream:
+            dev = table.feed(line)
+            record_decoder_output('rtl_433', None, line.strip(), dev)
+            if dev is not None and dev['count'] == 1 and source == '-':
+                print(f"[+] New device: {table.describe(dev)}")
+    except KeyboardInterrupt:
+        pass
     finally:
-        # Cleanup
+        if stream is not sys.stdin:
+            stream.close()
+    table.snapshot()
+    table.print_table(limit=50)
+    return table
+
+
+class PcapStream:
+    """Incremental pcap parser: feed it bytes, get back whole packets"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.endian = None  # set once the global header has arrived
+
+    def feed(self, data):
+        self.buffer += data
+        if self.endian is None:
+            if len(self.buffer) < 24:
+                return []
+            magic = bytes(self.buffer[:4])
+            if magic in (b'\xd4\xc3\xb2\xa1', b'\x4d\x3c\xb2\xa1'):
+                self.endian = '<'
+            elif magic in (b'\xa1\xb2\xc3\xd4', b'\xa1\xb2\x3c\x4d'):
+                self.endian = '>'
+            else:
+                raise ValueError('not a pcap stream')
+            del self.buffer[:24]
+
+        packets = []
+        offset = 0
+        while len(self.buffer) - offset >= 16:
+            length = struct.unpack_from(self.endian + 'I', self.buffer, offset + 8)[0]
+            if len(self.buffer) - offset - 16 < length:
+                break
+            packets.append(bytes(self.buffer[offset + 16:offset + 16 + length]))
+            offset += 16 + length
+        del self.buffer[:offset]
+        return packets
+
+
+class ChannelSurvey:
+    """Packet rate and RSSI on the CatSniffer's BLE advertising and Zigbee channels
+
+    Each channel gets a short cat_sniffer.py run streaming pcap into a FIFO.
+    A dwell ends as soon as the channel is clearly idle (nothing heard for
+    SURVEY_IDLE) or clearly busy (SURVEY_BUSY_PACKETS heard), otherwise
+    after SURVEY_DWELL, so all 19 channels are surveyed in seconds.
+    """
+
+    # (protocol, channel, centre Hz)
+    CHANNELS = ([('ble', ch, freq) for ch, freq in
+                 ((37, 2402000000), (38, 2426000000), (39, 2480000000))] +
+                [('zigbee', ch, 2405000000 + 5000000 * (ch - 11)) for ch in range(11, 27)])
+
+    def __init__(self, tool=None, port=None, dwell=SURVEY_DWELL, idle=SURVEY_IDLE,
+                 busy=SURVEY_BUSY_PACKETS):
+        self.tool = tool or CATSNIFFER_TOOL
+        self.port = port or CATSNIFFER_PORT
+        self.dwell = dwell
+        self.idle = idle
+        self.busy = busy
+
+    def available(self):
+        return os.path.exists(self.tool) and os.path.exists(self.port)
+
+    def measure(self, fifo, protocol, channel, frequency):
+        """Listen on one channel; returns its result dict, or None if the sniffer never started"""
+        cmd = ['/usr/bin/python3', self.tool, 'sniff', self.port, '--phy', protocol,
+               '-c', str(channel), '--fifo', '--fifo-name', fifo]
+        # Read-write, so the FIFO neither blocks on open nor reads EOF
+        # before the sniffer has opened it
+        fd = os.open(fifo, os.O_RDWR | os.O_NONBLOCK)
+        stream = PcapStream()
+        rssi, errors = [], 0
+        started = None
+        ended = 'dwell'
+        try:
+            process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            os.close(fd)
+            print(f"[!] Cannot run {self.tool}: {e}")
+            return None
+
+        try:
+            launched = time.monotonic()
+            while True:
+                now = time.monotonic()
+                if started is None:
+                    if now - launched > SURVEY_STARTUP or process.poll() is not None:
+                        return None
+                else:
+                    elapsed = now - started
+                    if len(rssi) >= self.busy:
+                        ended = 'busy'
+                        break
+                    if not rssi and elapsed >= self.idle:
+                        ended = 'idle'
+                        break
+                    if elapsed >= self.dwell:
+                        break
+
+                ready, _, _ = select.select([fd], [], [], 0.05)
+                if not ready:
+                    continue
+                try:
+                    packets = stream.feed(os.read(fd, 65536))
+                except ValueError:
+                    return None
+                if started is None and stream.endian is not None:
+                    started = time.monotonic()
+                for packet in packets:
+                    # CatSniffer radio header: RSSI (signed) at 14, status at 15
+                    if len(packet) < 17:
+                        continue
+                    rssi.append(struct.unpack_from('b', packet, 14)[0])
+                    if not packet[15] & 0x80:
+                        errors += 1
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            os.close(fd)
+
+        dwell = time.monotonic() - started
+        return {
+            'protocol': protocol,
+            'channel': channel,
+            'frequency': frequency,
+            'packets': len(rssi),
+            'errors': errors,
+            'dwell': dwell,
+            'rate': len(rssi) / dwell if dwell else 0.0,
+            'rssi': sum(rssi) / len(rssi) if rssi else None,
+            'max_rssi': max(rssi) if rssi else None,
+            'ended': ended,
+        }
+
+    def run(self):
+        """Survey every channel under one CatSniffer lease; returns the results"""
+        print(f"[*] Surveying {len(self.CHANNELS)} CatSniffer channels "
+              f"(up to {self.dwell:.1f}s each, less when idle or busy)")
+        results = []
+        started = time.monotonic()
+        workdir = tempfile.mkdtemp(prefix='rf-survey-')
+        fifo = os.path.join(workdir, 'survey.pcap')
+        os.mkfifo(fifo)
         try:
-            os.unlink(temp_file.name)
-        except:
-            pass
+            with device_lease('catsniffer', SWEEP_PRIORITY, 'rf-wideband-scanner survey'):
+                for protocol, channel, frequency in self.CHANNELS:
+                    result = self.measure(fifo, protocol, channel, frequency)
+                    if result is None:
+                        print(f"[!] CatSniffer on {self.port} didn't start streaming, survey stopped")
+                        break
+                    results.append(result)
+                    self.print_result(result)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        print(f"    Survey took {time.monotonic() - started:.1f}s")
+        return results
+
+    @staticmethod
+    def print_result(result):
+        name = f"{'BLE' if result['protocol'] == 'ble' else 'Zigbee'} {result['channel']}"
+        where = f"    {name:<9}  {result['frequency']/1e6:.0f} MHz:"
+        if not result['packets']:
+            print(f"{where} idle ({result['dwell']:.1f}s)")
+            return
+        errors = f", {result['errors']} bad FCS" if result['errors'] else ''
+        print(f"{where} {result['packets']:3d} pkt in {result['dwell']:.1f}s "
+              f"({result['rate']:.1f}/s), {result['rssi']:.1f} dBm avg, "
+              f"{result['max_rssi']} max{errors}{'  busy' if result['ended'] == 'busy' else ''}")
+
+    @staticmethod
+    def signals(results):
+        """Active channels as detections, for the common detection list"""
+        return [{
+            'frequency': r['frequency'],
+            'strength': r['rssi'] - CATSNIFFER_NOISE_FLOOR,
+            'power': r['rssi'],
+            'bandwidth': 2000000,
+            'integrated_power': r['rssi'],
+            'protocol': r['protocol'],
+            'channel': r['channel'],
+            'rate': r['rate'],
+        } for r in results if r['packets']]
 
 
-def decode_signal(frequency, decoder, duration=30):
-    """Attempt to decode signal using appropriate tool"""
-    print(f"\n[*] Decoding {frequency/1e6:.3f} MHz with {decoder}...")
+def catsniffer_channel(frequency):
+    """(protocol, channel) for the CatSniffer to sniff at a 2.4 GHz frequency
 
+    BLE advertising channel centres are sniffed as BLE (2480 MHz is also
+    Zigbee 26; BLE 39 wins), anything else on the nearest Zigbee channel.
+    """
+    for protocol, channel, centre in ChannelSurvey.CHANNELS:
+        if protocol == 'ble' and abs(frequency - centre) <= 500000:
+            return protocol, channel
+    return 'zigbee', min(26, max(11, 11 + int(round((frequency - 2405000000) / 5000000))))
+
+
+def decoder_command(frequency, decoder, duration=30, device=0):
+    """Build the decoder command line for a frequency, or None if unsupported"""
     if decoder == 'rtl_433':
         # Use rtl_433 for ISM band decoding
-        cmd = [
-            'timeout', str(duration),
-            'rtl_433',
-            '-f', str(int(frequency)),
-            '-F', 'json',
-            '-M', 'level',
-            '-M', 'time:unix'
-        ]
+        cmd = rtl433_hop_command([(frequency, duration)], duration, device)
 
     elif decoder == 'catsniffer':
         # Use CatSniffer for 2.4 GHz
         if 2400000000 <= frequency <= 2483500000:
-            # Determine channel (2.4 GHz WiFi/BLE channels)
-            if frequency < 2420000000:
-                protocol = 'ble'
-                channel = 37  # BLE advertising channel
-            elif 2410000000 <= frequency <= 2475000000:
-                protocol = 'zigbee'
-                # Zigbee channel = (freq - 2405) / 5
-                channel = int((frequency - 2405000000) / 5000000)
-            else:
-                protocol = 'ble'
-                channel = 37
-
+            protocol, channel = catsniffer_channel(frequency)
             cmd = [
                 'timeout', str(duration),
                 '/usr/bin/python3',
-                '/home/dragon/Tools/CatSniffer-Tools/pycatsniffer_bv3/cat_sniffer.py',
+                CATSNIFFER_TOOL,
                 'sniff',
-                '/dev/ttyACM1',
+                CATSNIFFER_PORT,
                 '--phy', protocol,
                 '-c', str(channel),
                 '--fifo'
@@ -192,7 +2686,7 @@ def decode_signal(frequency, decoder, duration=30):
         cmd = [
             'timeout', str(duration),
             'dump1090',
-            '--device-index', '0',
+            '--device-index', str(device),
             '--interactive'
         ]
 
@@ -201,6 +2695,7 @@ def decode_signal(frequency, decoder, duration=30):
         cmd = [
             'timeout', str(duration),
             'rtl_fm',
+            '-d', str(device),
             '-f', str(int(frequency)),
             '-M', 'fm',
             '-s', '200k',
@@ -211,84 +2706,629 @@ def decode_signal(frequency, decoder, duration=30):
         print(f"[!] Unknown decoder: {decoder}")
         return None
 
-    # Run decoder
-    try:
-        print(f"    Command: {' '.join(cmd)}")
-        print(f"    Duration: {duration} seconds")
-        print(f"    Press Ctrl+C to stop early\n")
+    return cmd
 
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            universal_newlines=True
-        )
 
-        # Stream output
+def plan_rtl433_hops(targets, duration):
+    """(frequency, seconds) hop list for one rtl_433 covering all the targets
+
+    Targets within RTL433_HOP_SPAN of each other share a tuning on the
+    strongest of them. Each tuning gets RTL433_MIN_DWELL plus a share of
+    the rest of the hop cycle in proportion to its strength in dB, so the
+    emitters most likely to decode are listened to longest. When the cycle
+    can't give every tuning its minimum, the weakest are dropped.
+    """
+    clusters = []  # [first Hz, strongest Hz, strength]
+    for target in sorted(targets, key=lambda t: t['frequency']):
+        strength = max(float(target.get('strength') or SIGNAL_THRESHOLD), 1.0)
+        if clusters and target['frequency'] - clusters[-1][0] <= RTL433_HOP_SPAN:
+            if strength > clusters[-1][2]:
+                clusters[-1][1:] = [target['frequency'], strength]
+            continue
+        clusters.append([target['frequency'], target['frequency'], strength])
+
+    if len(clusters) == 1:
+        return [(int(clusters[0][1]), duration)]
+
+    cycle = min(duration, RTL433_HOP_CYCLE)
+    fits = max(1, int(cycle // RTL433_MIN_DWELL))
+    if len(clusters) > fits:
+        kept = sorted(clusters, key=lambda c: c[2], reverse=True)[:fits]
+        dropped = [c for c in clusters if c not in kept]
+        clusters = [c for c in clusters if c in kept]
+        print(f"[!] A {cycle}s rtl_433 hop cycle fits {fits} hop(s), dropping "
+              f"{', '.join(f'{freq/1e6:.3f}' for _, freq, _ in dropped)} MHz")
+        if len(clusters) == 1:
+            return [(int(clusters[0][1]), duration)]
+
+    # Floors keep the total within the cycle
+    spare = cycle - RTL433_MIN_DWELL * len(clusters)
+    total = sum(strength for _, _, strength in clusters)
+    return [(int(freq), RTL433_MIN_DWELL + int(spare * strength / total))
+            for _, freq, strength in clusters]
+
+
+def rtl433_hop_command(hops, duration=30, device=0):
+    """rtl_433 command line tuning each (frequency, seconds) hop in turn"""
+    cmd = ['timeout', str(duration), 'rtl_433', '-d', str(device)]
+    for frequency, _ in hops:
+        cmd += ['-f', str(int(frequency))]
+    if len(hops) > 1:
+        # One -H per -f: rtl_433 stays on each frequency for its own interval
+        for _, seconds in hops:
+            cmd += ['-H', str(seconds)]
+    # -M level tags every record with the frequency it was heard on
+    return cmd + ['-F', 'json', '-M', 'level', '-M', 'time:unix']
+
+
+def describe_hops(hops):
+    return ', '.join(f"{freq/1e6:.3f} MHz {seconds}s" for freq, seconds in hops)
+
+
+def decode_signal(frequency, decoder, duration=30, device=0, devices=None, hops=None):
+    """Attempt to decode signal using appropriate tool
+
+    rtl_433 output is folded into an Rtl433DeviceTable (a fresh one unless
+    devices is given). Unless REFRESH is 0 the console only gets a summary
+    redrawn REFRESH times a second (see DecoderOutput) and raw lines go to
+    DECODE_LOG. With hops (see plan_rtl433_hops) one rtl_433 hops over all
+    of them.
+    """
+    if hops:
+        print(f"\n[*] Decoding {len(hops)} frequencies with one hopping {decoder}...")
+        print(f"    Hops: {describe_hops(hops)}")
+        cmd = rtl433_hop_command(hops, duration, device)
+    else:
+        print(f"\n[*] Decoding {frequency/1e6:.3f} MHz with {decoder}...")
+        cmd = decoder_command(frequency, decoder, duration, device)
+    if cmd is None:
+        return None
+
+    resource = 'catsniffer' if decoder == 'catsniffer' else f'rtlsdr:{device}'
+    with device_lease(resource, DECODE_PRIORITY, f'rf-wideband-scanner {decoder}'):
+        # Run decoder
         try:
-            for line in process.stdout:
-                print(f"    {line.rstrip()}")
-        except KeyboardInterrupt:
-            print("\n[*] Stopping decoder...")
-            process.terminate()
+            print(f"    Command: {' '.join(cmd)}")
+            print(f"    Duration: {duration} seconds")
+            print(f"    Press Ctrl+C to stop early\n")
+
+            if decoder == 'rtl_433' and devices is None:
+                devices = Rtl433DeviceTable()
+            output = None
+            if REFRESH > 0:
+                where = describe_hops(hops) if hops else f"{frequency/1e6:.3f} MHz"
+                output = DecoderOutput(decoder, where, devices, REFRESH, DECODE_LOG)
+
+            try:
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    universal_newlines=True
+                )
+            except OSError:
+                if output is not None:
+                    output.close()
+                raise
+
+            # Stream output
+            try:
+                for line in process.stdout:
+                    dev = devices.feed(line) if decoder == 'rtl_433' else None
+                    record_decoder_output(decoder, frequency, line, dev)
+                    if output is not None:
+                        output.line(line, dev)
+                    elif dev is not None:
+                        print(f"    {Rtl433DeviceTable.describe(dev)}")
+                    else:
+                        print(f"    {line.rstrip()}")
+            except KeyboardInterrupt:
+                print("\n[*] Stopping decoder...")
+                process.terminate()
+            finally:
+                if output is not None:
+                    output.close()
+
+            process.wait(timeout=5)
+            if decoder == 'rtl_433':
+                close_device_table(devices)
+
+        except subprocess.TimeoutExpired:
+            process.kill()
+        except Exception as e:
+            print(f"[!] Decoder error: {e}")
+
+
+class DecodeCache:
+    """Last auto-decode result per emitter, so known emitters aren't decoded again
+
+    Emitters are keyed by frequency cell and power bucket; lookups also try
+    the neighbouring cells and buckets, so an emitter sitting on a boundary
+    still matches. Entries expire after ttl seconds (miss_ttl when nothing
+    was decoded, so a silent emitter gets another try sooner) and past
+    max_entries the least recently used one is dropped.
+    """
+
+    def __init__(self, ttl=DECODE_CACHE_TTL, miss_ttl=DECODE_CACHE_MISS_TTL,
+                 max_entries=DECODE_CACHE_MAX):
+        self.entries = OrderedDict()  # least recently used first
+        self.ttl = ttl
+        self.miss_ttl = min(miss_ttl, ttl)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.lock = threading.Lock()  # stored from the dispatcher's loop thread
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def key(signal):
+        return (int(round(signal['frequency'] / DECODE_CACHE_SPAN)),
+                int(round(signal['power'] / DECODE_CACHE_POWER_STEP)))
+
+    def lookup(self, signal, now=None):
+        """The unexpired entry for this signal's emitter, or None"""
+        now = now or time.time()
+        cell, bucket = self.key(signal)
+        with self.lock:
+            for key in itertools.product((cell, cell - 1, cell + 1), (bucket, bucket - 1, bucket + 1)):
+                entry = self.entries.get(key)
+                if entry is None:
+                    continue
+                if entry['expires'] <= now:
+                    del self.entries[key]
+                    continue
+                self.entries.move_to_end(key)
+                entry['hits'] += 1
+                self.hits += 1
+                return entry
+        return None
+
+    def store(self, signal, decoder, results, now=None):
+        """Remember what decoding a signal gave (results: what was heard, may be empty)"""
+        now = now or time.time()
+        key = self.key(signal)
+        with self.lock:
+            self.entries[key] = {
+                'frequency': signal['frequency'], 'decoder': decoder, 'results': results,
+                'time': now, 'expires': now + (self.ttl if results else self.miss_ttl), 'hits': 0
+            }
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    @staticmethod
+    def describe(entry, now=None):
+        age = (now or time.time()) - entry['time']
+        heard = ', '.join(entry['results'][:3]) or 'nothing decoded'
+        if len(entry['results']) > 3:
+            heard += f" +{len(entry['results']) - 3} more"
+        return f"{heard} ({entry['decoder']}, {int(age // 60)}m ago)"
+
+    def summary(self):
+        return f"{len(self)} emitter(s) known, {self.hits} decode(s) skipped"
+
+
+class DecoderDispatcher:
+    """Runs decoders concurrently on an asyncio loop in a background thread
+
+    Jobs borrow a free RTL-SDR from the shared DevicePool (or the CatSniffer
+    lock) and lease it from the device arbiter, stream their output through async readers and are stopped at
+    their duration plus a grace period or when cancelled, so the scan loop
+    in the main thread keeps running while they decode. With a DecodeCache,
+    what each job decoded is remembered for the signals it was started for.
+    """
+
+    GRACE = 5  # seconds past the decode duration before a job is killed
+    MAX_PENDING = 16  # alerts beyond this many queued/running jobs are dropped
+
+    def __init__(self, pool, on_line=None, devices=None, cache=None):
+        self.pool = pool
+        self.on_line = on_line or self._print_line
+        self.cache = cache
+        # rtl_433 records from every job land in one device table
+        self.devices = devices if devices is not None else Rtl433DeviceTable()
+        self.jobs = []  # queued and running only; finished jobs are dropped
+        self.submitted = 0
+        self.loop = asyncio.new_event_loop()
+        self.catsniffer = None
+        # Blocking arbiter waits run here, off the event loop
+        self.leaser = ThreadPoolExecutor(max_workers=len(pool) + 1)
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def _print_line(self, job, line, dev=None):
+        if dev is not None:
+            line = Rtl433DeviceTable.describe(dev)
+        where = f"{len(job['hops'])} hops" if job['hops'] else f"{job['frequency']/1e6:.3f} MHz"
+        print(f"    [{where} {job['decoder']}] {line}")
+
+    def submit(self, frequency, decoder, duration=30, hops=None, signals=None):
+        """Queue a decode job; returns its job dict (see 'state' and 'future')
+
+        hops makes an rtl_433 job hop over several frequencies (see
+        plan_rtl433_hops); frequency is then the first of them. signals are
+        the detections or alerts the job decodes, for the cache.
+        """
+        self.submitted += 1
+        job = {
+            'id': self.submitted,
+            'frequency': frequency,
+            'decoder': decoder,
+            'duration': duration,
+            'hops': hops,
+            'signals': signals or [],
+            'heard': {},  # rtl_433 device -> Hz it was heard on
+            'device': None,
+            'state': 'queued',
+            'lines': 0
+        }
+        job['future'] = asyncio.run_coroutine_threadsafe(self._run(job), self.loop)
+        self.jobs.append(job)
+        # Also covers jobs cancelled before their coroutine ever started
+        job['future'].add_done_callback(lambda future: self._forget(job))
+        return job
+
+    def _forget(self, job):
+        try:
+            self.jobs.remove(job)
+        except ValueError:
+            pass
+
+    def active(self):
+        return [job for job in list(self.jobs) if job['state'] in ('queued', 'running')]
+
+    def is_decoding(self, frequency, tolerance=100000):
+        """Whether a queued or running job already covers this frequency"""
+        return any(abs(freq - frequency) <= tolerance for job in self.active()
+                   for freq, _ in job['hops'] or [(job['frequency'], None)])
+
+    def cancel(self, job):
+        job['future'].cancel()
+
+    def wait(self, jobs=None):
+        """Block until the given (default: all outstanding) jobs have finished"""
+        for job in jobs or list(self.jobs):
+            try:
+                job['future'].result()
+            except Exception:
+                pass
 
-        process.wait(timeout=5)
+    def close(self):
+        """Cancel outstanding jobs and stop the event loop"""
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(
+                timeout=self.GRACE + 1)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=1)
+        self.leaser.shutdown(wait=False)
+
+    async def _shutdown(self):
+        # Cancel inside the loop and let each job's cleanup (terminating its
+        # decoder, returning its device) finish before the loop stops
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _acquire(self, job):
+        if job['decoder'] == 'catsniffer':
+            if self.catsniffer is None:
+                self.catsniffer = asyncio.Lock()
+            await self.catsniffer.acquire()
+            device, resource = None, 'catsniffer'
+        else:
+            # Poll rather than block an executor thread, so a cancelled job
+            # can't take a device it will never give back
+            while True:
+                try:
+                    device = self.pool.free.get_nowait()
+                    break
+                except queue.Empty:
+                    await asyncio.sleep(0.2)
+            resource = f'rtlsdr:{device}'
+
+        try:
+            job['lease'] = await self._lease(resource, job)
+        except BaseException:
+            self._release(job, device)
+            raise
+        return device
+
+    async def _lease(self, resource, job):
+        """Wait for the arbiter's lease on a device without blocking the loop"""
+        request = request_device(resource, DECODE_PRIORITY,
+                                 f"rf-wideband-scanner {job['decoder']}")
+        if request is None:
+            return None
+        future = self.leaser.submit(wait_for_device, request)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Unblock the waiting thread; a lease granted meanwhile goes back
+            request.cancel()
+            future.add_done_callback(
+                lambda f: f.exception() is None and f.result() and f.result().close())
+            raise
+
+    def _remember(self, job):
+        """Cache what a finished job decoded for each signal it was started for"""
+        for signal in job['signals']:
+            if job['decoder'] != 'rtl_433':
+                results = [f"{job['lines']} line(s) of output"] if job['lines'] else []
+            elif job['hops']:
+                # Only the devices heard near this signal's own frequency
+                results = sorted(name for name, freq in job['heard'].items()
+                                 if freq is None or abs(freq - signal['frequency']) <= RTL433_HOP_SPAN)
+            else:
+                results = sorted(job['heard'])
+            self.cache.store(signal, job['decoder'], results)
+
+    def _release(self, job, device):
+        lease = job.pop('lease', None)
+        if lease is not None:
+            lease.close()
+        if job['decoder'] == 'catsniffer':
+            self.catsniffer.release()
+        else:
+            self.pool.free.put(device)
+
+    async def _run(self, job):
+        try:
+            device = await self._acquire(job)
+        except asyncio.CancelledError:
+            job['state'] = 'cancelled'
+            raise
 
+        process = None
+        try:
+            job['device'] = device
+            if job['hops']:
+                cmd = rtl433_hop_command(job['hops'], job['duration'], device)
+            else:
+                cmd = decoder_command(job['frequency'], job['decoder'], job['duration'],
+                                      device if device is not None else 0)
+            if cmd is None:
+                job['state'] = 'failed'
+                return job
+
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+            job['state'] = 'running'
+
+            deadline = self.loop.time() + job['duration'] + self.GRACE
+            while True:
+                remaining = deadline - self.loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                line = await asyncio.wait_for(process.stdout.readline(), remaining)
+                if not line:
+                    break
+                job['lines'] += 1
+                text = line.decode('utf-8', errors='replace').rstrip()
+                dev = self.devices.feed(text) if job['decoder'] == 'rtl_433' else None
+                record_decoder_output(job['decoder'], job['frequency'], text, dev)
+                if dev is not None:
+                    name = ' '.join(str(v) for v in (dev['model'], dev['id']) if v is not None)
+                    job['heard'][name] = dev['freq'] * 1e6 if dev['freq'] else None
+                self.on_line(job, text, dev)
+            await process.wait()
+            # timeout(1) exits 124 when the duration is up; 126/127 mean the
+            # decoder couldn't be run at all
+            job['state'] = 'failed' if process.returncode in (126, 127) else 'done'
+            if self.cache is not None:
+                self._remember(job)
+
+        except asyncio.TimeoutError:
+            job['state'] = 'timeout'
+        except asyncio.CancelledError:
+            job['state'] = 'cancelled'
+            raise
+        except OSError as e:
+            job['state'] = 'failed'
+            print(f"[!] Decoder error: {e}")
+        finally:
+            if process is not None and process.returncode is None:
+                process.terminate()
+                try:
+                    await asyncio.wait_for(process.wait(), self.GRACE)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+            self._release(job, device)
+        return job
+
+
+def dispatch_alerts(dispatcher, alerts, duration):
+    """Start decoders for newly alerted signals that aren't already being decoded
+
+    Emitters the dispatcher's cache already has a result for are skipped,
+    so decoder time goes to emitters not seen before.
+    """
+    freqs = [a['frequency'] for a in alerts]
+    hopping = []
+    for alert, idx in zip(alerts, BAND_PLAN.lookup_many(freqs).tolist()):
+        if dispatcher.is_decoding(alert['frequency']):
+            continue
+        known = dispatcher.cache.lookup(alert) if dispatcher.cache is not None else None
+        if known is not None:
+            print(f"[*] Known emitter at {alert['frequency']/1e6:.3f} MHz: "
+                  f"{DecodeCache.describe(known)}, not decoding again")
+            continue
+        if len(dispatcher.active()) >= dispatcher.MAX_PENDING:
+            print(f"[!] Decoder queue full, skipping {alert['frequency']/1e6:.3f} MHz")
+            continue
+        decoder = BAND_PLAN.decoder_info(idx)['decoder']
+        if RTL433_HOP and decoder == 'rtl_433':
+            hopping.append(alert)
+            continue
+        print(f"[*] Queued {decoder} on {alert['frequency']/1e6:.3f} MHz for {duration}s")
+        dispatcher.submit(alert['frequency'], decoder, duration, signals=[alert])
+
+    # ISM alerts from one cycle share a single dongle
+    if hopping:
+        hops = plan_rtl433_hops(hopping, duration)
+        if len(hops) == 1:
+            print(f"[*] Queued rtl_433 on {hops[0][0]/1e6:.3f} MHz for {duration}s")
+            dispatcher.submit(hops[0][0], 'rtl_433', duration, signals=hopping)
+        else:
+            print(f"[*] Queued rtl_433 hopping {describe_hops(hops)} for {duration}s")
+            dispatcher.submit(hops[0][0], 'rtl_433', duration, hops=hops, signals=hopping)
+
+
+def stream_scan_band(start, end, integration_time=1, meter=None, bin_size=None, device=0,
+                     on_row=None, threshold=None):
+    """Scan one band, printing detections as their hop rows arrive"""
+    print(f"[*] Streaming {start/1e6:.1f} - {end/1e6:.1f} MHz (device {device})...")
+
+    signals = []
+    try:
+        for sig in stream_frequency_range(start, end, integration_time, device=device,
+                                          meter=meter, bin_size=bin_size, on_row=on_row,
+                                          threshold=threshold):
+            print(f"      + {sig['frequency']/1e6:.3f} MHz: {sig['strength']:.1f} dB, "
+                  f"{format_bandwidth(sig['bandwidth'])} wide")
+            signals.append(sig)
     except subprocess.TimeoutExpired:
-        process.kill()
+        print("[!] Scan timeout")
+    except ReplayFinished as e:
+        print(f"[*] Replay: {e}")
     except Exception as e:
-        print(f"[!] Decoder error: {e}")
+        print(f"[!] Scan error: {e}")
+    return signals
 
 
-def quick_scan_all_bands():
-    """Quick scan across all frequency bands"""
+def scan_plan_parallel(plan, pool, meter=None, stream=False, on_row=None, threshold=None):
+    """Sweep plan segments concurrently, one rtl_power per free device
+
+    Segments are handed out longest first so the last device to finish
+    doesn't start the biggest job. Returns all detections, sorted by
+    frequency.
+    """
+    def sweep(seg):
+        with pool.device() as dev:
+            scan = stream_scan_band if stream else scan_frequency_range
+            return scan(seg['start'], seg['end'], SCAN_INTEGRATION_TIME, meter=meter,
+                        bin_size=seg['bin_size'], device=dev, on_row=on_row, threshold=threshold)
+
+    segments = sorted(plan.segments, key=lambda seg: seg['time'], reverse=True)
+    with ThreadPoolExecutor(max_workers=len(pool)) as executor:
+        results = list(executor.map(sweep, segments))
+
+    signals = [sig for result in results for sig in result]
+    signals.sort(key=lambda x: x['frequency'])
+    return signals
+
+
+def collect_band_detections(signals, name, detector, span=None):
+    """Print a band's results and return its top detections
+
+    span is the (start, end) Hz the signals were swept over, for the tracker.
+    """
+    METRICS.add(detections=len(signals))
+    if span is not None:
+        track_signals(signals, *span)
+    with METRICS.span('print'):
+        return print_band_detections(signals, name, detector)
+
+
+def print_band_detections(signals, name, detector):
+    detections = []
+    record_events('detection', signals, [name] * len(signals))
+    if signals:
+        # Sort by signal strength
+        signals.sort(key=lambda x: x['strength'], reverse=True)
+
+        print(f"    ✓ Found {len(signals)} signal(s)")
+
+        # Show top 3 strongest
+        top = signals[:3]
+        decoders = detector.get_decoders_for_frequencies([sig['frequency'] for sig in top])
+        for sig, decoder_info in zip(top, decoders):
+            print(f"      {sig['frequency']/1e6:.3f} MHz: {sig['strength']:.1f} dB, "
+                  f"{format_bandwidth(sig['bandwidth'])} wide → {decoder_info['decoder']}")
+
+            detections.append({
+                'frequency': sig['frequency'],
+                'strength': sig['strength'],
+                'power': sig['power'],
+                'bandwidth': sig['bandwidth'],
+                'integrated_power': sig['integrated_power'],
+                'band': name,
+                'decoder': decoder_info['decoder']
+            })
+    else:
+        print(f"    - No signals detected")
+    return detections
+
+
+def quick_scan_all_bands(stream=False, meter=None, plan=None, cycle=0, pool=None, on_row=None,
+                         survey=True, threshold=None):
+    """Quick scan across all frequency bands
+
+    survey=False leaves out the CatSniffer channel survey, e.g. while
+    monitoring, where only the rtl_power rows are used. threshold
+    overrides SIGNAL_THRESHOLD for this scan only.
+    """
+    threshold = SIGNAL_THRESHOLD if threshold is None else threshold
     print("=" * 80)
     print("WIDEBAND RF SCANNER")
     print("=" * 80)
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Signal threshold: {SIGNAL_THRESHOLD} dB above noise\n")
+    print(f"Signal threshold: {threshold} dB above noise\n")
 
     all_detections = []
-    detector = SignalDetector()
+    detector = SignalDetector(threshold)
+    started = time.monotonic()
 
     # Scan RTL-SDR bands (24 MHz - 1.7 GHz)
-    rtl_bands = [b for b in FREQUENCY_BANDS if b[1] <= 1700000000]
-
-    for start, end, name, decoder, description in rtl_bands:
-        print(f"\n[{name}] {start/1e6:.1f} - {end/1e6:.1f} MHz ({description})")
-
-        signals = scan_frequency_range(start, end, SCAN_INTEGRATION_TIME)
-
-        if signals:
-            # Sort by signal strength
-            signals.sort(key=lambda x: x['strength'], reverse=True)
+    if plan is None:
+        plan = SweepPlan(rtl_scan_bands())
+    if pool is None:
+        pool = DevicePool()
 
-            print(f"    ✓ Found {len(signals)} signal(s)")
-
-            # Show top 3 strongest
-            for sig in signals[:3]:
-                decoder_info = detector.get_decoder_for_frequency(sig['frequency'])
-                print(f"      {sig['frequency']/1e6:.3f} MHz: {sig['strength']:.1f} dB → {decoder_info['decoder']}")
+    if len(pool) > 1:
+        # Several dongles: sweep concurrently, then report band by band
+        print(f"[*] Sweeping {len(plan.segments)} segment(s) on {len(pool)} devices")
+        bands = rtl_scan_bands()
+        band_signals = assign_to_bands(scan_plan_parallel(plan, pool, meter, stream, on_row,
+                                                          threshold), bands)
+        for start, end, name, decoder, description in bands:
+            print(f"\n[{name}] {start/1e6:.1f} - {end/1e6:.1f} MHz ({description})")
+            all_detections += collect_band_detections(band_signals[name], name, detector,
+                                                      (start, end))
+    else:
+        for seg in plan.ordered(cycle):
+            scan = stream_scan_band if stream else scan_frequency_range
+            with pool.device() as device:
+                signals = scan(seg['start'], seg['end'], SCAN_INTEGRATION_TIME, meter=meter,
+                               bin_size=seg['bin_size'], device=device, on_row=on_row,
+                               threshold=threshold)
 
-                all_detections.append({
-                    'frequency': sig['frequency'],
-                    'strength': sig['strength'],
-                    'power': sig['power'],
-                    'band': name,
-                    'decoder': decoder_info['decoder']
-                })
-        else:
-            print(f"    - No signals detected")
+            band_signals = assign_to_bands(signals, seg['bands'])
+            for start, end, name, decoder, description in seg['bands']:
+                print(f"\n[{name}] {start/1e6:.1f} - {end/1e6:.1f} MHz ({description})")
+                all_detections += collect_band_detections(band_signals[name], name, detector,
+                                                          (start, end))
+    METRICS.observe('cycle', time.monotonic() - started)
 
     # CatSniffer 2.4 GHz scan
     print(f"\n[2.4 GHz ISM] 2400 - 2483.5 MHz (BLE/Zigbee/WiFi)")
-    print(f"    Note: Use CatSniffer BLE/Zigbee capture tools for 2.4 GHz")
-    print(f"    Automatic scan not available (protocol-specific)")
+    sniffer = ChannelSurvey()
+    if not survey or not CATSNIFFER_SURVEY or REPLAY is not None:
+        print(f"    Channel survey skipped")
+    elif not sniffer.available():
+        print(f"    CatSniffer not found ({sniffer.port}), channel survey not available")
+    else:
+        signals = ChannelSurvey.signals(sniffer.run())
+        all_detections += collect_band_detections(signals, '2.4 GHz ISM', detector)
 
     return all_detections
 
 
-def interactive_decoder(detections):
+def interactive_decoder(detections, pool=None, devices=None):
     """Allow user to select signal to decode"""
     if not detections:
         print("\n[!] No signals detected")
@@ -304,67 +3344,686 @@ def interactive_decoder(detections):
     for i, det in enumerate(detections, 1):
         print(f"[{i}] {det['frequency']/1e6:.3f} MHz ({det['band']})")
         print(f"    Strength: {det['strength']:.1f} dB")
+        print(f"    Bandwidth: {format_bandwidth(det['bandwidth'])}")
         print(f"    Decoder: {det['decoder']}")
         print()
 
     print("[0] Exit")
     print()
 
+    if pool is None:
+        pool = DevicePool()
+
     try:
-        choice = input("Select signal to decode (number): ").strip()
+        print("Prefix with h to hop one rtl_433 over the ISM signals (h alone: all of them)")
+        choice = input("Select signal(s) to decode (number, or e.g. 1,3,4): ").strip()
 
         if choice == '0' or not choice:
             return
 
-        idx = int(choice) - 1
-        if 0 <= idx < len(detections):
-            selected = detections[idx]
+        hop = choice[:1].lower() == 'h'
+        if hop:
+            choice = choice[1:]
+        indices = [int(c) - 1 for c in choice.split(',') if c.strip()]
+        if hop and not indices:
+            indices = [i for i, det in enumerate(detections) if det['decoder'] == 'rtl_433']
+        if not indices or not all(0 <= idx < len(detections) for idx in indices):
+            print("[!] Invalid selection")
+            return
 
-            duration = input(f"Capture duration in seconds [30]: ").strip()
-            duration = int(duration) if duration else 30
+        duration = input(f"Capture duration in seconds [30]: ").strip()
+        duration = int(duration) if duration else 30
 
-            decode_signal(selected['frequency'], selected['decoder'], duration)
-        else:
-            print("[!] Invalid selection")
+        decode_targets([detections[idx] for idx in indices], duration, pool, devices, hop=hop)
 
     except (ValueError, KeyboardInterrupt):
         print("\n[*] Cancelled")
 
 
-def continuous_monitor():
+def decode_targets(targets, duration, pool, devices=None, hop=False):
+    """Decode one signal in the foreground, or several side by side on the free devices
+
+    With hop, the rtl_433 targets share one dongle hopping between them.
+    """
+    hops = None
+    if hop:
+        hops = plan_rtl433_hops([t for t in targets if t['decoder'] == 'rtl_433'], duration)
+        if len(hops) > 1:
+            targets = [t for t in targets if t['decoder'] != 'rtl_433']
+        else:
+            hops = None
+
+    if hops and not targets:
+        decode_signal(hops[0][0], 'rtl_433', duration, device=pool.devices[0],
+                      devices=devices, hops=hops)
+        return
+    if not hops and len(targets) == 1:
+        decode_signal(targets[0]['frequency'], targets[0]['decoder'], duration,
+                      device=pool.devices[0], devices=devices)
+        return
+
+    dispatcher = DecoderDispatcher(pool, devices=devices)
+    try:
+        if hops:
+            print(f"[*] Queued rtl_433 hopping {describe_hops(hops)}")
+            dispatcher.submit(hops[0][0], 'rtl_433', duration, hops=hops)
+        for target in targets:
+            print(f"[*] Queued {target['decoder']} on {target['frequency']/1e6:.3f} MHz")
+            dispatcher.submit(target['frequency'], target['decoder'], duration)
+        print(f"    {len(pool)} device(s), press Ctrl+C to stop early\n")
+        dispatcher.wait()
+    finally:
+        dispatcher.close()
+        close_device_table(dispatcher.devices)
+
+
+def close_device_table(devices):
+    """Write the final rtl_433 snapshot and summary, if anything was decoded"""
+    if devices.records:
+        devices.snapshot()
+        devices.print_table()
+
+
+def monitor_persistent_session(meter, baseline, pool, plan, archive=None, dispatcher=None,
+                               decode_duration=30):
+    """Monitor all RTL-SDR bands from one long-running rtl_power process"""
+    with pool.device() as device:
+        monitor_session_on_device(meter, baseline, device, plan, archive, dispatcher,
+                                  decode_duration)
+
+
+def monitor_session_on_device(meter, baseline, device, plan, archive=None, dispatcher=None,
+                              decode_duration=30):
+    """Run the persistent session on a device borrowed from the pool"""
+    rtl_bands = rtl_scan_bands()
+    ranges = merge_bands(rtl_bands)
+    detector = SignalDetector()
+    # One process sweeps every band, so it runs at the plan's resolution like --full
+    session = RtlPowerSession(ranges[0][0], ranges[-1][1], SCAN_INTEGRATION_TIME,
+                              bin_size=plan.resolution, device=device, meter=meter)
+
+    print(f"[*] Persistent rtl_power session: {ranges[0][0]/1e6:.1f} - {ranges[-1][1]/1e6:.1f} MHz "
+          f"covering {len(ranges)} band range(s), {plan.resolution/1e3:.0f} kHz bins\n")
+
+    last = time.monotonic()
+    for cycle, rows in enumerate(session.sweeps(), 1):
+        # Hops between the monitored bands are swept but not reported
+        rows = [r for r in rows if any(start < r[1] and r[0] < end for start, end in ranges)]
+
+        band_signals = assign_to_bands(detect_sweep(rows), rtl_bands)
+
+        print(f"\n--- Sweep {cycle} ({datetime.now().strftime('%H:%M:%S')}) ---")
+        detections = []
+        for start, end, name, decoder, description in rtl_bands:
+            print(f"[{name}] {start/1e6:.1f} - {end/1e6:.1f} MHz")
+            detections += collect_band_detections(band_signals[name], name, detector,
+                                                  (start, end))
+
+        alerts = baseline.update(rows)
+        report_baseline_alerts(alerts)
+        if dispatcher:
+            dispatch_alerts(dispatcher, alerts, decode_duration)
+        if archive:
+            archive.append(rows)
+        now = time.monotonic()
+        METRICS.observe('cycle', now - last)
+        last = now
+        print(f"[*] {meter.report()}")
+
+    if REPLAY is not None:
+        print("\n[*] Replay finished")
+
+
+def monitor_adaptive(plan, pool, meter, baseline, budget=1.0, archive=None, dispatcher=None,
+                     decode_duration=30):
+    """Monitor with per-segment revisit intervals instead of fixed cycles"""
+    # Replaying flat out, revisit intervals mustn't be waited out in wall time
+    scheduler = DwellScheduler(plan.segments, budget=budget, devices=len(pool),
+                               virtual=REPLAY is not None and REPLAY.speed == 0)
+    detector = SignalDetector()
+    stop = threading.Event()
+    print_lock = threading.Lock()
+    totals = {'detections': 0, 'visits': 0, 'round_started': time.monotonic()}
+
+    def worker():
+        while not stop.is_set():
+            entry = scheduler.next(stop)
+            if entry is None:
+                return
+            seg = entry['segment']
+            rows = []
+            # Borrow a device per visit so decoders can use it in between
+            with pool.device() as device:
+                signals = scan_frequency_range(seg['start'], seg['end'], entry['dwell'], meter=meter,
+                                               bin_size=seg['bin_size'], device=device,
+                                               on_row=rows.append)
+            if REPLAY is not None and not rows:
+                # Capture exhausted for this segment
+                stop.set()
+                return
+            alerts = baseline.update(rows)
+            if archive:
+                archive.append(rows)
+            band_signals = assign_to_bands(signals, seg['bands'])
+            scheduler.update(entry, sum(len(v) for v in band_signals.values()))
+
+            with print_lock:
+                detections = []
+                for start, end, name, decoder, description in seg['bands']:
+                    print(f"\n[{name}] {start/1e6:.1f} - {end/1e6:.1f} MHz "
+                          f"(dwell {entry['dwell']}s, next in {entry['revisit']:.0f}s)")
+                    detections += collect_band_detections(band_signals[name], name, detector,
+                                                          (start, end))
+                report_baseline_alerts(alerts)
+                if dispatcher:
+                    dispatch_alerts(dispatcher, alerts, decode_duration)
+
+                totals['detections'] += len(detections)
+                totals['visits'] += 1
+                if totals['visits'] % len(plan.segments) == 0:
+                    # A round visits as many segments as the plan has, so
+                    # its duration is comparable to a fixed-cycle sweep
+                    now = time.monotonic()
+                    METRICS.observe('cycle', now - totals['round_started'])
+                    totals['round_started'] = now
+                    hardware = meter.hardware_seconds()
+                    print(f"\n[*] {meter.report()}")
+                    print(f"[*] {totals['detections']} detection(s), "
+                          f"{60.0 * totals['detections'] / max(hardware, 1e-9):.1f} per minute of hardware time")
+                    scheduler.describe()
+
+    threads = [threading.Thread(target=worker, daemon=True) for dev in pool.devices]
+    for t in threads:
+        t.start()
+    try:
+        while any(t.is_alive() for t in threads):
+            time.sleep(0.5)
+    finally:
+        stop.set()
+        with scheduler.cond:
+            scheduler.cond.notify_all()
+
+
+def continuous_monitor(persistent=False, plan=None, pool=None, adaptive=False, budget=1.0,
+                       archive=None, auto_decode=False, decode_duration=30, devices=None,
+                       full=False, chunk_size=FULL_SWEEP_CHUNK, decode_cache_ttl=DECODE_CACHE_TTL,
+                       interval=MONITOR_INTERVAL):
     """Continuously monitor for new signals"""
     print("=" * 80)
     print("CONTINUOUS RF MONITORING MODE")
     print("=" * 80)
-    print("Scanning all bands every 30 seconds...")
+    if full:
+        print(f"Sweeping {FULL_SWEEP_START/1e6:.0f} - {RTL_MAX_FREQ/1e6:.0f} MHz continuously...")
+    elif persistent:
+        print("Sweeping all bands continuously with one rtl_power process...")
+    elif adaptive:
+        print("Revisiting busy bands often and quiet bands rarely...")
+    else:
+        print(f"Scanning all bands every {interval:.0f} seconds...")
     print("Press Ctrl+C to stop\n")
 
-    previous_signals = set()
+    if pool is None:
+        pool = DevicePool()
+    sweepers = len(pool)
+    if persistent:
+        sweepers = 1
+    elif full and auto_decode:
+        sweepers = len(pool) - 1
+    meter = IntegrationMeter(devices=sweepers)
+    if plan is None:
+        plan = SweepPlan(rtl_scan_bands())
+
+    # New signals are judged against each bin's own history, not the last scan
+    if full:
+        baseline = SpectrumBaseline(FULL_SWEEP_START, RTL_MAX_FREQ, plan.resolution)
+    else:
+        baseline = SpectrumBaseline(min(seg['start'] for seg in plan.segments),
+                                    max(seg['end'] for seg in plan.segments), plan.resolution)
+    print(f"[*] Baseline: {baseline.cells} bins of {plan.resolution/1e3:.0f} kHz")
+
+    # Decoders for new signals run alongside the scan on whichever device is free
+    dispatcher = None
+    if auto_decode:
+        cache = DecodeCache(decode_cache_ttl) if decode_cache_ttl > 0 else None
+        dispatcher = DecoderDispatcher(pool, devices=devices, cache=cache)
 
     try:
+        if full:
+            # Sweepers hold their devices for good, so keep one for the decoders
+            sweep = FullSweep(pool, baseline, resolution=plan.resolution, chunk_size=chunk_size,
+                              meter=meter, devices=sweepers)
+            sweep.describe()
+            sweep.monitor(dispatcher, decode_duration)
+            print(f"[*] {meter.report()}")
+            return
+
+        if persistent:
+            monitor_persistent_session(meter, baseline, pool, plan, archive=archive,
+                                       dispatcher=dispatcher, decode_duration=decode_duration)
+            return
+
+        plan.describe(len(pool))
+        if adaptive:
+            monitor_adaptive(plan, pool, meter, baseline, budget, archive=archive,
+                             dispatcher=dispatcher, decode_duration=decode_duration)
+            return
+
+        cycle = 0
         while True:
-            detections = quick_scan_all_bands()
+            rows = []
+            quick_scan_all_bands(meter=meter, plan=plan, cycle=cycle, pool=pool, on_row=rows.append,
+                                 survey=False)
+            cycle += 1
+            if REPLAY is not None and not rows:
+                print(f"\n[*] Replay finished after {cycle - 1} cycle(s)")
+                print(f"[*] {meter.report()}")
+                return
 
             # Check for new signals
-            current_signals = set((d['frequency'], d['band']) for d in detections)
-            new_signals = current_signals - previous_signals
+            alerts = baseline.update(rows)
+            report_baseline_alerts(alerts)
+            if dispatcher:
+                dispatch_alerts(dispatcher, alerts, decode_duration)
+            if archive:
+                archive.append(rows)
+
+            print(f"\n[*] {meter.report()}")
+            if REPLAY is None:
+                print(f"[*] Waiting {interval:.0f} seconds before next scan...")
+                time.sleep(interval)
+
+    except KeyboardInterrupt:
+        print("\n\n[*] Monitoring stopped")
+        print(f"[*] {meter.report()}")
+        print(f"[*] Metrics: {METRICS.summary()}")
+    finally:
+        if dispatcher:
+            dispatcher.close()
+            close_device_table(dispatcher.devices)
+            if dispatcher.cache is not None:
+                print(f"[*] Decode cache: {dispatcher.cache.summary()}")
+        if archive:
+            archive.flush()
+        if TRACKER is not None:
+            TRACKER.print_table()
+
+
+class DaemonOutput:
+    """stdout stand-in that also streams each job's output to its client
+
+    Everything goes to the log. A thread that has claimed the output (see
+    claim) also sends its lines to its own sink, or to none; a thread that
+    never claimed it was started by the running job (parallel sweeps,
+    decoders) and sends its lines to that job's client.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.job_sink = None
+        self.local = threading.local()
+
+    def claim(self, sink):
+        """Send this thread's output to sink (None: the log only)"""
+        self.local.sink = sink
+        self.local.buffer = ''
+
+    def write(self, text):
+        self.stream.write(text)
+        sink = getattr(self.local, 'sink', self.job_sink)
+        if sink is not None:
+            buffer = getattr(self.local, 'buffer', '') + text
+            if '\n' in buffer:
+                lines, buffer = buffer.rsplit('\n', 1)
+                sink(lines + '\n')
+            self.local.buffer = buffer
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+        sink = getattr(self.local, 'sink', self.job_sink)
+        buffer = getattr(self.local, 'buffer', '')
+        if sink is not None and buffer:
+            sink(buffer)
+        self.local.buffer = ''
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class DaemonClient:
+    """One control connection: newline-delimited JSON requests and replies"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.reader = conn.makefile('rb')
+        self.gone = False
+        self.lock = threading.Lock()
+
+    def recv(self):
+        """Next request; {} for anything but a JSON object, None at EOF"""
+        line = self.reader.readline()
+        if not line:
+            return None
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return {}
+        return message if isinstance(message, dict) else {}
+
+    def send(self, message):
+        """Send a message; a client that hung up is remembered, not raised"""
+        data = json.dumps(message, default=float).encode() + b'\n'
+        with self.lock:
+            if self.gone:
+                return
+            try:
+                self.conn.sendall(data)
+            except OSError:
+                self.gone = True
 
-            if new_signals:
-                print("\n" + "!" * 80)
-                print("NEW SIGNAL(S) DETECTED!")
-                print("!" * 80)
-                for freq, band in new_signals:
-                    det = next(d for d in detections if d['frequency'] == freq and d['band'] == band)
-                    print(f"  {freq/1e6:.3f} MHz ({band}): {det['strength']:.1f} dB")
-                print()
+    def output(self, text):
+        self.send({'output': text})
 
-            previous_signals = current_signals
+    def wait_closed(self, timeout):
+        """Sleep up to timeout seconds; True as soon as the client hangs up"""
+        deadline = time.monotonic() + timeout
+        while not self.gone:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            readable, _, _ = select.select([self.conn], [], [], remaining)
+            if readable:
+                # Nothing is expected mid-job, so anything sent is discarded
+                try:
+                    self.gone = not self.conn.recv(4096)
+                except OSError:
+                    self.gone = True
+        return self.gone
 
-            print(f"\n[*] Waiting 30 seconds before next scan...")
-            time.sleep(30)
+    def close(self):
+        try:
+            self.reader.close()
+            self.conn.close()
+        except OSError:
+            pass
+
+
+class ScannerDaemon:
+    """Resident scanner answering scan/decode/monitor/status requests on a Unix socket
+
+    The band plan, sweep plan, device pool, rtl_433 device table, event store
+    and spectrum baseline stay loaded between requests, so a menu action
+    starts at once and every scan is judged against the same live baseline.
+    Jobs that use the radios run one at a time and their printed output is
+    streamed back to the client that asked for them; status never waits.
+    """
+
+    def __init__(self, plan, pool, devices):
+        self.plan = plan
+        self.pool = pool
+        self.devices = devices
+        self.baseline = SpectrumBaseline(min(seg['start'] for seg in plan.segments),
+                                         max(seg['end'] for seg in plan.segments), plan.resolution)
+        self.started = time.monotonic()
+        self.sweeps = 0
+        self.alerts = 0
+        self.jobs = 0
+        self.job = None
+        self.clients = 0
+        self.lock = threading.Lock()
+        self.job_lock = threading.Lock()
+        self.output = DaemonOutput(sys.stdout)
+
+    @contextmanager
+    def running(self, client, description):
+        """Hold the radios for one job, with its output going to the client"""
+        if not self.job_lock.acquire(blocking=False):
+            client.output(f"[*] Waiting for {self.job} to finish...\n")
+            self.job_lock.acquire()
+        try:
+            self.job = description
+            self.jobs += 1
+            self.output.claim(client.output)
+            self.output.job_sink = client.output
+            yield
+        finally:
+            self.output.flush()
+            self.output.job_sink = None
+            self.output.claim(None)
+            self.job = None
+            self.job_lock.release()
+
+    def scan_once(self, stream=False, survey=True, threshold=None):
+        """One quick scan cycle folded into the shared baseline"""
+        rows = []
+        detections = quick_scan_all_bands(stream=stream, plan=self.plan, pool=self.pool,
+                                          cycle=self.sweeps, on_row=rows.append, survey=survey,
+                                          threshold=threshold)
+        alerts = []
+        if rows:
+            alerts = self.baseline.update(rows)
+            self.sweeps += 1
+            self.alerts += len(alerts)
+            report_baseline_alerts(alerts)
+        return detections, alerts
+
+    def scan(self, client, message):
+        threshold = message.get('threshold')
+        with self.running(client, 'scan'):
+            detections, alerts = self.scan_once(bool(message.get('stream')),
+                                                threshold=None if threshold is None else int(threshold))
+        return {'ok': True, 'detections': detections, 'alerts': alerts}
+
+    def decode(self, client, message):
+        targets = []
+        for target in message.get('targets') or []:
+            frequency = int(float(target['frequency']))
+            decoder = target.get('decoder') or BAND_PLAN.lookup(frequency)['decoder']
+            targets.append({'frequency': frequency, 'decoder': decoder,
+                            'strength': target.get('strength')})
+        if not targets:
+            return {'ok': False, 'error': 'no targets given'}
+        duration = int(message.get('duration', 30))
+
+        freqs = ', '.join(f"{t['frequency']/1e6:.3f}" for t in targets)
+        with self.running(client, f'decode {freqs} MHz'):
+            decode_targets(targets, duration, self.pool, self.devices, hop=bool(message.get('hop')))
+        return {'ok': True}
+
+    def monitor(self, client, message):
+        """Scan every interval seconds until the client hangs up
+
+        The radios are only held while sweeping, so other requests can run
+        in between cycles.
+        """
+        interval = float(message.get('interval', MONITOR_INTERVAL))
+        threshold = message.get('threshold')
+        threshold = None if threshold is None else int(threshold)
+        cycles = 0
+        while not client.gone:
+            with self.running(client, 'monitor'):
+                self.scan_once(survey=False, threshold=threshold)
+                print(f"\n[*] Baseline: {self.sweeps} sweep(s), {self.alerts} alert(s) so far")
+                print(f"[*] Waiting {interval:.0f} seconds before next scan...")
+            cycles += 1
+            if REPLAY is not None or client.wait_closed(interval):
+                break
+        return {'ok': True, 'cycles': cycles}
+
+    def status(self, client=None, message=None):
+        return {
+            'ok': True,
+            'pid': os.getpid(),
+            'uptime': time.monotonic() - self.started,
+            'job': self.job,
+            'jobs': self.jobs,
+            'clients': self.clients,
+            'devices': list(self.pool.devices),
+            'baseline': {'cells': self.baseline.cells, 'sweeps': self.sweeps, 'alerts': self.alerts},
+            'rtl433_devices': len(self.devices),
+            'tracks': len(TRACKER) if TRACKER is not None else None,
+            'threshold': SIGNAL_THRESHOLD,
+            'metrics': METRICS.summary(),
+        }
+
+    def handle(self, conn):
+        # Other clients' jobs mustn't get this handler's own messages
+        self.output.claim(None)
+        client = DaemonClient(conn)
+        with self.lock:
+            self.clients += 1
+        try:
+            message = client.recv()
+            if message is None:
+                return
+            if not message:
+                client.send({'ok': False, 'error': 'bad request: expected a JSON object'})
+                return
+            handler = {'scan': self.scan, 'decode': self.decode,
+                       'monitor': self.monitor, 'status': self.status}.get(message.get('op'))
+            if handler is None:
+                client.send({'ok': False, 'error': f"unknown op {message.get('op')!r}"})
+                return
+            try:
+                client.send(handler(client, message))
+            except (KeyError, ValueError, TypeError) as e:
+                client.send({'ok': False, 'error': f"bad request: {e}"})
+            except Exception as e:
+                print(f"[!] {message.get('op')} failed: {e}")
+                client.send({'ok': False, 'error': str(e)})
+        finally:
+            with self.lock:
+                self.clients -= 1
+            client.close()
+
+
+def serve_daemon(daemon, socket_path=SCANNER_SOCKET):
+    """Accept control connections until SIGTERM or Ctrl+C"""
+    if os.path.exists(socket_path):
+        # Refuse to start twice; clear a socket left behind by a crash
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+            print(f"ERROR: A scanner daemon is already listening on {socket_path}")
+            sys.exit(1)
+        except OSError:
+            os.unlink(socket_path)
+        finally:
+            probe.close()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Create the socket owner/group-only, rather than chmod after bind
+    # leaves a window where anyone can connect
+    umask = os.umask(0o117)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(umask)
+    server.listen(8)
+
+    sys.stdout = daemon.output
+    daemon.output.claim(None)
+    print(f"[*] Scanner daemon listening on {socket_path} (pid {os.getpid()})")
+    print(f"[*] Devices: {', '.join(str(d) for d in daemon.pool.devices)}, "
+          f"baseline {daemon.baseline.cells} bins of {daemon.plan.resolution/1e3:.0f} kHz")
 
+    def shutdown(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, shutdown)
+    try:
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(target=daemon.handle, args=(conn,), daemon=True).start()
     except KeyboardInterrupt:
-        print("\n\n[*] Monitoring stopped")
+        print("\n[*] Scanner daemon stopped")
+        print(f"[*] Metrics: {METRICS.summary()}")
+    finally:
+        server.close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+        sys.stdout = daemon.output.stream
+        close_device_table(daemon.devices)
+
+
+def _legacy_detect_row_signals(freq_low, freq_step, powers):
+    """Pure-Python per-bin detection loop, kept as the benchmark reference"""
+    sorted_powers = sorted(powers)
+    floor_bins = max(1, len(sorted_powers)//10)
+    noise_floor = sum(sorted_powers[:floor_bins]) / floor_bins
+
+    signals = []
+    for i, power in enumerate(powers):
+        freq = freq_low + (i * freq_step)
+        if power - noise_floor > SIGNAL_THRESHOLD:
+            signals.append({
+                'frequency': freq,
+                'power': power,
+                'strength': power - noise_floor,
+                'noise_floor': noise_floor
+            })
+    return signals
+
+
+def synthetic_sweep(start_freq=24000000, end_freq=RTL_MAX_FREQ, bin_size=FFT_BIN_SIZE,
+                    bins_per_row=32, emitters=200, seed=1):
+    """Build rtl_power-style rows of noise with a few strong carriers"""
+    rng = np.random.default_rng(seed)
+    hop = bin_size * bins_per_row
+    lows = np.arange(start_freq, end_freq, hop)
+    matrix = rng.normal(-40.0, 1.5, (len(lows), bins_per_row))
+    # Each carrier occupies 1-8 adjacent bins, like narrowband to FM-wide signals
+    widths = rng.integers(1, 9, emitters)
+    first = rng.integers(0, matrix.size - 8, emitters)
+    hits = np.repeat(first, widths) + np.concatenate([np.arange(w) for w in widths])
+    matrix.flat[hits] += np.repeat(rng.uniform(15.0, 40.0, emitters), widths)
+    return [(int(low), int(low + hop), float(bin_size), powers)
+            for low, powers in zip(lows.tolist(), matrix.round(2).tolist())]
+
+
+def benchmark_detection(repeats=5, bin_size=FFT_BIN_SIZE):
+    """Compare the per-bin Python loop with the vectorized engine
+
+    'Scan' times what scan_frequency_range does in a quick scan: one
+    detect_sweep per sweep plan segment.
+    """
+    rows = synthetic_sweep(bin_size=bin_size)
+    segments = [[r for r in rows if seg['start'] <= r[0] < seg['end']]
+                for seg in SweepPlan(rtl_scan_bands()).segments]
+    segments = [seg for seg in segments if seg]
+    nbins = sum(len(r[3]) for r in rows)
+    print(f"[*] Synthetic sweep 24 - 1700 MHz: {len(rows)} rows, {nbins} bins "
+          f"({bin_size/1e3:.0f} kHz), best of {repeats}")
+
+    def best(fn):
+        times = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - t0)
+        return min(times), result
+
+    legacy_time, legacy = best(lambda: [sig for r in rows
+                                        for sig in _legacy_detect_row_signals(r[0], r[2], r[3])])
+    vector_time, vector = best(lambda: detect_sweep(rows, cluster=False))
+    cluster_time, clustered = best(lambda: detect_sweep(rows))
+    scan_time, scanned = best(lambda: [sig for seg in segments for sig in detect_sweep(seg)])
+    scan_rows = sum(len(seg) for seg in segments)
+    stream_time, streamed = best(lambda: list(stream_signals(iter(rows))))
+
+    print(f"    Python loop: {legacy_time*1e3:8.2f} ms  ({len(rows)/legacy_time:10.0f} rows/s)  "
+          f"{len(legacy)} detections")
+    print(f"    NumPy:       {vector_time*1e3:8.2f} ms  ({len(rows)/vector_time:10.0f} rows/s)  "
+          f"{len(vector)} detections")
+    print(f"    + clusters:  {cluster_time*1e3:8.2f} ms  ({len(rows)/cluster_time:10.0f} rows/s)  "
+          f"{len(clustered)} signals")
+    print(f"    Scan:        {scan_time*1e3:8.2f} ms  ({scan_rows/scan_time:10.0f} rows/s)  "
+          f"{len(scanned)} signals in {len(segments)} segment(s), {scan_rows} rows")
+    print(f"    Stream:      {stream_time*1e3:8.2f} ms  ({len(rows)/stream_time:10.0f} rows/s)  "
+          f"{len(streamed)} signals, {STREAM_CHUNK_ROWS} rows per pass")
+    print(f"    Speedup:     {legacy_time/vector_time:.1f}x")
 
 
 if __name__ == '__main__':
@@ -373,19 +4032,188 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Wideband RF Scanner')
     parser.add_argument('--scan', action='store_true', help='Quick scan all bands')
     parser.add_argument('--monitor', action='store_true', help='Continuous monitoring mode')
+    parser.add_argument('--stream', action='store_true',
+                       help='Print detections as the rtl_power hops arrive')
+    parser.add_argument('--persistent', action='store_true',
+                       help='Monitor with one long-running rtl_power process instead of one per band')
+    parser.add_argument('--adaptive', action='store_true',
+                       help='Monitor with adaptive per-band revisit and dwell times')
+    parser.add_argument('--auto-decode', action='store_true',
+                       help='Monitor: decode new signals in the background for --duration seconds')
+    parser.add_argument('--hop', action='store_true',
+                       help='Auto-decode: one rtl_433 hops over all new ISM signals instead of one dongle each')
+    parser.add_argument('--decode-cache-ttl', type=float, default=DECODE_CACHE_TTL,
+                       help=f'Auto-decode: seconds before a known emitter is decoded again '
+                            f'(default: {DECODE_CACHE_TTL}, 0 decodes every alert)')
+    parser.add_argument('--interval', type=float, default=MONITOR_INTERVAL,
+                       help=f'Monitor: seconds between scans (default: {MONITOR_INTERVAL})')
+    parser.add_argument('--budget', type=float, default=1.0,
+                       help='Fraction of hardware time the adaptive monitor may use (default: 1.0)')
     parser.add_argument('--threshold', type=int, default=SIGNAL_THRESHOLD,
                        help=f'Signal threshold in dB (default: {SIGNAL_THRESHOLD})')
     parser.add_argument('--freq', type=float, help='Decode specific frequency in MHz')
     parser.add_argument('--decoder', choices=['rtl_433', 'rtl_fm', 'catsniffer', 'dump1090'],
                        help='Force specific decoder')
     parser.add_argument('--duration', type=int, default=30, help='Decode duration in seconds')
+    parser.add_argument('--band-plan', default=DEFAULT_BAND_PLAN,
+                       help='Band plan CSV (default: bandplans/default.csv next to this script)')
+    parser.add_argument('--full', action='store_true',
+                       help=f'Sweep the whole {FULL_SWEEP_START/1e6:.0f} - {RTL_MAX_FREQ/1e6:.0f} MHz range '
+                            f'instead of the scan bands (with --scan or --monitor)')
+    parser.add_argument('--chunk', type=float, default=FULL_SWEEP_CHUNK / 1e6,
+                       help=f'MHz of spectrum processed at a time by --full '
+                            f'(default: {FULL_SWEEP_CHUNK/1e6:.0f})')
+    parser.add_argument('--plan', action='store_true',
+                       help='Print the sweep plan and expected cycle time, then exit')
+    parser.add_argument('--resolution', type=float, default=FFT_BIN_SIZE / 1e3,
+                       help=f'Target FFT bin size in kHz (default: {FFT_BIN_SIZE/1e3:.0f})')
+    parser.add_argument('--tuner-bandwidth', type=float, default=TUNER_USABLE_BANDWIDTH / 1e6,
+                       help=f'Usable bandwidth per hop in MHz (default: {TUNER_USABLE_BANDWIDTH/1e6:.1f})')
+    parser.add_argument('--waterfall', metavar='DIR',
+                       help='Keep every monitor sweep in per-band ring files in DIR')
+    parser.add_argument('--waterfall-rows', type=int, default=WATERFALL_ROWS,
+                       help=f'Sweeps kept per band before overwriting (default: {WATERFALL_ROWS})')
+    parser.add_argument('--waterfall-format', choices=['uint8', 'float16'], default='uint8',
+                       help='Waterfall sample format (default: uint8, ~0.5 dB steps)')
+    parser.add_argument('--waterfall-info', metavar='FILE', nargs='+',
+                       help='Describe waterfall files and exit')
+    parser.add_argument('--devices', default='0',
+                       help='Comma-separated RTL-SDR device indices to share the sweep (default: 0)')
+    parser.add_argument('--no-arbiter', action='store_true',
+                       help="Don't lease devices through rf-device-arbiter.py")
+    parser.add_argument('--rtl-power', default=RTL_POWER_CMD,
+                       help='rtl_power executable, e.g. fake-rtl-power.py for testing without hardware')
+    parser.add_argument('--catsniffer', default=CATSNIFFER_TOOL,
+                       help='cat_sniffer.py to run for 2.4 GHz (default: the pycatsniffer_bv3 install)')
+    parser.add_argument('--catsniffer-port', default=CATSNIFFER_PORT,
+                       help=f'CatSniffer serial port (default: {CATSNIFFER_PORT})')
+    parser.add_argument('--no-survey', action='store_true',
+                       help="Don't survey the CatSniffer's BLE/Zigbee channels in a scan")
+    parser.add_argument('--track', action='store_true',
+                       help='Follow emitters across sweeps (drift, hopping, duty cycle); '
+                            'a known emitter is marked as such in new-signal alerts')
+    parser.add_argument('--events', metavar='DB',
+                       help='Record detections, alerts and decoder output in a SQLite database '
+                            '(query with rf-events.py)')
+    parser.add_argument('--refresh', type=float, default=DECODE_REFRESH,
+                       help=f'Decoder console summary redraws per second (default: {DECODE_REFRESH}, '
+                            f'0 prints every output line)')
+    parser.add_argument('--decode-log', metavar='FILE',
+                       help="Append the decoder's raw output lines to FILE")
+    parser.add_argument('--snapshot', metavar='FILE',
+                       help='Keep a JSON snapshot of the rtl_433 device table in FILE')
+    parser.add_argument('--snapshot-interval', type=float, default=RTL433_SNAPSHOT_INTERVAL,
+                       help=f'Seconds between device table snapshots (default: {RTL433_SNAPSHOT_INTERVAL})')
+    parser.add_argument('--ingest', metavar='FILE',
+                       help="Build the rtl_433 device table from a JSON log ('-' for stdin) and exit")
+    parser.add_argument('--record', metavar='FILE',
+                       help='Append the raw rtl_power output to FILE for later --replay')
+    parser.add_argument('--replay', metavar='FILE', nargs='+',
+                       help='Scan/monitor recorded rtl_power CSV files instead of live hardware')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                       help='Replay speed relative to real time, 0 = as fast as possible (default: 1)')
+    parser.add_argument('--daemon', action='store_true',
+                       help='Stay resident and take scan/decode/monitor requests on a Unix socket '
+                            '(see rf-scanner-client.py)')
+    parser.add_argument('--socket', default=SCANNER_SOCKET,
+                       help=f'Daemon control socket (default: {SCANNER_SOCKET})')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                       help='Serve Prometheus metrics on http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--metrics-interval', type=float, default=METRICS_INTERVAL,
+                       help=f'Seconds between metrics summary lines while monitoring, 0 = off '
+                            f'(default: {METRICS_INTERVAL})')
+    parser.add_argument('--benchmark', action='store_true',
+                       help='Benchmark signal detection on a synthetic sweep')
 
     args = parser.parse_args()
 
     # Update threshold
     SIGNAL_THRESHOLD = args.threshold
 
-    if args.freq:
+    if os.path.exists(args.band_plan):
+        BAND_PLAN = BandPlan.load(args.band_plan)
+    elif args.band_plan != DEFAULT_BAND_PLAN:
+        print(f"ERROR: Band plan not found: {args.band_plan}")
+        sys.exit(1)
+
+    RTL_POWER_CMD = args.rtl_power
+    CATSNIFFER_TOOL = args.catsniffer
+    REFRESH = args.refresh
+    DECODE_LOG = args.decode_log
+    CATSNIFFER_PORT = args.catsniffer_port
+    CATSNIFFER_SURVEY = not args.no_survey
+    if args.replay:
+        try:
+            REPLAY = CaptureReplay(args.replay, speed=args.replay_speed)
+        except OSError as e:
+            print(f"ERROR: Cannot read capture: {e}")
+            sys.exit(1)
+        REPLAY.describe()
+    elif not args.no_arbiter:
+        ARBITER = load_arbiter()
+    if args.record:
+        try:
+            RECORDER = CaptureRecorder(args.record)
+        except OSError as e:
+            print(f"ERROR: Cannot open capture file: {e}")
+            sys.exit(1)
+        atexit.register(RECORDER.close)
+    try:
+        pool = DevicePool(int(d) for d in args.devices.split(','))
+    except ValueError:
+        print(f"ERROR: Invalid device list: {args.devices}")
+        sys.exit(1)
+
+    plan = SweepPlan(rtl_scan_bands(),
+                     tuner_bandwidth=int(args.tuner_bandwidth * 1e6),
+                     resolution=int(args.resolution * 1e3))
+    if len(pool) > 1:
+        plan = plan.split_for_devices(len(pool))
+
+    RTL433_HOP = args.hop
+
+    if args.track:
+        # Detections are only as precise as the bins, so tolerate at least one
+        TRACKER = SignalTracker(tolerance=max(TRACKER_TOLERANCE, plan.resolution))
+
+    devices = Rtl433DeviceTable(snapshot_path=args.snapshot,
+                                snapshot_interval=args.snapshot_interval)
+
+    if args.events:
+        try:
+            EVENT_STORE = EventStore(args.events)
+        except sqlite3.Error as e:
+            print(f"ERROR: Cannot open event database: {e}")
+            sys.exit(1)
+        # Write out the last batch however the scanner exits
+        atexit.register(EVENT_STORE.close)
+
+    if args.metrics_port:
+        try:
+            serve_metrics(args.metrics_port)
+        except OSError as e:
+            print(f"ERROR: Cannot serve metrics on port {args.metrics_port}: {e}")
+            sys.exit(1)
+        print(f"[*] Metrics at http://127.0.0.1:{args.metrics_port}/metrics")
+
+    if args.ingest:
+        ingest_rtl433(args.ingest, args.snapshot, args.snapshot_interval)
+
+    elif args.waterfall_info:
+        for path in args.waterfall_info:
+            try:
+                WaterfallStore(path).describe()
+            except (OSError, ValueError) as e:
+                print(f"[!] {path}: {e}")
+
+    elif args.plan:
+        plan.describe(len(pool))
+
+    elif args.benchmark:
+        benchmark_detection()
+        benchmark_detection(bin_size=10000)
+
+    elif args.freq:
         # Decode specific frequency
         freq_hz = int(args.freq * 1e6)
         detector = SignalDetector()
@@ -393,13 +4221,46 @@ if __name__ == '__main__':
         decoder = args.decoder or decoder_info['decoder']
 
         print(f"[*] Decoding {args.freq} MHz using {decoder}")
-        decode_signal(freq_hz, decoder, args.duration)
+        decode_signal(freq_hz, decoder, args.duration, device=pool.devices[0], devices=devices)
+
+    elif args.daemon:
+        serve_daemon(ScannerDaemon(plan, pool, devices), args.socket)
 
     elif args.monitor:
         # Continuous monitoring
-        continuous_monitor()
+        archive = None
+        if args.waterfall and args.full:
+            # Rings hold one whole-band row per sweep; --full never has one in memory
+            print("ERROR: --waterfall can't be combined with --full")
+            sys.exit(1)
+        if args.auto_decode and (args.persistent or args.full) and len(pool) < 2:
+            # The sweep holds its device for good, leaving none for the decoders
+            mode = '--full' if args.full else '--persistent'
+            print(f"ERROR: --auto-decode with {mode} needs a second device (--devices 0,1)")
+            sys.exit(1)
+        if args.waterfall:
+            try:
+                archive = WaterfallArchive(args.waterfall, plan, args.waterfall_rows,
+                                           args.waterfall_format)
+            except (OSError, ValueError) as e:
+                print(f"ERROR: Cannot open waterfall store: {e}")
+                sys.exit(1)
+
+        if args.metrics_interval > 0:
+            report_metrics_periodically(args.metrics_interval)
+        continuous_monitor(persistent=args.persistent, plan=plan, pool=pool,
+                           adaptive=args.adaptive, budget=args.budget, archive=archive,
+                           auto_decode=args.auto_decode, decode_duration=args.duration,
+                           devices=devices, full=args.full, chunk_size=int(args.chunk * 1e6),
+                           decode_cache_ttl=args.decode_cache_ttl, interval=args.interval)
+
+    elif args.full:
+        detections = full_scan(pool, plan.resolution, int(args.chunk * 1e6))
+        print(f"\n[*] Metrics: {METRICS.summary()}")
+        interactive_decoder(detections, pool=pool, devices=devices)
 
     else:
         # Quick scan + interactive decode
-        detections = quick_scan_all_bands()
-        interactive_decoder(detections)
+        detections = quick_scan_all_bands(stream=args.stream, plan=plan, pool=pool)
+        print(f"\n[*] Metrics: {METRICS.summary()}")
+        interactive_decoder(detections, pool=pool, devices=devices)
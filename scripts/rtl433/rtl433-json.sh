@@ -3,6 +3,7 @@ echo "=== RTL-SDR 433 MHz JSON Output ==="
 echo ""
 read -p "Enter output filename [rtl433_devices.json]: " filename
 filename=${filename:-rtl433_devices.json}
+snapshot="${filename%.json}_table.json"
 
 read -p "Enter duration in seconds [60]: " duration
 duration=${duration:-60}
@@ -10,20 +11,24 @@ duration=${duration:-60}
 echo ""
 echo "Capturing 433 MHz devices for $duration seconds..."
 echo "Output file: $filename"
+echo "Device table: $snapshot (updated every 10 seconds)"
 echo ""
 echo "Press Ctrl+C to stop early."
 echo ""
 
-# Run rtl_433 with JSON output
-timeout $duration rtl_433 -d 0 -F json -M time:unix -M level -M protocol > "$filename" 2>&1
+# Run rtl_433 with JSON output, keeping the raw records and a live device table
+/usr/bin/python3 /home/dragon/bin/rf-device-arbiter.py run -r rtlsdr -n rtl433-json -- \
+    timeout $duration rtl_433 -d {index} -F json -M time:unix -M level -M protocol \
+    | tee "$filename" \
+    | /usr/bin/python3 /home/dragon/bin/rf-wideband-scanner.py --ingest - \
+        --snapshot "$snapshot" --snapshot-interval 10 --events /home/dragon/rf_events.db
 
 echo ""
 if [ -f "$filename" ]; then
     echo "✓ Capture complete!"
     echo "File: $filename"
     echo "Size: $(wc -c < "$filename") bytes"
-    echo ""
-    echo "Device count: $(grep -c "model" "$filename")"
+    echo "Device table: $snapshot"
     echo ""
     echo "First few detections:"
     head -5 "$filename"
@@ -14,4 +14,5 @@ read -p "Press Enter to start monitoring (Ctrl+C to stop)..."
 echo ""
 
 # Run rtl_433 with human-readable output and signal levels
-rtl_433 -d 0 -F log -M time:unix -M level -M protocol
+/usr/bin/python3 /home/dragon/bin/rf-device-arbiter.py run -r rtlsdr -n rtl433-monitor -- \
+    rtl_433 -d {index} -F log -M time:unix -M level -M protocol
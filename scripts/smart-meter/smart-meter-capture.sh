@@ -32,7 +32,8 @@ echo ""
 echo "Capturing... (Ctrl+C to stop early)"
 echo ""
 
-timeout $DURATION /usr/bin/python3 cat_sniffer.py sniff /dev/ttyACM1 \
+/usr/bin/python3 /home/dragon/bin/rf-device-arbiter.py run -r catsniffer -n smart-meter-capture -- \
+    timeout $DURATION /usr/bin/python3 cat_sniffer.py sniff /dev/ttyACM1 \
     --phy zigbee -c $CHANNEL \
     --pcap --pcap-name "$FILENAME" 2>&1 | grep -v "Unknown syntax"
 
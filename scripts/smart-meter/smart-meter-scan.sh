@@ -24,7 +24,8 @@ for channel in "${CHANNELS[@]}"; do
     echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
     
     # Capture for 30 seconds
-    timeout 30 /usr/bin/python3 cat_sniffer.py sniff /dev/ttyACM1 \
+    /usr/bin/python3 /home/dragon/bin/rf-device-arbiter.py run -r catsniffer -n smart-meter-scan -- \
+        timeout 30 /usr/bin/python3 cat_sniffer.py sniff /dev/ttyACM1 \
         --phy zigbee -c $channel \
         --pcap --pcap-name "meter_scan_ch${channel}.pcap" 2>&1 | grep -v "Unknown syntax" &
     